@@ -0,0 +1,83 @@
+"""
+Benchmark creating datamodels with ``create_minimal`` and ``create_fake_data``.
+
+Each model is timed twice:
+    - cold: the compiled build plans and fake data templates are discarded
+      before every call so the schemas must be walked from scratch (the
+      resolved schemas remain cached)
+    - warm: the build plans and templates from the first call are reused
+
+``create_fake_data`` is timed both with and without the templates.
+
+Usage::
+
+    python benchmarks/bench_create.py [--repeat N] [--shape N [N ...]] [--all-models]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from roman_datamodels import clear_fake_data_cache, datamodels
+from roman_datamodels._stnode import _schema
+
+MODELS = ("ImageModel", "RampModel", "MosaicModel", "DarkRefModel", "ImageSourceCatalogModel")
+
+
+def all_models():
+    """
+    The names of all the models in MODEL_REGISTRY.
+    """
+    return sorted(model_class.__name__ for model_class in datamodels.MODEL_REGISTRY.values())
+
+
+def _time(function, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times)}
+
+
+def _clear():
+    _schema._PLANS_BY_TAG.clear()
+    clear_fake_data_cache()
+
+
+def run(repeat=20, shape=(8, 8, 8), models=MODELS):
+    results = {}
+    for name in models:
+        model_class = getattr(datamodels, name)
+        creators = {
+            "minimal": model_class.create_minimal,
+            "fake": lambda model_class=model_class: model_class.create_fake_data(shape=shape, template=True),
+            "fake_no_template": lambda model_class=model_class: model_class.create_fake_data(shape=shape),
+        }
+        results[name] = {}
+        for creator_name, creator in creators.items():
+            # populate the resolved schema cache so only the building is measured
+            creator()
+            results[name][creator_name] = {
+                "cold": _time(creator, repeat, setup=_clear),
+                "warm": _time(creator, repeat),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="number of times to repeat each measurement")
+    parser.add_argument("--shape", type=int, nargs="+", default=[8, 8, 8], help="shape passed to create_fake_data")
+    parser.add_argument("--all-models", action="store_true", help="time every model in MODEL_REGISTRY")
+    args = parser.parse_args()
+
+    models = all_models() if args.all_models else MODELS
+    print(json.dumps(run(args.repeat, tuple(args.shape), models), indent=2))
+
+
+if __name__ == "__main__":
+    main()
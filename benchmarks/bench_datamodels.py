@@ -0,0 +1,251 @@
+"""
+Benchmark the common operations on existing datamodels.
+
+Reports the time taken to:
+    - open: open an ``ImageModel`` file with ``rdm_open`` and read from it, for
+      small and large files, with and without ``lazy_tree`` and ``memmap``,
+      and for large files prefetching all the arrays with 1 and 4 workers
+    - cutout: open a large ``ImageModel`` file with noisy data and read a 64x64
+      region of its data, for a file saved as usual and one saved in 256x256 tiles
+    - save: save a large ``ImageModel`` with each array compression
+    - validate: validate a large ``ImageModel`` with a long ``cal_logs`` as a
+      whole, and again after editing its metadata (re-validating only the
+      edited parts)
+    - validate_opened: open a large ``ImageModel`` file and validate it, with
+      the bytes of arrays read to validate it
+    - copy: ``copy(deepcopy=True)`` a small and a large ``ImageModel``, and
+      ``copy(copy_on_write=True)`` them
+    - copy_memory: the peak memory (traced by ``tracemalloc``) of copying a
+      realistic 4096x4096 ``ImageModel`` both ways, and of then writing to the
+      metadata of the copy
+    - diff: diff two large ``ImageModel`` files, saved from the same model
+      (so no arrays are read) or from models with different data, compared
+      with 1 and 4 workers
+    - to_flat_dict: flatten an ``ImageModel``
+    - node_update: update the metadata of a minimal ``ImageModel`` from another model
+    - from_science_raw: convert a large ``ScienceRawModel`` to a ``RampModel``,
+      copying all its arrays and sharing the ones which need no conversion
+    - to_parquet: save an ``ImageSourceCatalogModel`` with many rows as parquet
+      with each column compression, with the write throughput (of the
+      catalog's bytes)
+    - to_arrow: convert that catalog to an arrow table (sharing its columns)
+    - from_parquet: read that catalog back, with all its columns and with only 3
+    - column_definitions: look up the definitions of the columns of a
+      ``MultibandSourceCatalogModel`` with about 1000 columns, one at a time
+      and all at once
+
+Usage::
+
+    python benchmarks/bench_datamodels.py [--repeat N] [--small N] [--large N] [--rows N] [--copy-size N]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from astropy.table import Column, Table
+
+from roman_datamodels import datamodels
+from roman_datamodels.datamodels._utils import node_update
+
+# asdf array compressions, None disables compression
+COMPRESSIONS = (None, "zlib", "bzp2", "lz4")
+
+# parquet column compressions, None disables compression
+PARQUET_COMPRESSIONS = (None, "snappy", "zstd")
+
+
+def _time(function, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times)}
+
+
+def _open(path, **kwargs):
+    with datamodels.open(path, **kwargs) as model:
+        model.meta.exposure.start_time  # noqa: B018
+        model.data[0, 0]
+
+
+def _cutout(path):
+    with datamodels.open(path) as model:
+        model.data[100:164, 100:164]
+
+
+def _diff(path_a, path_b, **kwargs):
+    with datamodels.open(path_a) as model_a, datamodels.open(path_b) as model_b:
+        datamodels.diff(model_a, model_b, **kwargs)
+
+
+def _open_and_validate(path):
+    with datamodels.open(path) as model:
+        model.validate()
+        return model.validation_report.bytes_read
+
+
+def _peak_memory(function):
+    """
+    The peak memory allocated while calling a function, in bytes.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _copy_and_write(model, **kwargs):
+    model_copy = model.copy(**kwargs)
+    model_copy.meta.exposure.start_time = model.meta.exposure.end_time
+
+
+def _catalog(rows):
+    """
+    Create a source catalog model with the given number of rows.
+    """
+    model = datamodels.ImageSourceCatalogModel.create_fake_data()
+    empty = model.source_catalog
+    model.source_catalog = Table(
+        [
+            Column(np.zeros((rows, *empty[name].shape[1:]), dtype=empty[name].dtype), name=name, unit=empty[name].unit)
+            for name in empty.colnames
+        ],
+        meta=empty.meta,
+    )
+    return model
+
+
+def run(repeat=10, small=64, large=2048, rows=10_000, copy_size=4096):
+    results = {}
+    models = {
+        "small": datamodels.ImageModel.create_fake_data(shape=(small, small)),
+        "large": datamodels.ImageModel.create_fake_data(shape=(large, large)),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        results["open"] = {}
+        for size, model in models.items():
+            path = model.save(tmp_dir / f"{size}.asdf")
+            for lazy_tree in (True, False):
+                for memmap in (True, False):
+                    kwargs = {"lazy_tree": lazy_tree, "memmap": memmap}
+                    case = f"{size}_lazy_tree={lazy_tree}_memmap={memmap}"
+                    results["open"][case] = _time(lambda path=path, kwargs=kwargs: _open(path, **kwargs), repeat)
+
+        for workers in (1, 4):
+            kwargs = {"prefetch": True, "workers": workers}
+            results["open"][f"large_prefetch_workers={workers}"] = _time(lambda kwargs=kwargs: _open(path, **kwargs), repeat)
+
+        noisy = models["large"].copy()
+        noisy.data = np.random.default_rng(0).normal(1000, 10, noisy.data.shape).astype(noisy.data.dtype)
+        paths = {
+            "untiled": noisy.save(tmp_dir / "untiled.asdf"),
+            "tiled": noisy.save(tmp_dir / "tiled.asdf", tile_shape=(256, 256)),
+        }
+        results["cutout"] = {name: _time(lambda path=path: _cutout(path), repeat) for name, path in paths.items()}
+
+        results["validate_opened"] = {**_time(lambda: _open_and_validate(path), repeat), "bytes_read": _open_and_validate(path)}
+
+        copy_path = models["large"].save(tmp_dir / "large_copy.asdf")
+        results["diff"] = {"identical": _time(lambda: _diff(path, copy_path), repeat)}
+        for workers in (1, 4):
+            results["diff"][f"different_workers={workers}"] = _time(
+                lambda workers=workers: _diff(path, paths["untiled"], workers=workers), repeat
+            )
+
+        results["save"] = {
+            str(compression).lower(): _time(
+                lambda compression=compression: models["large"].save(tmp_dir / "save.asdf", all_array_compression=compression),
+                repeat,
+            )
+            for compression in COMPRESSIONS
+        }
+
+        catalog = _catalog(rows)
+        catalog_path = tmp_dir / "catalog.parquet"
+        nbytes = sum(catalog.source_catalog[name].nbytes for name in catalog.source_catalog.colnames)
+        results["to_parquet"] = {}
+        for compression in PARQUET_COMPRESSIONS:
+            timing = _time(lambda compression=compression: catalog.to_parquet(catalog_path, compression=compression), repeat)
+            results["to_parquet"][str(compression).lower()] = {
+                **timing,
+                "mb_per_s": nbytes / timing["median"] / 1e6,
+                "file_mb": catalog_path.stat().st_size / 1e6,
+            }
+        results["to_arrow"] = _time(catalog.to_arrow, repeat)
+        columns = catalog.source_catalog.colnames[:3]
+        results["from_parquet"] = {
+            "all_columns": _time(lambda: datamodels.open(catalog_path), repeat),
+            "3_columns": _time(lambda: datamodels.open(catalog_path, columns=columns), repeat),
+        }
+
+    logged = datamodels.ImageModel.create_fake_data(shape=(large, large))
+    logged.meta.cal_logs = [f"2025-01-01T00:00:00.000 step {index}" for index in range(2000)]
+    results["validate"] = {
+        "full": _time(lambda: logged.validate(full=True), repeat),
+        "meta_edit": _time(logged.validate, repeat, setup=lambda: setattr(logged.meta.exposure, "type", "WFI_IMAGE")),
+    }
+    results["copy"] = {size: _time(lambda model=model: model.copy(deepcopy=True), repeat) for size, model in models.items()}
+    for size, model in models.items():
+        results["copy"][f"{size}_copy_on_write"] = _time(lambda model=model: model.copy(copy_on_write=True), repeat)
+
+    model = datamodels.ImageModel.create_fake_data(shape=(copy_size, copy_size))
+    results["copy_memory"] = {
+        "deepcopy": _peak_memory(lambda: _copy_and_write(model, deepcopy=True)),
+        "copy_on_write": _peak_memory(lambda: _copy_and_write(model, copy_on_write=True)),
+    }
+    results["to_flat_dict"] = _time(models["small"].to_flat_dict, repeat)
+
+    targets = []
+    results["node_update"] = _time(
+        lambda: node_update(targets[-1].meta, models["small"].meta),
+        repeat,
+        setup=lambda: targets.append(datamodels.ImageModel.create_minimal()),
+    )
+
+    multiband = datamodels.MultibandSourceCatalogModel.create_fake_data()
+    names = multiband.create_empty_catalog(
+        aperture_radii=range(1, 55), filters=["f062", "f087", "f106", "f129", "f146", "f158", "f184", "f213"]
+    ).colnames
+    results["column_definitions"] = {
+        "n_columns": len(names),
+        "one_at_a_time": _time(lambda: [multiband.get_column_definition(name) for name in names], repeat),
+        "bulk": _time(lambda: multiband.get_column_definitions(names), repeat),
+    }
+
+    raw = datamodels.ScienceRawModel.create_fake_data(shape=(6, large, large))
+    results["from_science_raw"] = {
+        f"copy={copy}": _time(lambda copy=copy: datamodels.RampModel.from_science_raw(raw, copy=copy), repeat)
+        for copy in (True, False)
+    }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="number of times to repeat each measurement")
+    parser.add_argument("--small", type=int, default=64, help="size of the small images")
+    parser.add_argument("--large", type=int, default=2048, help="size of the large images")
+    parser.add_argument("--rows", type=int, default=10_000, help="number of rows in the catalog written to parquet")
+    parser.add_argument("--copy-size", type=int, default=4096, help="size of the image copied to measure the memory used")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat, args.small, args.large, args.rows, args.copy_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark the memory used by ``create_fake_data`` for each ``array_mode``.
+
+Each measurement is run in a fresh interpreter and reports the time taken to
+create a ``RampModel`` along with the peak resident memory of the process
+both before and after the model is created.
+
+Usage::
+
+    python benchmarks/bench_fake_arrays.py [--shape N [N ...]]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+_CREATE_SCRIPT = """
+import json, resource, sys, time
+from roman_datamodels import datamodels
+
+datamodels.RampModel.create_fake_data()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+model = datamodels.RampModel.create_fake_data(shape={shape}, array_mode={array_mode!r})
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"time": elapsed, "maxrss_before_kb": before, "maxrss_after_kb": after}}))
+"""
+
+
+def run(shape=(6, 4096, 4096)):
+    results = {}
+    for array_mode in ("zeros", "broadcast", "memmap"):
+        script = _CREATE_SCRIPT.format(shape=tuple(shape), array_mode=array_mode)
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)  # noqa: S603
+        results[array_mode] = json.loads(result.stdout.strip().splitlines()[-1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", type=int, nargs="+", default=[6, 4096, 4096], help="shape passed to create_fake_data")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.shape), indent=2))
+
+
+if __name__ == "__main__":
+    main()
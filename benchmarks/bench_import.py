@@ -0,0 +1,76 @@
+"""
+Benchmark the import time of roman_datamodels with respect to the on-disk cache.
+
+Each import is run in a fresh interpreter so that nothing is shared between runs:
+    - cold: the cache directory is empty so the manifests must be parsed (and cached)
+    - warm: the cache directory has a valid entry from a previous import
+    - invalidated: the cache entry exists but its key no longer matches
+    - disabled: caching is turned off entirely
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import roman_datamodels.datamodels
+print(time.perf_counter() - start)
+"""
+
+
+def _time_import(env):
+    result = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT], env=env, capture_output=True, text=True, check=True)  # noqa: S603
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _invalidate(cache_dir):
+    import marshal
+
+    for path in cache_dir.glob("*.bin"):
+        with path.open("rb") as cache_file:
+            _, payload = marshal.load(cache_file)  # noqa: S302
+        with path.open("wb") as cache_file:
+            marshal.dump(("invalidated", payload), cache_file)
+
+
+def run(repeat=5):
+    results = {"cold": [], "warm": [], "invalidated": [], "disabled": []}
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir)
+            env = {**os.environ, "ROMAN_DATAMODELS_CACHE_DIR": str(cache_dir)}
+            env.pop("ROMAN_DATAMODELS_NO_CACHE", None)
+
+            results["cold"].append(_time_import(env))
+            results["warm"].append(_time_import(env))
+
+            _invalidate(cache_dir)
+            results["invalidated"].append(_time_import(env))
+
+            results["disabled"].append(_time_import({**env, "ROMAN_DATAMODELS_NO_CACHE": "1"}))
+
+    return {name: {"median": statistics.median(times), "min": min(times), "times": times} for name, times in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of times to repeat each measurement")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark attribute and item access through nested nodes.
+
+Reports the number of accesses per second for:
+    - meta_chain: an attribute chain through untagged (wrapped) dicts
+    - tagged_chain: an attribute chain through tagged nodes
+    - list_items: indexing a list of dicts wrapped by an LNode
+    - dict_baseline: the same chain as meta_chain using plain dicts
+
+Usage::
+
+    python benchmarks/bench_node_access.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from roman_datamodels import datamodels
+
+
+def run(number=100_000):
+    model = datamodels.ImageModel.create_fake_data()
+    model.meta["nested"] = {"level1": {"level2": {"value": 1}}}
+    model.meta["entries"] = [{"value": i} for i in range(10)]
+    meta = model.meta
+    raw = model["meta"]
+
+    cases = {
+        "meta_chain": lambda: meta.nested.level1.level2.value,
+        "tagged_chain": lambda: meta.exposure.start_time,
+        "list_items": lambda: meta.entries[5].value,
+        "dict_baseline": lambda: raw["nested"]["level1"]["level2"]["value"],
+    }
+
+    results = {}
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=number, repeat=5))
+        results[name] = {"per_second": number / elapsed, "seconds_per_access": elapsed / number}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100_000, help="number of accesses per measurement")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.number), indent=2))
+
+
+if __name__ == "__main__":
+    main()
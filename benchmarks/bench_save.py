@@ -0,0 +1,101 @@
+"""
+Benchmark the throughput of saving a ``RampModel`` with parallel compression.
+
+The model is saved with each array compression using 1, 4 and 16 workers
+(``DataModel.save(..., workers=N)``), including the ``"auto"`` compression
+which only compresses the arrays lz4 compresses well. The throughput is the
+number of array bytes in the model divided by the time taken to save it.
+
+The peak memory (traced by ``tracemalloc``) of saving the ramp with lz4 is
+also reported, converting its data from ``uint16`` planes in memory first
+and streaming it (as a ``StreamedArray``) converted one plane at a time.
+
+Usage::
+
+    python benchmarks/bench_save.py [--repeat N] [--shape N [N ...]] [--workers N [N ...]]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from roman_datamodels import datamodels
+
+COMPRESSIONS = ("lz4", "zlib", "bzp2", "auto")
+
+
+def _model(shape):
+    """
+    Create a ramp with noisy (but compressible) data.
+    """
+    model = datamodels.RampModel.create_fake_data(shape=shape)
+    rng = np.random.default_rng(0)
+    model.data = rng.normal(1000, 10, shape).astype(model.data.dtype)
+    model.groupdq = rng.integers(0, 4, shape).astype(model.groupdq.dtype)
+    return model
+
+
+def _peak_memory(function):
+    """
+    The peak memory allocated while calling a function, in bytes.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _save_converted(model, path, data):
+    model.data = data
+    model.save(path)
+
+
+def run(repeat=3, shape=(6, 1024, 1024), workers=(1, 4, 16)):
+    model = _model(shape)
+    nbytes = sum(value.nbytes for _, value in model.items() if isinstance(value, np.ndarray))
+
+    results = {"array_bytes": nbytes}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "ramp.asdf"
+        for compression in COMPRESSIONS:
+            results[compression] = {}
+            for n_workers in workers:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    model.save(path, all_array_compression=compression, workers=n_workers)
+                    times.append(time.perf_counter() - start)
+                results[compression][n_workers] = {
+                    "median": statistics.median(times),
+                    "min": min(times),
+                    "megabytes_per_second": nbytes / statistics.median(times) / 1e6,
+                }
+
+        planes = model.data.astype(np.uint16)
+        results["peak_memory"] = {
+            "in_memory": _peak_memory(lambda: _save_converted(model, path, planes.astype(np.float32))),
+            "streamed": _peak_memory(lambda: _save_converted(model, path, datamodels.StreamedArray(planes, dtype=np.float32))),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="number of times to repeat each measurement")
+    parser.add_argument("--shape", type=int, nargs="+", default=[6, 1024, 1024], help="shape of the ramp")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16], help="numbers of workers to save with")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat, tuple(args.shape), tuple(args.workers)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
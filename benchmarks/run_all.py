@@ -0,0 +1,144 @@
+"""
+Run the whole benchmark suite and store the results as JSON.
+
+The results of each benchmark script are collected under its name, together
+with the git commit and the versions of the main dependencies, so runs on
+different commits can be compared. By default the results are written to
+``benchmarks/results/<commit>.json``.
+
+Passing ``--compare`` prints the ratio (new / old) of every timing which is
+in both the new results and the given results file.
+
+No network access is required.
+
+Usage::
+
+    python benchmarks/run_all.py [--quick] [--output PATH] [--compare PATH] [--only NAME [NAME ...]]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+import asdf
+import bench_create
+import bench_datamodels
+import bench_fake_arrays
+import bench_import
+import bench_node_access
+import bench_save
+import numpy as np
+
+import roman_datamodels
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Keys of the timings (in seconds) compared between results
+TIMING_KEYS = ("median", "time", "seconds_per_access")
+
+# Keyword arguments for the run function of each benchmark (full, quick)
+BENCHMARKS = {
+    "import": (bench_import.run, {"repeat": 5}, {"repeat": 2}),
+    "create": (
+        bench_create.run,
+        {"repeat": 20, "models": bench_create.all_models()},
+        {"repeat": 3, "models": bench_create.all_models()},
+    ),
+    "fake_arrays": (bench_fake_arrays.run, {"shape": (6, 4096, 4096)}, {"shape": (6, 1024, 1024)}),
+    "node_access": (bench_node_access.run, {"number": 100_000}, {"number": 10_000}),
+    "datamodels": (
+        bench_datamodels.run,
+        {"repeat": 10, "large": 2048},
+        {"repeat": 3, "large": 512, "rows": 1000, "copy_size": 512},
+    ),
+    "save": (bench_save.run, {"repeat": 3}, {"repeat": 1, "shape": (6, 256, 256)}),
+}
+
+
+def _commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def _timings(results, prefix=""):
+    """
+    Flatten the results into {dotted name: seconds}.
+    """
+    timings = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        if timing_keys := [timing_key for timing_key in TIMING_KEYS if timing_key in value]:
+            timings[f"{prefix}{key}"] = value[timing_keys[0]]
+        else:
+            timings.update(_timings(value, f"{prefix}{key}."))
+    return timings
+
+
+def compare(new, old):
+    """
+    Get the ratio (new / old) of the timings in both sets of results.
+    """
+    new_timings = _timings(new["benchmarks"])
+    old_timings = _timings(old["benchmarks"])
+    return {name: new_timings[name] / old_timings[name] for name in new_timings if old_timings.get(name)}
+
+
+def run(quick=False, only=None):
+    benchmarks = {}
+    for name, (function, full_kwargs, quick_kwargs) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        print(f"running {name}", file=sys.stderr)
+        benchmarks[name] = function(**(quick_kwargs if quick else full_kwargs))
+
+    return {
+        "commit": _commit(),
+        "date": datetime.datetime.now(datetime.UTC).isoformat(),
+        "quick": quick,
+        "versions": {
+            "python": platform.python_version(),
+            "roman_datamodels": roman_datamodels.__version__,
+            "asdf": asdf.__version__,
+            "numpy": np.__version__,
+        },
+        "machine": platform.machine(),
+        "benchmarks": benchmarks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run smaller and fewer repetitions of each benchmark")
+    parser.add_argument("--output", type=Path, help="file to write the results to")
+    parser.add_argument("--compare", type=Path, help="results file to compare the new results against")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="only run these benchmarks")
+    args = parser.parse_args()
+
+    results = run(args.quick, args.only)
+
+    output = args.output or RESULTS_DIR / f"{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        ratios = compare(results, json.loads(args.compare.read_text()))
+        print(json.dumps(ratios, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
-from ._stnode import get_latest_schema
+from ._stnode import SchemaCacheInfo, clear_fake_data_cache, get_latest_schema, schema_cache_info, warm_schema_cache
 from ._version import version as __version__
 from .datamodels import DataModel, open
 
-__all__ = ["DataModel", "__version__", "get_latest_schema", "open"]
+__all__ = [
+    "DataModel",
+    "SchemaCacheInfo",
+    "__version__",
+    "clear_fake_data_cache",
+    "get_latest_schema",
+    "open",
+    "schema_cache_info",
+    "warm_schema_cache",
+]
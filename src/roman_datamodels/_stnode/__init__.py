@@ -10,4 +10,25 @@ from ._mixins import *  # noqa: F403
 from ._node import *  # noqa: F403
 from ._schema import *  # noqa: F403
 from ._stnode import *  # noqa: F403
+from ._stnode import _PATTERNS_BY_CLASS_NAME, _node_class_by_name, _node_classes
 from ._tagged import *  # noqa: F403
+from ._template import *  # noqa: F403
+
+
+def __getattr__(name):
+    """
+    Get node classes which have not been created yet (in lazy mode).
+    """
+    if (cls := _node_class_by_name(name)) is not None:
+        globals()[name] = cls
+        return cls
+
+    if name == "NODE_CLASSES":
+        node_classes = globals()[name] = _node_classes()
+        return node_classes
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PATTERNS_BY_CLASS_NAME) | {"NODE_CLASSES"})
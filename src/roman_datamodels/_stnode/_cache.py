@@ -0,0 +1,175 @@
+"""
+Persistent on-disk cache for data derived from RAD.
+    Parsing the RAD manifests (and schemas) is a significant part of the cost of
+    importing and using roman_datamodels. The results of that work only change
+    when RAD (or roman_datamodels) changes, so they are cached on disk and keyed
+    so that any change to the inputs invalidates the cached copy.
+
+The cache location can be controlled with the ``ROMAN_DATAMODELS_CACHE_DIR``
+    environment variable, and the cache can be disabled entirely by setting the
+    ``ROMAN_DATAMODELS_NO_CACHE`` environment variable.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import marshal
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from typing import Any
+
+__all__: list[str] = []
+
+# Bump this whenever the structure of any cached payload changes
+_CACHE_FORMAT = 1
+
+
+def cache_dir() -> Path | None:
+    """
+    Get the directory used for the on-disk cache.
+
+    Returns
+    -------
+    Path or None
+        The cache directory, or None if caching has been disabled.
+    """
+    if os.environ.get("ROMAN_DATAMODELS_NO_CACHE"):
+        return None
+
+    if directory := os.environ.get("ROMAN_DATAMODELS_CACHE_DIR"):
+        return Path(directory)
+
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "roman_datamodels"
+
+
+def cache_key(paths: Iterable[Path], *extra: str) -> str:
+    """
+    Compute a cache key from the versions of RAD and roman_datamodels and the
+    contents of a set of files.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        The files whose contents the cached data is derived from.
+
+    *extra : str
+        Any additional values the cached data depends on.
+
+    Returns
+    -------
+    str
+        A key which will change if any of the inputs change.
+    """
+    from rad import __version__ as rad_version
+
+    from roman_datamodels._version import version as rdm_version
+
+    hasher = hashlib.sha256()
+    for part in (str(_CACHE_FORMAT), str(marshal.version), rad_version, rdm_version, *extra):
+        hasher.update(part.encode())
+        hasher.update(b"\0")
+
+    for path in paths:
+        hasher.update(path.name.encode())
+        hasher.update(b"\0")
+        hasher.update(hashlib.sha256(path.read_bytes()).digest())
+
+    return hasher.hexdigest()
+
+
+def read_cache(name: str, key: str) -> Any | None:
+    """
+    Read a payload from the cache.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cache entry.
+
+    key : str
+        The key the payload must have been stored under.
+
+    Returns
+    -------
+    Any or None
+        The cached payload, or None if there is no valid entry for the key.
+    """
+    if (directory := cache_dir()) is None:
+        return None
+
+    try:
+        with (directory / f"{name}.bin").open("rb") as cache_file:
+            # The cache only ever contains data written by write_cache
+            cached_key, payload = marshal.load(cache_file)  # noqa: S302
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing, unreadable, or corrupt cache entries are treated as a miss
+        return None
+
+    return payload if cached_key == key else None
+
+
+def write_cache(name: str, key: str, payload: Any) -> None:
+    """
+    Write a payload to the cache.
+
+    Failures are ignored so that a read-only or missing cache location never
+    prevents roman_datamodels from working.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cache entry, this may include a subdirectory.
+
+    key : str
+        The key to store the payload under.
+
+    payload : Any
+        The data to cache, this must be serializable by `marshal`.
+    """
+    if (directory := cache_dir()) is None:
+        return
+
+    path = directory / f"{name}.bin"
+    tmp_path = directory / f"{name}.{os.getpid()}.tmp"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as cache_file:
+            marshal.dump((key, payload), cache_file)
+
+        # Replace atomically so concurrent readers never see a partial entry
+        os.replace(tmp_path, path)
+    except (OSError, ValueError):
+        with contextlib.suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+
+
+def load_cached(name: str, key: str, build: Callable[[], Any]) -> Any:
+    """
+    Load a payload from the cache, building (and caching) it on a miss.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cache entry.
+
+    key : str
+        The key the payload is stored under.
+
+    build : Callable[[], Any]
+        Function to build the payload if it is not cached.
+
+    Returns
+    -------
+    Any
+        The payload.
+    """
+    if (payload := read_cache(name, key)) is None:
+        payload = build()
+        write_cache(name, key, payload)
+
+    return payload
@@ -2,20 +2,19 @@
 The ASDF Converters to handle the serialization/deseialization of the STNode classes to ASDF.
 """
 
-from asdf.extension import Converter, ManifestExtension
+import numpy as np
+from asdf.extension import Converter, Extension, ManifestExtension
 from astropy.time import Time
 
-from ._registry import (
-    LIST_NODE_CLASSES_BY_PATTERN,
-    NODE_CLASSES_BY_TAG,
-    NODE_CONVERTERS,
-    OBJECT_NODE_CLASSES_BY_PATTERN,
-    SCALAR_NODE_CLASSES_BY_PATTERN,
-)
-from ._stnode import _MANIFESTS
+from ._node import _SharedArray
+from ._registry import NODE_CLASSES_BY_TAG, NODE_CONVERTERS
+from ._stnode import _MANIFESTS, _node_types
+from ._tagged import TaggedListNode, TaggedObjectNode, TaggedScalarNode
 
 __all__ = [
     "NODE_EXTENSIONS",
+    "SHARED_ARRAY_EXTENSION",
+    "SharedArrayConverter",
     "TaggedListNodeConverter",
     "TaggedObjectNodeConverter",
     "TaggedScalarNodeConverter",
@@ -57,11 +56,11 @@ class TaggedObjectNodeConverter(_RomanConverter):
 
     @property
     def tags(self):
-        return list(OBJECT_NODE_CLASSES_BY_PATTERN.keys())
+        return list(_node_types(TaggedObjectNode).keys())
 
     @property
     def types(self):
-        return list(OBJECT_NODE_CLASSES_BY_PATTERN.values())
+        return list(_node_types(TaggedObjectNode).values())
 
     def to_yaml_tree(self, obj, tag, ctx):
         return dict(obj._data)
@@ -74,11 +73,11 @@ class TaggedListNodeConverter(_RomanConverter):
 
     @property
     def tags(self):
-        return list(LIST_NODE_CLASSES_BY_PATTERN.keys())
+        return list(_node_types(TaggedListNode).keys())
 
     @property
     def types(self):
-        return list(LIST_NODE_CLASSES_BY_PATTERN.values())
+        return list(_node_types(TaggedListNode).values())
 
     def to_yaml_tree(self, obj, tag, ctx):
         return list(obj)
@@ -91,11 +90,11 @@ class TaggedScalarNodeConverter(_RomanConverter):
 
     @property
     def tags(self):
-        return list(SCALAR_NODE_CLASSES_BY_PATTERN.keys())
+        return list(_node_types(TaggedScalarNode).keys())
 
     @property
     def types(self):
-        return list(SCALAR_NODE_CLASSES_BY_PATTERN.values())
+        return list(_node_types(TaggedScalarNode).values())
 
     def to_yaml_tree(self, obj, tag, ctx):
         node = obj.__class__.__bases__[0](obj)
@@ -114,6 +113,44 @@ class TaggedScalarNodeConverter(_RomanConverter):
 
 
 # Create the ASDF extension for the STNode classes.
-NODE_EXTENSIONS = {
-    manifest["id"]: ManifestExtension.from_uri(manifest["id"], converters=NODE_CONVERTERS.values()) for manifest in _MANIFESTS
-}
+#   The extensions are built from the (cached) manifests read by _stnode.py rather than
+#   via ManifestExtension.from_uri so that the manifests are not parsed a second time.
+NODE_EXTENSIONS = {manifest["id"]: ManifestExtension(manifest, converters=NODE_CONVERTERS.values()) for manifest in _MANIFESTS}
+
+
+class SharedArrayConverter(Converter):
+    """
+    Converter writing the lazily loaded arrays shared by copy on write trees as ordinary arrays.
+    """
+
+    @property
+    def tags(self):
+        return []
+
+    @property
+    def types(self):
+        return [_SharedArray]
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj, tag, ctx):
+        return np.asarray(obj)
+
+    def from_yaml_tree(self, node, tag, ctx):
+        return ctx.extension_manager.get_converter_for_tag(tag).from_yaml_tree(node, tag, ctx)
+
+
+class _SharedArrayExtension(Extension):
+    """
+    The ASDF extension writing the arrays shared by copy on write trees.
+    """
+
+    extension_uri = "asdf://stsci.edu/datamodels/roman/extensions/shared_arrays-1.0.0"
+
+    @property
+    def converters(self):
+        return [SharedArrayConverter()]
+
+
+SHARED_ARRAY_EXTENSION = _SharedArrayExtension()
@@ -50,6 +50,28 @@ def class_name_from_tag_uri(tag_uri: str) -> str:
     return class_name
 
 
+def base_class_from_tag(pattern: str, tag_def: dict[str, Any]) -> tagged_type:
+    """
+    Determine the tagged node base class the class for a tag will be derived from.
+
+    Parameters
+    ----------
+    pattern: str
+        A tag pattern/wildcard
+
+    tag_def: dict
+        A tag entry from the RAD manifest
+
+    Returns
+    -------
+    TaggedScalarNode, TaggedObjectNode, or TaggedListNode
+    """
+    if "tagged_scalar" in tag_def["schema_uri"]:
+        return TaggedScalarNode
+
+    return _NODE_TYPE_BY_PATTERN.get(pattern, TaggedObjectNode)
+
+
 def docstring_from_tag(tag_def: dict[str, Any]) -> str:
     """
     Read the docstring (if it exists) from the RAD manifest and generate a docstring
@@ -189,7 +211,7 @@ def stnode_factory(
     """
     # TaggedScalarNodes are a special case because they are not a subclass of a
     #   _node class, but rather a subclass of the type of the scalar.
-    if "tagged_scalar" in tag_def["schema_uri"]:
+    if base_class_from_tag(pattern, tag_def) is TaggedScalarNode:
         return scalar_factory(pattern, latest_manifest, tag_def)
     else:
         return node_factory(pattern, latest_manifest, tag_def)
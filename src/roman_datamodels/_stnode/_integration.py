@@ -8,6 +8,10 @@ def get_extensions():
     -------
     List[`asdf.extension.Extension`]
     """
-    from ._converters import NODE_EXTENSIONS
+    from roman_datamodels.datamodels._compression import PARALLEL_EXTENSION
+    from roman_datamodels.datamodels._streaming import STREAM_EXTENSION
+    from roman_datamodels.datamodels._tiles import TILE_EXTENSION
 
-    return list(NODE_EXTENSIONS.values())
+    from ._converters import NODE_EXTENSIONS, SHARED_ARRAY_EXTENSION
+
+    return [*NODE_EXTENSIONS.values(), SHARED_ARRAY_EXTENSION, TILE_EXTENSION, STREAM_EXTENSION, PARALLEL_EXTENSION]
@@ -4,13 +4,14 @@ Mixin classes for additional functionality for STNode classes
 
 from __future__ import annotations
 
+import functools
 import re
 from copy import deepcopy
 from typing import TYPE_CHECKING
 
 from asdf.tags.core.ndarray import asdf_datatype_to_numpy_dtype
 
-from ._schema import Builder, _get_keyword, _get_properties
+from ._schema import Builder, _get_keyword, _get_plan_from_tag, _get_properties
 from ._tagged import _get_schema_from_tag
 
 # This is a workaround for MyPy to understand the Mixin classes
@@ -182,7 +183,7 @@ class RefFileMixin(_ObjectBase):
             defaults[k] = "N/A"
         if not builder:
             builder = Builder()
-        data = builder.from_object(schema, defaults)
+        data = builder.from_object(_get_plan_from_tag(tag or cls._default_tag, builder), defaults)
         new = cls(data)
         if tag:
             new._read_tag = tag
@@ -208,6 +209,69 @@ class L3CalStepMixin(L2CalStepMixin):  # same as L2CalStepMixin
     __slots__ = ()
 
 
+class _ColumnDefinitions:
+    """
+    The column definitions of a catalog schema, compiled for lookups by column name.
+        The names of definitions without substitutions are looked up in a dict,
+        the others are matched all at once by a single regex combining them (in
+        the order of the definitions, so the first definition matching a name
+        is used as before).
+    """
+
+    def __init__(self, definitions):
+        self.definitions = []
+        self.exact = {}
+        patterns = []
+        for index, (def_name, definition) in enumerate(definitions.items()):
+            self.definitions.append(
+                {
+                    "unit": definition["unit"],
+                    "description": definition["description"],
+                    "datatype": asdf_datatype_to_numpy_dtype(
+                        definition["properties"]["data"]["properties"]["datatype"]["enum"][0]
+                    ),
+                }
+            )
+            if "~" not in def_name and re.escape(def_name) == def_name:
+                self.exact.setdefault(def_name, index)
+                continue
+
+            def_name = def_name.replace("~radius~", r"[0-9]{2}")
+            def_name = def_name.replace("_~band~", r"(?:_f[0-9]{3}|)")
+            def_name = def_name.replace("~band~", r"(?:f[0-9]{3}|)")
+            patterns.append(f"(?P<_{index}>{def_name})")
+
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+        # A pattern preceding a definition without substitutions takes precedence for the names it matches
+        for name, index in self.exact.items():
+            if (match_index := self._match(name)) is not None and match_index < index:
+                self.exact[name] = match_index
+
+    def _match(self, name):
+        if self.pattern is None or (match := self.pattern.fullmatch(name)) is None:
+            return None
+
+        return int(match.lastgroup[1:])
+
+    def get(self, name):
+        if name.startswith("forced_"):
+            _, name = name.split("forced_", maxsplit=1)
+
+        if (index := self.exact.get(name)) is None and (index := self._match(name)) is None:
+            return None
+
+        return dict(self.definitions[index])
+
+
+@functools.cache
+def _get_column_definitions(tag):
+    """
+    Get the (cached) compiled column definitions of a catalog tag.
+    """
+    return _ColumnDefinitions(_get_keyword(_get_schema_from_tag(tag)["properties"]["source_catalog"], "definitions"))
+
+
 class ImageSourceCatalogMixin(_ObjectBase):
     __slots__ = ()
 
@@ -230,24 +294,29 @@ class ImageSourceCatalogMixin(_ObjectBase):
             Dictionary containing unit, description, and datatype information
             or None if the name does not match any definition.
         """
-        if name.startswith("forced_"):
-            _, name = name.split("forced_", maxsplit=1)
-        definitions = _get_keyword(self.get_schema()["properties"]["source_catalog"], "definitions")
-        for def_name, definition in definitions.items():
-            if "~radius~" in def_name:
-                def_name = def_name.replace("~radius~", r"[0-9]{2}")
-            if "_~band~" in def_name:
-                def_name = def_name.replace("_~band~", r"(_f[0-9]{3}|)")
-            if "~band~" in def_name:
-                def_name = def_name.replace("~band~", r"(f[0-9]{3}|)")
-            if re.match(f"^{def_name}$", name):
-                return {
-                    "unit": definition["unit"],
-                    "description": definition["description"],
-                    "datatype": asdf_datatype_to_numpy_dtype(
-                        definition["properties"]["data"]["properties"]["datatype"]["enum"][0]
-                    ),
-                }
+        return _get_column_definitions(self.tag).get(name)
+
+    def get_column_definitions(self, names):
+        """
+        Get the definitions of many named columns in the catalog table.
+
+        The definitions of the catalog schema are parsed and compiled once
+        (per schema), so this is much faster than parsing them for each
+        column.
+
+        Parameters
+        ----------
+        names: Iterable of str
+            Column names, see `get_column_definition`.
+
+        Returns
+        -------
+        dict
+            The definition of each name (as returned by `get_column_definition`),
+            None for the names which do not match any definition.
+        """
+        definitions = _get_column_definitions(self.tag)
+        return {name: definitions.get(name) for name in names}
 
     @classmethod
     def _create_empty_catalog(cls, aperture_radii=None, filters=None):
@@ -6,6 +6,7 @@ Base node classes for all STNode classes.
 from __future__ import annotations
 
 import datetime
+import weakref
 from collections.abc import MutableMapping, MutableSequence
 from typing import TYPE_CHECKING
 
@@ -16,21 +17,398 @@ from astropy.time import Time
 
 __all__ = ["DNode", "LNode"]
 
+# Types wrapped as DNode and LNode respectively (tuples are faster to check than unions)
+_DICT_TYPES = (dict, AsdfDictNode)
+_LIST_TYPES = (list, AsdfListNode)
+_CONTAINER_TYPES = _DICT_TYPES + _LIST_TYPES
+
+# Array leaves
+_ARRAY_TYPES = (np.ndarray, ndarray.NDArrayType)
+
 
 def _wrap(value):
     """
     Convert dict to DNode and list to LNode
     """
     # Return objects as node classes, if applicable
-    if isinstance(value, dict | AsdfDictNode):
+    if isinstance(value, _DICT_TYPES):
         return DNode(value)
 
-    if isinstance(value, list | AsdfListNode):
+    if isinstance(value, _LIST_TYPES):
         return LNode(value)
 
     return value
 
 
+def _wrap_child(parent, key, value):
+    """
+    Wrap a child of a node, reusing the wrapper from a previous access if possible.
+        The wrappers are cached on the parent by key. A cached wrapper is only
+        reused if it still wraps the same object so that changes made to the
+        underlying data directly never result in a stale wrapper.
+    """
+    if not isinstance(value, _CONTAINER_TYPES):
+        if isinstance(value, DNode | LNode) and (cow := _cow_state(parent)) is not None:
+            return _wrap_shared_node(parent, cow, key, value)
+        return value
+
+    try:
+        children = parent._children
+    except AttributeError:
+        children = parent._children = {}
+
+    if (wrapper := children.get(key)) is not None and _unwrap(wrapper) is value:
+        return wrapper
+
+    wrapper = children[key] = _wrap(value)
+    if (cow := _cow_state(parent)) is not None and cow.is_shared(value):
+        wrapper._cow = _CopyOnWrite(parent, key)
+    return wrapper
+
+
+class _CopyOnWrite:
+    """
+    The copy on write state of a node whose container may be shared with other trees.
+        ``parent`` and ``key`` locate the node in the tree (None for its root).
+        ``shared`` is None while the container of the node is shared. Once the
+        node has copied its container before a write it holds the ids of the
+        child containers the copy still shares.
+    """
+
+    __slots__ = ("key", "parent", "shared")
+
+    def __init__(self, parent=None, key=None):
+        self.parent = parent
+        self.key = key
+        self.shared = None
+
+    def is_shared(self, child):
+        return self.shared is None or id(_container(child)) in self.shared
+
+
+def _cow_state(node):
+    """
+    Get the copy on write state of a node, None if its container is not shared.
+        Only the nodes of trees sharing their containers have a state, so the
+        other trees only pay for looking it up.
+    """
+    # Nodes created without __init__ have no state
+    return getattr(node, "_cow", None)
+
+
+def _read_only(array):
+    """
+    Get a read-only view of an array.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class _SharedArray(ndarray.NDArrayType):
+    """
+    A lazily loaded array shared by the trees of a copy on write, which loads as a read-only view.
+        The array is loaded by the lazily loaded array it wraps once its data
+        is used. Indexing it gives read-only arrays, while an array reading
+        regions on its own (e.g. a `TiledArray`) still only reads the region.
+    """
+
+    def __init__(self, array):
+        # The wrapped array holds the state of the array, the one of NDArrayType is unused
+        self._lazy = array
+        self._view = None
+
+    def _make_array(self):
+        if self._view is None:
+            self._view = _read_only(np.asarray(self._lazy))
+
+        return self._view
+
+    @property
+    def shape(self):
+        return self._lazy.shape
+
+    @property
+    def dtype(self):
+        return self._lazy.dtype
+
+    @property
+    def ndim(self):
+        return len(self._lazy.shape)
+
+    def __len__(self):
+        return len(self._lazy)
+
+    def __repr__(self):
+        return repr(self._lazy if self._view is None else self._view)
+
+    def __str__(self):
+        return str(self._lazy if self._view is None else self._view)
+
+    def __getitem__(self, key):
+        value = self._lazy[key]
+        return _read_only(value) if isinstance(value, np.ndarray) else value
+
+    def __setitem__(self, *args):
+        self._make_array().__setitem__(*args)
+
+
+def _share_node(node):
+    """
+    Create a node of the same class sharing the container of a node.
+    """
+    instance = node.__class__.__new__(node.__class__)
+    instance._read_tag = node._read_tag
+    if isinstance(node, DNode):
+        instance._data = node._data
+    else:
+        instance.data = node.data
+
+    return instance
+
+
+def _wrap_shared_node(parent, cow, key, node):
+    """
+    Wrap a node object (e.g. a tagged node) held by a node of a tree sharing its containers.
+        The node object itself is held by all the trees sharing the container,
+        so each tree writes to its own node sharing the container of the node
+        object instead.
+    """
+    if not cow.is_shared(node):
+        return node
+
+    try:
+        children = parent._children
+    except AttributeError:
+        children = parent._children = {}
+
+    if (wrapper := children.get(key)) is not None and _container(wrapper) is _container(node):
+        return wrapper
+
+    wrapper = children[key] = _share_node(node)
+    wrapper._cow = _CopyOnWrite(parent, key)
+    return wrapper
+
+
+def _share(node, parent=None, key=None):
+    """
+    Mark a node, and the wrappers of its children cached on it, as sharing their containers.
+    """
+    node._cow = _CopyOnWrite(parent, key)
+    for child_key, child in getattr(node, "_children", {}).items():
+        _share(child, node, child_key)
+
+
+def _copy_container(container):
+    """
+    Shallow copy a dict or list, converting the values of lazy asdf containers.
+    """
+    if type(container) is dict or type(container) is list:
+        return container.copy()
+
+    if isinstance(container, _DICT_TYPES):
+        return {key: container[key] for key in container}
+
+    return [container[index] for index in range(len(container))]
+
+
+def _own(node):
+    """
+    Copy the container of a node shared with other trees before it is written to.
+        The parents of the node are copied in turn (up to the root of the tree)
+        to hold the copied containers instead of the shared ones.
+    """
+    if (cow := _cow_state(node)) is None or cow.shared is not None:
+        return
+
+    shared = _container(node)
+    container = _copy_container(shared)
+    cow.shared = {id(_container(value)) for _, value in _iter_children(container) if isinstance(value, _NODE_TYPES)}
+    if isinstance(node, DNode):
+        node._data = container
+    else:
+        node.data = container
+
+    if (parent := cow.parent) is None:
+        return
+
+    _own(parent)
+    parent_container = _container(parent)
+
+    # The node may have moved (or been removed) in its parent since it was accessed
+    key = cow.key
+    try:
+        found = _container(parent_container[key]) is shared
+    except (KeyError, IndexError, TypeError):
+        found = False
+    if not found:
+        key = next((key for key, value in _iter_children(parent_container) if _container(value) is shared), None)
+    if key is not None:
+        parent_container[key] = _unwrap(node)
+
+
+def _array_items(node):
+    """
+    Iterate over the (path, array) pairs of the arrays held by the dicts and lists of a tree.
+    """
+    stack = [((), node)]
+    while stack:
+        path, node = stack.pop()
+        for key, value in _iter_children(node):
+            if isinstance(value, _ARRAY_TYPES):
+                yield (*path, key), value
+            elif isinstance(value, (*_CONTAINER_TYPES, DNode, LNode)):
+                stack.append(((*path, key), value))
+
+
+def _share_arrays(node):
+    """
+    Replace the arrays of a tree by read-only views, and its lazily loaded
+    arrays by `_SharedArray`, in place (so that the trees sharing its
+    containers hold them too).
+    """
+    for path, array in list(_array_items(node)):
+        if isinstance(array, np.ndarray):
+            if not array.flags.writeable:
+                continue
+            shared = _read_only(array)
+        elif isinstance(array, _SharedArray):
+            continue
+        else:
+            shared = _SharedArray(array)
+
+        parent = node
+        for key in path[:-1]:
+            parent = _container(parent)[key]
+        _container(parent)[path[-1]] = shared
+
+
+def copy_on_write(node):
+    """
+    Copy a tree, sharing its containers with the copy until either tree is written to.
+
+    Writes through the node API (setting attributes or items, deleting or
+    inserting items) copy the containers from the root of the tree to the node
+    written to first. The arrays are shared by both trees as read-only views
+    (the lazily loaded ones are not loaded, and load as read-only views), so
+    neither tree can write to them in place: assigning a new array (e.g. a
+    copy of the array) replaces it in one tree only. Other leaves (e.g. tables)
+    are shared as is.
+
+    Parameters
+    ----------
+    node : DNode or LNode
+        The root of the tree.
+
+    Returns
+    -------
+    DNode or LNode
+        The copy of the tree.
+    """
+    _share_arrays(node)
+    _share(node)
+    copy = _share_node(node)
+    copy._cow = _CopyOnWrite()
+
+    return copy
+
+
+class _Watch:
+    """
+    A watch on the containers of a tree, set once any of them is written to through the node API.
+        Caches derived from the contents of a tree (e.g. the CRDS parameters of
+        a datamodel) hold a watch on the containers they were computed from,
+        and only need to be recomputed once it is set. Writes made to the
+        underlying dicts and lists directly bypass the watch.
+    """
+
+    __slots__ = ("__weakref__", "containers", "written")
+
+    def __init__(self, node):
+        self.written = False
+        self.containers = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self.containers.add(container := id(_container(node)))
+            _WATCHES.setdefault(container, weakref.WeakSet()).add(self)
+            stack.extend(value for _, value in _iter_children(node) if isinstance(value, _NODE_TYPES))
+
+        weakref.finalize(self, _unwatch, self.containers)
+
+    def close(self):
+        """
+        Stop watching the containers.
+        """
+        for container in self.containers:
+            if (watches := _WATCHES.get(container)) is not None:
+                watches.discard(self)
+        _unwatch(self.containers)
+
+
+# The watches on each container, by id
+_WATCHES: dict[int, weakref.WeakSet[_Watch]] = {}
+
+
+def _unwatch(containers):
+    """
+    Discard the containers no longer watched.
+    """
+    for container in containers:
+        if (watches := _WATCHES.get(container)) is not None and not any(True for _ in watches):
+            del _WATCHES[container]
+
+
+def _forget_children(parent, key=None):
+    """
+    Discard the cached child wrapper for key, or all of them if key is None.
+        This is called on every write to a node, so the write also sets the
+        watches on the container of the node.
+    """
+    if _WATCHES and (watches := _WATCHES.get(id(_container(parent)))) is not None:
+        for watch in watches:
+            watch.written = True
+
+    try:
+        children = parent._children
+    except AttributeError:
+        return
+
+    if key is None:
+        children.clear()
+    else:
+        children.pop(key, None)
+
+
+def _iter_children(value):
+    """
+    Iterate over the (key, value) pairs of a container, without wrapping the values.
+    """
+    if isinstance(value, DNode):
+        return iter(value._data.items())
+
+    if isinstance(value, LNode):
+        return enumerate(value.data)
+
+    if isinstance(value, _DICT_TYPES):
+        return iter(value.items())
+
+    return enumerate(value)
+
+
+def _container(value):
+    """
+    Get the dict or list holding the data of a container.
+    """
+    if isinstance(value, DNode):
+        return value._data
+
+    if isinstance(value, LNode):
+        return value.data
+
+    return value
+
+
 def _unwrap(value):
     """
     Convert DNode to dict and LNode to list
@@ -45,6 +423,56 @@ def _unwrap(value):
     return value
 
 
+def _array_layout(value):
+    """
+    Get the shape and dtype of an array leaf (which can be changed in place), None for any other value.
+    """
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.dtype)
+
+    return None
+
+
+def _snapshot(node):
+    """
+    Take a snapshot of the items of all the containers of a tree, by path.
+        The snapshot holds the items themselves so that `_changes` can tell
+        by identity which of them were replaced since, however they were
+        written to (through the node API or the underlying dicts and lists).
+    """
+    snapshot = {}
+    stack = [((), node)]
+    while stack:
+        path, node = stack.pop()
+        items = snapshot[path] = [(key, value, _array_layout(value)) for key, value in _iter_children(node)]
+        stack.extend(((*path, key), value) for key, value, _ in items if isinstance(value, _NODE_TYPES))
+
+    return snapshot
+
+
+def _changes(snapshot, node):
+    """
+    Iterate over the paths of the items of a tree set, deleted or replaced since a snapshot of it.
+        Changes made in place to leaves other than the shape and dtype of
+        arrays (e.g. to the columns of a table) are not detected.
+    """
+    stack = [((), node)]
+    while stack:
+        path, node = stack.pop()
+        if (items := snapshot.get(path)) is None:
+            yield path
+            continue
+
+        previous = {key: (value, layout) for key, value, layout in items}
+        for key, value in _iter_children(node):
+            if (item := previous.pop(key, None)) is None or item[0] is not value or item[1] != _array_layout(value):
+                yield (*path, key)
+            elif isinstance(value, _NODE_TYPES):
+                stack.append(((*path, key), value))
+
+        yield from ((*path, key) for key in previous)
+
+
 class _NodeMixin:
     """
     Mixin class to provide the common API for all Node objects
@@ -70,15 +498,16 @@ class DNode(MutableMapping, _NodeMixin):
     Base class describing all "object" (dict-like) data nodes for STNode classes.
     """
 
-    __slots__ = ("_data", "_read_tag")
+    __slots__ = ("_children", "_cow", "_data", "_read_tag")
 
     def __init__(self, node=None):
         super().__init__(node)
+        self._cow = None
 
         # Handle if we are passed different data types
         if node is None:
             self._data = {}
-        elif isinstance(node, dict | AsdfDictNode):
+        elif isinstance(node, _DICT_TYPES):
             self._data = node
         else:
             raise ValueError("Initializer only accepts dicts")
@@ -96,7 +525,7 @@ class DNode(MutableMapping, _NodeMixin):
         # If the key is in the schema, then we can return the value
         if key in self._data:
             # Return objects as node classes, if applicable
-            return _wrap(self._data[key])
+            return _wrap_child(self, key, self._data[key])
 
         # Raise the correct error for the attribute not being found
         raise AttributeError(f"No such attribute ({key}) found in node: {type(self)}")
@@ -108,8 +537,12 @@ class DNode(MutableMapping, _NodeMixin):
 
         # Private keys should just be in the normal __dict__
         if key[0] != "_":
+            if _cow_state(self) is not None:
+                _own(self)
+
             # Finally set the value
             self._data[key] = _unwrap(value)
+            _forget_children(self, key)
         else:
             if key in DNode.__slots__:
                 DNode.__dict__[key].__set__(self, value)
@@ -126,19 +559,48 @@ class DNode(MutableMapping, _NodeMixin):
         else:
             raise AttributeError(f"No such attribute ({name}) found in node")
 
-    def _recursive_items(self):
-        def recurse(tree, path=None):
-            path = path or []  # Avoid mutable default arguments
-            if isinstance(tree, DNode | dict | AsdfDictNode):
-                for key, val in tree.items():
-                    yield from recurse(val, [*path, key])
-            elif isinstance(tree, LNode | list | tuple | AsdfListNode):
-                for i, val in enumerate(tree):
-                    yield from recurse(val, [*path, i])
-            elif tree is not None:
-                yield (".".join(str(x) for x in path), tree)
+    def _recursive_items(self, *, include_arrays=True, skip=None, max_depth=None):
+        """
+        Iterate over all the leaves of the tree as (dotted key, value) pairs.
+
+        The tree is traversed depth first, in order, using an explicit stack.
+        Pruned parts of the tree are never visited.
+
+        Parameters
+        ----------
+        include_arrays : bool
+            If False, array leaves are skipped (without accessing them).
 
-        yield from recurse(self)
+        skip : Iterable[str] or None
+            Dotted keys of items (leaves or whole subtrees) to skip.
+
+        max_depth : int or None
+            If provided, only descend this many levels into the tree, containers
+            below this depth are skipped.
+        """
+        skip = frozenset(skip or ())
+
+        stack = [("", iter(self._data.items()))]
+        while stack:
+            prefix, children = stack[-1]
+            for key, value in children:
+                path = f"{prefix}{key}"
+                if path in skip:
+                    continue
+
+                if isinstance(value, _NODE_TYPES):
+                    if max_depth is None or len(stack) < max_depth:
+                        stack.append((f"{path}.", _iter_children(value)))
+                        # Descend into the new container before continuing with this one
+                        break
+                    continue
+
+                if value is None or (not include_arrays and isinstance(value, _ARRAY_TYPES)):
+                    continue
+
+                yield path, value
+            else:
+                stack.pop()
 
     def to_flat_dict(self, include_arrays=True, recursive=False):
         """
@@ -162,14 +624,13 @@ class DNode(MutableMapping, _NodeMixin):
                 return str(val)
             return val
 
-        item_getter = self._recursive_items if recursive else self.items
+        if recursive:
+            return {key: convert_val(val) for (key, val) in self._recursive_items(include_arrays=include_arrays)}
 
         if include_arrays:
-            return {key: convert_val(val) for (key, val) in item_getter()}
+            return {key: convert_val(val) for (key, val) in self.items()}
         else:
-            return {
-                key: convert_val(val) for (key, val) in item_getter() if not isinstance(val, np.ndarray | ndarray.NDArrayType)
-            }
+            return {key: convert_val(val) for (key, val) in self.items() if not isinstance(val, _ARRAY_TYPES)}
 
     def __asdf_traverse__(self):
         """Asdf traverse method for things like info/search"""
@@ -182,17 +643,27 @@ class DNode(MutableMapping, _NodeMixin):
     def __getitem__(self, key):
         """Dictionary style access data"""
         if key in self._data:
-            return self._data[key]
+            value = self._data[key]
+            # Shared containers are wrapped so that writing to them copies them first
+            if isinstance(value, _NODE_TYPES) and _cow_state(self) is not None:
+                return _wrap_child(self, key, value)
+            return value
 
         raise KeyError(f"No such key ({key}) found in node")
 
     def __setitem__(self, key, value):
         """Dictionary style access set data"""
+        if _cow_state(self) is not None:
+            _own(self)
         self._data[key] = value
+        _forget_children(self, key)
 
     def __delitem__(self, key):
         """Dictionary style access delete data"""
+        if _cow_state(self) is not None:
+            _own(self)
         del self._data[key]
+        _forget_children(self, key)
 
     def __dir__(self):
         return set(super().__dir__()) | set(self._data.keys())
@@ -210,6 +681,7 @@ class DNode(MutableMapping, _NodeMixin):
         instance = self.__class__.__new__(self.__class__)
 
         instance._read_tag = self._read_tag
+        instance._cow = None
         instance._data = self._data.copy()
 
         return instance
@@ -220,14 +692,15 @@ class LNode(MutableSequence, _NodeMixin):
     Base class describing all "array" (list-like) data nodes for STNode classes.
     """
 
-    __slots__ = ("_read_tag", "data")
+    __slots__ = ("_children", "_cow", "_read_tag", "data")
 
     def __init__(self, node=None):
         super().__init__(node=node)
+        self._cow = None
 
         if node is None:
             self.data = []
-        elif isinstance(node, list | AsdfListNode):
+        elif isinstance(node, _LIST_TYPES):
             self.data = node
         elif isinstance(node, self.__class__):
             self.data = node.data
@@ -235,19 +708,31 @@ class LNode(MutableSequence, _NodeMixin):
             raise ValueError("Initializer only accepts lists")
 
     def __getitem__(self, index):
-        return _wrap(self.data[index])
+        if isinstance(index, slice):
+            return _wrap(self.data[index])
+
+        return _wrap_child(self, index, self.data[index])
 
     def __setitem__(self, index, value):
+        if _cow_state(self) is not None:
+            _own(self)
         self.data[index] = _unwrap(value)
+        _forget_children(self, None if isinstance(index, slice) else index)
 
     def __delitem__(self, index):
+        if _cow_state(self) is not None:
+            _own(self)
         del self.data[index]
+        _forget_children(self)
 
     def __len__(self):
         return len(self.data)
 
     def insert(self, index, value):
+        if _cow_state(self) is not None:
+            _own(self)
         self.data.insert(index, value)
+        _forget_children(self)
 
     def __asdf_traverse__(self):
         return list(self)
@@ -272,4 +757,9 @@ class LNode(MutableSequence, _NodeMixin):
 
         instance.data = self.data.copy()
         instance._read_tag = self._read_tag
+        instance._cow = None
         return instance
+
+
+# Containers traversed by DNode._recursive_items
+_NODE_TYPES = (*_CONTAINER_TYPES, tuple, DNode, LNode)
@@ -6,15 +6,77 @@ Hold all the registry information for the STNode classes.
 
 from __future__ import annotations
 
+from collections.abc import MutableMapping
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+
     from ._converters import _RomanConverter
     from ._tagged import TaggedListNode, TaggedObjectNode, TaggedScalarNode, tagged_type
 
+
+class _NodeClassesByTag(MutableMapping):
+    """
+    Mapping of tag_uri to STNode class.
+        Tags can be registered lazily, in which case the class for the tag is only
+        created (by the registered loader) the first time the tag is looked up.
+    """
+
+    def __init__(self) -> None:
+        self._patterns: dict[str, str | None] = {}
+        self._classes: dict[str, tagged_type] = {}
+        self._loader: Callable[[str], tagged_type] | None = None
+
+    def add_lazy(self, patterns: Mapping[str, str], loader: Callable[[str], tagged_type]) -> None:
+        """
+        Register tags whose classes will be created on first lookup.
+
+        Parameters
+        ----------
+        patterns : Mapping[str, str]
+            Mapping of tag_uri to the tag pattern the class is created for.
+
+        loader : Callable[[str], tagged_type]
+            Function to get the class for a tag pattern.
+        """
+        self._patterns.update(patterns)
+        self._loader = loader
+
+    def __getitem__(self, tag: str) -> tagged_type:
+        if (cls := self._classes.get(tag)) is not None:
+            return cls
+
+        if (pattern := self._patterns.get(tag)) is None or self._loader is None:
+            raise KeyError(tag)
+
+        cls = self._classes[tag] = self._loader(pattern)
+        return cls
+
+    def __setitem__(self, tag: str, cls: tagged_type) -> None:
+        self._patterns.setdefault(tag, None)
+        self._classes[tag] = cls
+
+    def __delitem__(self, tag: str) -> None:
+        del self._patterns[tag]
+        self._classes.pop(tag, None)
+
+    def __contains__(self, tag: object) -> bool:
+        return tag in self._patterns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._patterns)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self._classes)} of {len(self._patterns)} classes created)"
+
+
 OBJECT_NODE_CLASSES_BY_PATTERN: dict[str, type[TaggedObjectNode]] = {}
 LIST_NODE_CLASSES_BY_PATTERN: dict[str, type[TaggedListNode]] = {}
 SCALAR_NODE_CLASSES_BY_PATTERN: dict[str, type[TaggedScalarNode]] = {}
 NODE_CONVERTERS: dict[str, type[_RomanConverter]] = {}
-NODE_CLASSES_BY_TAG: dict[str, tagged_type] = {}
+NODE_CLASSES_BY_TAG: _NodeClassesByTag = _NodeClassesByTag()
 SCHEMA_URIS_BY_TAG: dict[str, str] = {}
@@ -7,27 +7,150 @@ from __future__ import annotations
 import copy
 import enum
 import functools
+import hashlib
+import json
+import math
 import re
 from collections.abc import Mapping, Sequence
-from typing import TYPE_CHECKING
+from importlib.metadata import entry_points
+from typing import TYPE_CHECKING, NamedTuple
 
 import asdf
 import asdf.schema
 from semantic_version import Version
 
+from ._cache import cache_key, load_cached, read_cache, write_cache
 from ._registry import NODE_CLASSES_BY_TAG, SCHEMA_URIS_BY_TAG
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any
 
-__all__ = ["get_latest_schema"]
+__all__ = ["SchemaCacheInfo", "get_latest_schema", "schema_cache_info", "warm_schema_cache"]
 
 
+ARRAY_MODES = ("zeros", "broadcast", "memmap")
+
 NOSTR = "?"
 NONUM = -999999
 NOBOOL = False
 
 
+class SchemaCacheInfo(NamedTuple):
+    """
+    Statistics for the resolved schema caches.
+
+    ``hits`` and ``misses`` count lookups of the in-memory cache, while
+    ``disk_hits`` and ``disk_misses`` count the loads which were (or were not)
+    served from the on-disk cache.
+    """
+
+    hits: int
+    misses: int
+    disk_hits: int
+    disk_misses: int
+
+
+_DISK_CACHE_STATS = {"disk_hits": 0, "disk_misses": 0}
+
+
+def _is_editable(dist):
+    """
+    Check if a distribution is an editable install (see PEP 610).
+    """
+    try:
+        direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+    except ValueError:
+        return False
+
+    return bool(direct_url.get("dir_info", {}).get("editable"))
+
+
+@functools.cache
+def _schema_cache_key():
+    """
+    The key for the on-disk schema cache.
+        Resolved schemas depend on every package providing ASDF resources so the
+        versions of all of them are part of the key. The resources of editable
+        installs may change without a version bump, so if any of the packages
+        is installed as editable, the contents of all the resources are part of
+        the key as well.
+    """
+    dists = {entry_point.dist.name: entry_point.dist for entry_point in entry_points(group="asdf.resource_mappings")}
+    providers = sorted(f"{name}=={dist.version}" for name, dist in dists.items())
+    if not any(_is_editable(dist) for dist in dists.values()):
+        return cache_key((), "schemas", asdf.__version__, *providers)
+
+    resource_manager = asdf.get_config().resource_manager
+    hasher = hashlib.sha256()
+    for uri in sorted(resource_manager):
+        hasher.update(uri.encode())
+        hasher.update(b"\0")
+        hasher.update(hashlib.sha256(resource_manager[uri]).digest())
+
+    return cache_key((), "schemas", asdf.__version__, *providers, hasher.hexdigest())
+
+
+def _load_schema(uri):
+    """
+    Load a schema with all its references resolved.
+        The resolved schema is read from the on-disk cache if possible, otherwise
+        it is loaded by ASDF and written to the cache.
+
+    Parameters
+    ----------
+    uri : str
+        The URI of the schema to load.
+    """
+    key = _schema_cache_key()
+    name = f"schemas/{hashlib.sha256(uri.encode()).hexdigest()}"
+
+    if (cached := read_cache(name, key)) is not None and cached[0] == uri:
+        _DISK_CACHE_STATS["disk_hits"] += 1
+        return cached[1]
+
+    _DISK_CACHE_STATS["disk_misses"] += 1
+    schema = asdf.schema.load_schema(uri, resolve_references=True)
+    write_cache(name, key, (uri, schema))
+
+    return schema
+
+
+def _build_latest_schema_index():
+    """
+    Build the index of the latest version of every versioned resource known to ASDF.
+
+    Returns
+    -------
+    dict
+        Mapping of URI prefix (the URI without the version) to the URI of the latest version.
+    """
+    latest = {}
+    for uri in asdf.get_config().resource_manager:
+        if "-" not in uri:
+            continue
+
+        uri_prefix, version = uri.rsplit("-", 1)
+        try:
+            version = Version(version)
+        except ValueError:
+            # Not a semantically versioned resource
+            continue
+
+        if uri_prefix not in latest or version > latest[uri_prefix][1]:
+            latest[uri_prefix] = (uri, version)
+
+    return {uri_prefix: uri for uri_prefix, (uri, _) in latest.items()}
+
+
+@functools.cache
+def _latest_schema_index():
+    """
+    Get the (cached) index of the latest version of each resource.
+    """
+    return load_cached("schema_index", _schema_cache_key(), _build_latest_schema_index)
+
+
 @functools.cache
 def get_latest_schema(uri: str) -> tuple[str, dict[str, Any]]:
     """
@@ -42,17 +165,16 @@ def get_latest_schema(uri: str) -> tuple[str, dict[str, Any]]:
         version = "0.0.0"
         latest_uri = None
 
-    uri_prefix += "-"
+    # Use the prebuilt index rather than searching all of ASDF's resources
     current_version = Version(version)
-    for schema_uri in asdf.get_config().resource_manager:
-        if schema_uri.startswith(uri_prefix) and (new_version := Version(schema_uri.rsplit("-", 1)[-1])) > current_version:
-            current_version = new_version
-            latest_uri = schema_uri
+    schema_uri = _latest_schema_index().get(uri_prefix)
+    if schema_uri is not None and Version(schema_uri.rsplit("-", 1)[-1]) > current_version:
+        latest_uri = schema_uri
 
     if latest_uri is None:
         raise ValueError(f"No schema found for {uri}")
 
-    return latest_uri, asdf.schema.load_schema(latest_uri, resolve_references=True)
+    return latest_uri, _load_schema(latest_uri)
 
 
 @functools.cache
@@ -67,7 +189,48 @@ def _get_schema_from_tag(tag):
     """
     schema_uri = SCHEMA_URIS_BY_TAG[tag]
 
-    return asdf.schema.load_schema(schema_uri, resolve_references=True)
+    return _load_schema(schema_uri)
+
+
+def warm_schema_cache(tags: Iterable[str] | None = None) -> SchemaCacheInfo:
+    """
+    Load the resolved schemas for tags so that they are cached both in memory
+    and on disk.
+
+    Parameters
+    ----------
+    tags : Iterable[str] or None
+        The tags whose schemas should be loaded, by default all the tags known
+        to roman_datamodels.
+
+    Returns
+    -------
+    SchemaCacheInfo
+        The cache statistics after warming the cache.
+    """
+    _latest_schema_index()
+    for tag in list(SCHEMA_URIS_BY_TAG) if tags is None else tags:
+        _get_schema_from_tag(tag)
+
+    return schema_cache_info()
+
+
+def schema_cache_info() -> SchemaCacheInfo:
+    """
+    Get the statistics for the resolved schema caches.
+
+    Returns
+    -------
+    SchemaCacheInfo
+        The number of hits and misses for the in-memory and on-disk caches.
+    """
+    hits = misses = 0
+    for function in (get_latest_schema, _get_schema_from_tag):
+        info = function.cache_info()
+        hits += info.hits
+        misses += info.misses
+
+    return SchemaCacheInfo(hits, misses, **_DISK_CACHE_STATS)
 
 
 class _MissingKeywordType:
@@ -248,6 +411,182 @@ _STRING_KEYWORDS = {"pattern", "minLength", "maxLength"}
 _NUMERIC_KEYWORDS = {"multipleOf", "maximum", "exclusiveMaximum", "minimum"}
 
 
+# Schema used for items with no schema of their own, this must never be modified
+_EMPTY_SCHEMA: dict[str, Any] = {}
+
+
+class BuildPlan(Mapping):
+    """
+    A schema compiled for use by a `Builder`.
+
+    Everything a builder needs to know about a schema (its type, required
+    property names, enum values, child plans, etc.) is computed the first time
+    it is needed and then stored on the plan. This way building repeatedly from
+    the same plan does not re-walk the schema each time.
+
+    Child plans are compiled on demand, so compiling a plan is cheap and only
+    the parts of the schema which are actually built are ever compiled.
+
+    The plan holds a reference to its schema, so the schemas of its children
+    remain alive (and their ids unique) for the lifetime of the plan.
+
+    The plan is also a read-only mapping of its schema, so ``Builder``
+    subclasses written for the ``from_*`` methods taking schemas work
+    unchanged with plans.
+    """
+
+    def __init__(self, schema, get_type):
+        self.schema = schema
+        self._get_type = get_type
+        self._children = {}
+        self._pattern_properties = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.type.name}, {self.schema!r})"
+
+    def __getitem__(self, key):
+        return self.schema[key]
+
+    def __iter__(self):
+        return iter(self.schema)
+
+    def __len__(self):
+        return len(self.schema)
+
+    def child(self, schema):
+        """
+        Get the plan for a subschema of this plan's schema.
+
+        Parameters
+        ----------
+        schema : dict
+            The subschema.
+
+        Returns
+        -------
+        BuildPlan
+        """
+        if (plan := self._children.get(id(schema))) is None:
+            plan = self._children[id(schema)] = BuildPlan(schema, self._get_type)
+        return plan
+
+    @functools.cached_property
+    def type(self):
+        return self._get_type(self.schema)
+
+    @functools.cached_property
+    def tag(self):
+        return _get_keyword(self.schema, "tag")
+
+    @functools.cached_property
+    def enum(self):
+        return _get_keyword(self.schema, "enum")
+
+    @functools.cached_property
+    def pattern(self):
+        return _get_keyword(self.schema, "pattern")
+
+    @functools.cached_property
+    def ndim(self):
+        return _get_keyword(self.schema, "ndim")
+
+    @functools.cached_property
+    def datatype(self):
+        return _get_keyword(self.schema, "datatype")
+
+    @functools.cached_property
+    def required(self):
+        return _get_required(self.schema)
+
+    @functools.cached_property
+    def properties(self):
+        """List of (name, plan) for the properties of an object"""
+        return [(name, self.child(subschema)) for name, subschema in _get_properties(self.schema)]
+
+    @functools.cached_property
+    def properties_by_name(self):
+        """Mapping of name to plan for the properties of an object"""
+        return dict(self.properties)
+
+    def pattern_properties(self, name):
+        """
+        Get the plans of the patternProperties matching a property name.
+
+        Parameters
+        ----------
+        name : str
+            Property name to check the patterns against.
+
+        Returns
+        -------
+        list of BuildPlan
+        """
+        if (plans := self._pattern_properties.get(name)) is None:
+            plans = self._pattern_properties[name] = [
+                self.child(subschema) for subschema in _get_pattern_properties(self.schema, name)
+            ]
+        return plans
+
+    def property_plans(self, name):
+        """
+        Get all the plans (properties then patternProperties) for a property name.
+
+        Parameters
+        ----------
+        name : str
+            Property name.
+
+        Returns
+        -------
+        list of BuildPlan
+        """
+        return [subplan for subname, subplan in self.properties if subname == name] + self.pattern_properties(name)
+
+    @functools.cached_property
+    def min_items(self):
+        return _get_keyword(self.schema, "minItems")
+
+    @functools.cached_property
+    def items(self):
+        """
+        The plan(s) for the items of an array.
+            A single plan if all the items share a schema, a list of plans
+            if items have individual schemas, or _MISSING_KEYWORD
+        """
+        items_keyword = _get_keyword(self.schema, "items")
+        if items_keyword is _MISSING_KEYWORD:
+            return items_keyword
+        if isinstance(items_keyword, dict):
+            return self.child(items_keyword)
+        return [self.child(subschema) for subschema in items_keyword]
+
+
+# Plans for the tagged schemas, by tag and builder class
+_PLANS_BY_TAG: dict[tuple[str, type[Builder]], BuildPlan] = {}
+
+
+def _get_plan_from_tag(tag, builder):
+    """
+    Get the (cached) build plan for the schema of a tag.
+
+    Parameters
+    ----------
+    tag : str
+        The tag_uri of the schema to build.
+
+    builder : Builder
+        The builder which will use the plan.
+
+    Returns
+    -------
+    BuildPlan
+    """
+    key = (tag, type(builder))
+    if (plan := _PLANS_BY_TAG.get(key)) is None:
+        plan = _PLANS_BY_TAG[key] = builder.compile(_get_schema_from_tag(tag))
+    return plan
+
+
 class Builder:
     """
     Class to build objects based on a schema (and optional defaults).
@@ -260,9 +599,15 @@ class Builder:
     When a default is available it will be used instead of any
     schema defined value but only if the item is required by the
     schema. Default values for non-required items are ignored.
+
+    Schemas are compiled into a `BuildPlan` before building, the
+    ``from_*`` and ``make_*`` methods are passed these plans (which are
+    mappings of their schemas) but also accept schemas, which are
+    compiled as they are passed.
     """
 
-    def get_type(self, schema):
+    @classmethod
+    def get_type(cls, schema):
         if _has_keyword(schema, "tag"):
             return SchemaType.TAGGED
         if defined_type := _get_keyword(schema, "type"):
@@ -280,33 +625,57 @@ class Builder:
             return SchemaType.NUMBER
         return SchemaType.UNKNOWN
 
+    def compile(self, schema):
+        """
+        Compile a schema into a plan for this builder.
+
+        Parameters
+        ----------
+        schema : dict
+            The schema (with all references resolved).
+
+        Returns
+        -------
+        BuildPlan
+        """
+        # Plans are cached (by builder class), so they hold the class rather than the builder
+        return BuildPlan(schema, type(self).get_type)
+
+    def _plan(self, schema):
+        """
+        Get the plan for a schema (or plan) passed to a ``from_*`` or ``make_*`` method.
+        """
+        return schema if isinstance(schema, BuildPlan) else self.compile(schema)
+
     def from_enum(self, schema):
-        if enum := _get_keyword(schema, "enum"):
+        plan = self._plan(schema)
+        if enum := plan.enum:
             if len(enum) == 1:
                 return enum[0]
         return _NO_VALUE
 
     def from_unknown(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is not _NO_VALUE:
             return copy.deepcopy(defaults)
         # even an unknown type can have an enum
-        if (enum := self.from_enum(schema)) is not _NO_VALUE:
+        if (enum := self.from_enum(plan)) is not _NO_VALUE:
             return enum
         return defaults
 
     def from_object(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is _NO_VALUE:
             defaults = {}
         obj = {}
-        required = _get_required(schema)
+        required = plan.required
         if not required:
             return obj
-        for name, subschema in _get_properties(schema):
+        for name, subplan in plan.properties:
             if name not in required:
                 continue
-            if (subdefaults := defaults.get(name, _NO_VALUE)) is not _NO_VALUE:
-                pass
-            if (value := self.build_node(subschema, subdefaults)) is _NO_VALUE:
+            subdefaults = defaults.get(name, _NO_VALUE)
+            if (value := self.build_node(subplan, subdefaults)) is _NO_VALUE:
                 continue
             if name in obj and isinstance(value, dict):
                 # blend the 2 dictionaries
@@ -315,8 +684,8 @@ class Builder:
                 obj[name] = value
         for name in required:
             subdefaults = defaults.get(name, _NO_VALUE)
-            for subschema in _get_pattern_properties(schema, name):
-                if (value := self.build_node(subschema, subdefaults)) is _NO_VALUE:
+            for subplan in plan.pattern_properties(name):
+                if (value := self.build_node(subplan, subdefaults)) is _NO_VALUE:
                     continue
                 if name in obj and isinstance(value, dict):
                     # blend the 2 dictionaries
@@ -326,11 +695,12 @@ class Builder:
         return obj
 
     def from_array(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is _NO_VALUE:
             defaults = []
         arr = []
 
-        min_items = _get_keyword(schema, "minItems")
+        min_items = plan.min_items
         if min_items is _MISSING_KEYWORD:
             return arr
 
@@ -340,46 +710,50 @@ class Builder:
         if len(arr) == min_items:
             return arr
 
-        items_keyword = _get_keyword(schema, "items")
-        if items_keyword is _MISSING_KEYWORD:
+        items = plan.items
+        if items is _MISSING_KEYWORD:
             return arr
-        if isinstance(items_keyword, dict):
-            item = self.build_node(items_keyword, _NO_VALUE)
+        if isinstance(items, BuildPlan):
+            item = self.build_node(items, _NO_VALUE)
             if item is _NO_VALUE:
                 return arr
             for _ in range(min_items - len(arr)):
                 arr.append(copy.deepcopy(item))
             return arr
 
-        for subitem in items_keyword[len(arr) : min_items]:
-            arr.append(self.build_node(subitem, _NO_VALUE))
+        for subplan in items[len(arr) : min_items]:
+            arr.append(self.build_node(subplan, _NO_VALUE))
         return arr
 
     def from_string(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is not _NO_VALUE:
             return defaults
-        if (enum := self.from_enum(schema)) is not _NO_VALUE:
+        if (enum := self.from_enum(plan)) is not _NO_VALUE:
             return enum
         return defaults
 
     def from_integer(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is not _NO_VALUE:
             return defaults
-        if (enum := self.from_enum(schema)) is not _NO_VALUE:
+        if (enum := self.from_enum(plan)) is not _NO_VALUE:
             return enum
         return defaults
 
     def from_number(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is not _NO_VALUE:
             return defaults
-        if (enum := self.from_enum(schema)) is not _NO_VALUE:
+        if (enum := self.from_enum(plan)) is not _NO_VALUE:
             return enum
         return defaults
 
     def from_boolean(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is not _NO_VALUE:
             return defaults
-        if (enum := self.from_enum(schema)) is not _NO_VALUE:
+        if (enum := self.from_enum(plan)) is not _NO_VALUE:
             return enum
         return defaults
 
@@ -387,7 +761,8 @@ class Builder:
         return None
 
     def from_tagged(self, schema, defaults):
-        tag = _get_keyword(schema, "tag")
+        plan = self._plan(schema)
+        tag = plan.tag
         if property_class := NODE_CLASSES_BY_TAG.get(tag):
             return property_class._create_minimal(defaults, builder=self, tag=tag)
         if defaults is not _NO_VALUE:
@@ -395,27 +770,31 @@ class Builder:
         return _NO_VALUE
 
     def build_node(self, schema, defaults):
-        match self.get_type(schema):
+        plan = self._plan(schema)
+        match plan.type:
             case SchemaType.UNKNOWN:
-                return self.from_unknown(schema, defaults)
+                return self.from_unknown(plan, defaults)
             case SchemaType.OBJECT:
-                return self.from_object(schema, defaults)
+                return self.from_object(plan, defaults)
             case SchemaType.ARRAY:
-                return self.from_array(schema, defaults)
+                return self.from_array(plan, defaults)
             case SchemaType.STRING:
-                return self.from_string(schema, defaults)
+                return self.from_string(plan, defaults)
             case SchemaType.INTEGER:
-                return self.from_integer(schema, defaults)
+                return self.from_integer(plan, defaults)
             case SchemaType.NUMBER:
-                return self.from_number(schema, defaults)
+                return self.from_number(plan, defaults)
             case SchemaType.BOOLEAN:
-                return self.from_boolean(schema, defaults)
+                return self.from_boolean(plan, defaults)
             case SchemaType.NULL:
-                return self.from_null(schema, defaults)
+                return self.from_null(plan, defaults)
             case SchemaType.TAGGED:
-                return self.from_tagged(schema, defaults)
+                return self.from_tagged(plan, defaults)
 
     def build(self, schema, defaults=_NO_VALUE):
+        """
+        Build an object from a schema or a `BuildPlan`.
+        """
         if defaults is None:
             defaults = _NO_VALUE
         return self.build_node(schema, defaults)
@@ -434,51 +813,68 @@ class FakeDataBuilder(Builder):
     If shape is not provided a 0-sized array with the required dimensions
     will be created. If shape is provided only the dimensions that match
     the required dimensions are used.
+
+    How the fake arrays are allocated is controlled by array_mode:
+        - "zeros": writeable arrays of zeros (the default)
+        - "broadcast": read-only views of a single zero, these use
+          no memory regardless of shape
+        - "memmap": writeable arrays of zeros backed by anonymous temporary
+          files, memory is only used for the parts which are accessed
     """
 
-    def __init__(self, shape=None):
+    def __init__(self, shape=None, array_mode="zeros"):
         super().__init__()
+        if array_mode not in ARRAY_MODES:
+            raise ValueError(f"Unknown array_mode {array_mode!r}, must be one of {ARRAY_MODES}")
         self._shape = shape
+        self._array_mode = array_mode
 
     def from_enum(self, schema):
-        if enum := _get_keyword(schema, "enum"):
+        plan = self._plan(schema)
+        if enum := plan.enum:
             return enum[0]
         return _NO_VALUE
 
     def from_string(self, schema, defaults):
-        if (value := super().from_string(schema, defaults)) is not _NO_VALUE:
+        plan = self._plan(schema)
+        if (value := super().from_string(plan, defaults)) is not _NO_VALUE:
             return value
-        if pattern := _get_keyword(schema, "pattern"):
+        if pattern := plan.pattern:
             if "WFI_IMAGE|" in pattern:
                 # this is special cased for p_exptype
                 return "WFI_IMAGE|"
         return NOSTR
 
     def from_unknown(self, schema, defaults):
-        if (value := super().from_unknown(schema, defaults)) is not _NO_VALUE:
+        plan = self._plan(schema)
+        if (value := super().from_unknown(plan, defaults)) is not _NO_VALUE:
             return value
-        if "ndim" in schema:
+        if "ndim" in plan.schema:
             # FIXME guidewindow is missing a tag for an array
-            return self.from_tagged(schema, defaults)
+            return self.from_tagged(plan, defaults)
         return _NO_VALUE
 
     def from_integer(self, schema, defaults):
-        if (value := super().from_integer(schema, defaults)) is not _NO_VALUE:
+        plan = self._plan(schema)
+        if (value := super().from_integer(plan, defaults)) is not _NO_VALUE:
             return value
         return int(NONUM)
 
     def from_number(self, schema, defaults):
-        if (value := super().from_number(schema, defaults)) is not _NO_VALUE:
+        plan = self._plan(schema)
+        if (value := super().from_number(plan, defaults)) is not _NO_VALUE:
             return value
         return float(NONUM)
 
     def from_boolean(self, schema, defaults):
-        if (value := super().from_boolean(schema, defaults)) is not _NO_VALUE:
+        plan = self._plan(schema)
+        if (value := super().from_boolean(plan, defaults)) is not _NO_VALUE:
             return value
         return NOBOOL
 
     def from_object(self, schema, defaults):
-        obj = super().from_object(schema, defaults)
+        plan = self._plan(schema)
+        obj = super().from_object(plan, defaults)
         if defaults:
             for k, v in defaults.items():
                 if k not in obj:
@@ -486,10 +882,11 @@ class FakeDataBuilder(Builder):
         return obj
 
     def from_tagged(self, schema, defaults):
-        tag = _get_keyword(schema, "tag")
+        plan = self._plan(schema)
+        tag = plan.tag
         if tag is _MISSING_KEYWORD:
             # FIXME a guidewindow array is missing a tag
-            if _get_keyword(schema, "ndim"):
+            if plan.ndim:
                 tag = "tag:stsci.edu:asdf/core/ndarray-1.*"
             else:
                 return _NO_VALUE
@@ -499,15 +896,15 @@ class FakeDataBuilder(Builder):
         if defaults is not _NO_VALUE:
             return copy.deepcopy(defaults)
         if tag == "tag:stsci.edu:asdf/time/time-1.*":
-            return self.make_time(schema, defaults)
+            return self.make_time(plan, defaults)
         if tag == "tag:stsci.edu:asdf/core/ndarray-1.*":
-            return self.make_array(schema, defaults)
+            return self.make_array(plan, defaults)
         if tag == "tag:stsci.edu:gwcs/wcs-*":
-            return self.make_wcs(schema, defaults)
+            return self.make_wcs(plan, defaults)
         if tag == "tag:astropy.org:astropy/table/table-1.*":
-            return self.make_table(schema, defaults)
+            return self.make_table(plan, defaults)
         if tag == "tag:stsci.edu:asdf/unit/quantity-1.*":
-            return self.make_quantity(schema, defaults)
+            return self.make_quantity(plan, defaults)
         return _NO_VALUE
 
     def make_time(self, schema, defaults):
@@ -516,17 +913,32 @@ class FakeDataBuilder(Builder):
         return Time("2020-01-01T00:00:00.0", format="isot", scale="utc")
 
     def make_array(self, schema, defaults):
+        plan = self._plan(schema)
         import numpy as np
 
-        ndim = _get_keyword(schema, "ndim") or 0
-        dtype = _get_keyword(schema, "datatype") or "float32"
+        ndim = plan.ndim or 0
+        dtype = plan.datatype or "float32"
         shape = [0] * ndim
         if self._shape is not None:
             for i, v in enumerate(self._shape):
                 if i == len(shape):
                     break
                 shape[i] = v
-        return np.zeros(shape, dtype=asdf.tags.core.ndarray.asdf_datatype_to_numpy_dtype(dtype))
+        dtype = asdf.tags.core.ndarray.asdf_datatype_to_numpy_dtype(dtype)
+
+        if self._array_mode == "broadcast":
+            return np.broadcast_to(np.zeros((), dtype=dtype), shape)
+
+        if self._array_mode == "memmap" and math.prod(shape):
+            import tempfile
+
+            # The mapping keeps the (already deleted) file alive until the array
+            #    is garbage collected. ASDF only serializes exact ndarrays, so
+            #    return a plain view of the memmap.
+            with tempfile.TemporaryFile() as scratch:
+                return np.memmap(scratch, dtype=dtype, mode="w+", shape=tuple(shape)).view(np.ndarray)
+
+        return np.zeros(shape, dtype=dtype)
 
     def make_wcs(self, schema, defaults):
         from astropy import coordinates
@@ -557,12 +969,13 @@ class FakeDataBuilder(Builder):
         return Table()
 
     def make_quantity(self, schema, defaults):
+        plan = self._plan(schema)
         import astropy.units as u
         import numpy as np
 
-        props = dict(_get_properties(schema))
-        unit = props.get("unit", {}).get("enum", ["dn"])[0]
-        arr = self.make_array(props.get("value", {}), defaults)
+        props = plan.properties_by_name
+        unit = props["unit"].schema.get("enum", ["dn"])[0] if "unit" in props else "dn"
+        arr = self.make_array(props.get("value") or plan.child(_EMPTY_SCHEMA), defaults)
         if arr.size < 2:
             # astropy will convert 1 and 0 item quantities to scalars
             # which will fail asdf validation (since these aren't arrays)
@@ -587,6 +1000,7 @@ class NodeBuilder(Builder):
         return self._copy_default(defaults)
 
     def from_object(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is _NO_VALUE:
             return defaults
 
@@ -595,16 +1009,17 @@ class NodeBuilder(Builder):
 
         obj = {}
 
-        subschemas = dict(_get_properties(schema))
+        subplans = plan.properties_by_name
         for name, subdefaults in defaults.items():
-            if name in subschemas:
-                subschema = subschemas[name]
+            if name in subplans:
+                subplan = subplans[name]
             else:
-                subschema = next(_get_pattern_properties(schema, name), {})
-            obj[name] = self.build_node(subschema, subdefaults)
+                subplan = next(iter(plan.pattern_properties(name)), None) or plan.child(_EMPTY_SCHEMA)
+            obj[name] = self.build_node(subplan, subdefaults)
         return obj
 
     def from_array(self, schema, defaults):
+        plan = self._plan(schema)
         if defaults is _NO_VALUE:
             return defaults
 
@@ -612,23 +1027,23 @@ class NodeBuilder(Builder):
             return self._copy_default(defaults)
 
         # don't consider minItem maxItems, consider items
-        items_keyword = _get_keyword(schema, "items")
-        if items_keyword is _MISSING_KEYWORD:
+        items = plan.items
+        if items is _MISSING_KEYWORD:
             return self._copy_default(defaults)
 
-        if isinstance(items_keyword, dict):
+        if isinstance(items, BuildPlan):
             # single schema for all items
-            subschemas = {}
-            default_subschema = items_keyword
+            subplans = {}
+            default_subplan = items
         else:
             # (possibly only some) items have schemas
-            subschemas = dict(enumerate(items_keyword))
-            default_subschema = {}
+            subplans = dict(enumerate(items))
+            default_subplan = plan.child(_EMPTY_SCHEMA)
 
         arr = []
         for index, subitem in enumerate(defaults):
-            subschema = subschemas.get(index, default_subschema)
-            arr.append(self.build_node(subschema, subitem))
+            subplan = subplans.get(index, default_subplan)
+            arr.append(self.build_node(subplan, subitem))
         return arr
 
     def from_string(self, schema, defaults):
@@ -647,7 +1062,8 @@ class NodeBuilder(Builder):
         return self._copy_default(defaults)
 
     def from_tagged(self, schema, defaults):
-        tag = _get_keyword(schema, "tag")
+        plan = self._plan(schema)
+        tag = plan.tag
         if property_class := NODE_CLASSES_BY_TAG.get(tag):
             try:
                 return property_class._create_from_node(defaults, builder=self)
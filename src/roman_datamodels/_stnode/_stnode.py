@@ -4,15 +4,22 @@ Dynamic creation of STNode classes from the RAD manifest.
     Unfortunately, this is a dynamic process which occurs at first import time because
     roman_datamodels cannot predict what STNode objects will be in the version of RAD
     used by the user.
+
+Creating every class is a noticeable part of the import time, so if the
+    ``ROMAN_DATAMODELS_LAZY_NODES`` environment variable is set the classes are instead
+    only created when they are first requested, see ``roman_datamodels._stnode.__getattr__``.
 """
 
+import functools
 import importlib.resources
+import os
 from pathlib import Path
 
 import yaml
 from rad import resources
 
-from ._factories import stnode_factory
+from ._cache import cache_key, load_cached
+from ._factories import base_class_from_tag, class_name_from_tag_uri, stnode_factory
 from ._registry import (
     LIST_NODE_CLASSES_BY_PATTERN,
     NODE_CLASSES_BY_TAG,
@@ -21,7 +28,7 @@ from ._registry import (
     SCHEMA_URIS_BY_TAG,
 )
 
-__all__ = ["NODE_CLASSES"]
+__all__: list[str] = []
 
 
 # Load the manifest directly from the rad resources and not from ASDF.
@@ -30,11 +37,58 @@ __all__ = ["NODE_CLASSES"]
 _MANIFEST_DIR = Path(str(importlib.resources.files(resources) / "manifests"))
 # sort manifests by version (newest first)
 _STATIC_MANIFEST_PATHS = sorted([path for path in _MANIFEST_DIR.glob("*static-*.yaml")], reverse=True)
-_STATIC_MANIFESTS = [yaml.safe_load(path.read_bytes()) for path in _STATIC_MANIFEST_PATHS]
 _DATAMODEL_MANIFEST_PATHS = sorted([path for path in _MANIFEST_DIR.glob("*datamodels-*.yaml")], reverse=True)
-_DATAMODEL_MANIFESTS = [yaml.safe_load(path.read_bytes()) for path in _DATAMODEL_MANIFEST_PATHS]
 # Notice that the static manifests are first so that we defer to them
-_MANIFESTS = _STATIC_MANIFESTS + _DATAMODEL_MANIFESTS
+_MANIFEST_PATHS = _STATIC_MANIFEST_PATHS + _DATAMODEL_MANIFEST_PATHS
+
+
+def _build_tag_table(manifest_paths):
+    """
+    Digest the RAD manifests into the table of information needed to create the
+        STNode classes.
+
+    Parameters
+    ----------
+    manifest_paths : list[Path]
+        Paths to the manifests, in priority order.
+
+    Returns
+    -------
+    dict
+        The tag table, this only contains builtin types so that it can be cached.
+    """
+    manifests = [yaml.safe_load(path.read_bytes()) for path in manifest_paths]
+
+    schema_uris = {}
+    patterns = {}
+    nodes = {}
+    for manifest in manifests:
+        for tag_def in manifest["tags"]:
+            schema_uris[tag_def["tag_uri"]] = tag_def["schema_uri"]
+            base = tag_def["tag_uri"].rsplit("-", maxsplit=1)[0]
+
+            # make pattern from tag
+            pattern = f"{base}-*"
+            if pattern not in nodes:
+                nodes[pattern] = {
+                    "class_name": class_name_from_tag_uri(pattern),
+                    "manifest_uri": manifest["id"],
+                    "tag_def": tag_def,
+                }
+            patterns[tag_def["tag_uri"]] = pattern
+
+    return {
+        "manifests": manifests,
+        "schema_uris": schema_uris,
+        "patterns": patterns,
+        "nodes": nodes,
+    }
+
+
+# Reading the manifests is expensive, so the digested tag table is cached on disk
+#   and only rebuilt if RAD, roman_datamodels, or the manifests themselves change.
+_TAG_TABLE = load_cached("stnode_tags", cache_key(_MANIFEST_PATHS), functools.partial(_build_tag_table, _MANIFEST_PATHS))
+_MANIFESTS = _TAG_TABLE["manifests"]
 
 
 def _factory(pattern, latest_manifest, tag_def):
@@ -50,26 +104,109 @@ def _factory(pattern, latest_manifest, tag_def):
     return cls
 
 
-# Main dynamic class creation loop
-#   Reads each tag entry from the manifest and creates a class for it
+# Lookups for the node classes which do not require the classes to exist
+_PATTERNS_BY_CLASS_NAME = {node["class_name"]: pattern for pattern, node in _TAG_TABLE["nodes"].items()}
+_BASE_CLASSES_BY_PATTERN = {
+    pattern: base_class_from_tag(pattern, node["tag_def"]) for pattern, node in _TAG_TABLE["nodes"].items()
+}
+
 _generated = {}
-for manifest in _MANIFESTS:
-    manifest_uri = manifest["id"]
-    for tag_def in manifest["tags"]:
-        SCHEMA_URIS_BY_TAG[tag_def["tag_uri"]] = tag_def["schema_uri"]
-        base, version = tag_def["tag_uri"].rsplit("-", maxsplit=1)
-
-        # make pattern from tag
-        pattern = f"{base}-*"
-        if pattern not in _generated:
-            _generated[pattern] = _factory(pattern, manifest_uri, tag_def)
-        NODE_CLASSES_BY_TAG[tag_def["tag_uri"]] = _generated[pattern]
-
-
-# List of node classes made available by this library.
-#   This is part of the public API.
-NODE_CLASSES = (
-    list(OBJECT_NODE_CLASSES_BY_PATTERN.values())
-    + list(LIST_NODE_CLASSES_BY_PATTERN.values())
-    + list(SCALAR_NODE_CLASSES_BY_PATTERN.values())
-)
+
+
+def _node_class(pattern):
+    """
+    Get the node class for a tag pattern, creating it if it does not exist yet.
+
+    Parameters
+    ----------
+    pattern : str
+        A tag pattern/wildcard from the tag table
+
+    Returns
+    -------
+    The node class for the pattern
+    """
+    if (cls := _generated.get(pattern)) is None:
+        node = _TAG_TABLE["nodes"][pattern]
+        cls = _generated[pattern] = _factory(pattern, node["manifest_uri"], node["tag_def"])
+
+    return cls
+
+
+def _node_class_by_name(name):
+    """
+    Get the node class for a class name, creating it if it does not exist yet.
+
+    Parameters
+    ----------
+    name : str
+        The name of the node class
+
+    Returns
+    -------
+    The node class or None if there is no node class with that name
+    """
+    if (pattern := _PATTERNS_BY_CLASS_NAME.get(name)) is None:
+        return None
+
+    return _node_class(pattern)
+
+
+def _node_types(base_class):
+    """
+    Get the types for all the node classes derived from a base class, for use
+        by the ASDF converters.
+
+    Classes which have not been created yet are given by their class path (within
+        this module) so that ASDF can find them once they have been created without
+        forcing them to be created.
+
+    Parameters
+    ----------
+    base_class : type
+        TaggedObjectNode, TaggedListNode, or TaggedScalarNode
+
+    Returns
+    -------
+    dict
+        Mapping of tag pattern to class or class path
+    """
+    return {
+        pattern: _generated[pattern] if pattern in _generated else f"{__name__}.{_TAG_TABLE['nodes'][pattern]['class_name']}"
+        for pattern, base in _BASE_CLASSES_BY_PATTERN.items()
+        if base is base_class
+    }
+
+
+def _node_classes():
+    """
+    Create all the node classes.
+
+    Returns
+    -------
+    list
+        All the node classes
+    """
+    for pattern in _TAG_TABLE["nodes"]:
+        _node_class(pattern)
+
+    return (
+        list(OBJECT_NODE_CLASSES_BY_PATTERN.values())
+        + list(LIST_NODE_CLASSES_BY_PATTERN.values())
+        + list(SCALAR_NODE_CLASSES_BY_PATTERN.values())
+    )
+
+
+# Register all the tags, the classes will be created on first lookup
+SCHEMA_URIS_BY_TAG.update(_TAG_TABLE["schema_uris"])
+NODE_CLASSES_BY_TAG.add_lazy(_TAG_TABLE["patterns"], _node_class)
+
+# In lazy mode the node classes are only created when they are first requested,
+#   either by name from `roman_datamodels._stnode` or by tag via NODE_CLASSES_BY_TAG.
+_LAZY_NODES = bool(os.environ.get("ROMAN_DATAMODELS_LAZY_NODES"))
+
+if not _LAZY_NODES:
+    # List of node classes made available by this library.
+    #   This is part of the public API.
+    NODE_CLASSES = _node_classes()
+    __all__.append("NODE_CLASSES")
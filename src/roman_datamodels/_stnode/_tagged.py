@@ -15,7 +15,7 @@ from ._registry import (
     OBJECT_NODE_CLASSES_BY_PATTERN,
     SCALAR_NODE_CLASSES_BY_PATTERN,
 )
-from ._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, _get_schema_from_tag
+from ._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, _get_plan_from_tag, _get_schema_from_tag
 
 if TYPE_CHECKING:
     from collections.abc import Mapping, MutableMapping
@@ -69,7 +69,7 @@ class _TaggedNodeMixin(NodeMixin):
         cls, defaults: Mapping[str, Any] | None = None, builder: Builder | None = None, *, tag: str | None = None
     ) -> Self:
         builder = builder or Builder()
-        new = cls(builder.build(_get_schema_from_tag(tag or cls._default_tag), defaults))
+        new = cls(builder.build(_get_plan_from_tag(tag or cls._default_tag, builder), defaults))
 
         if tag:
             new._read_tag = tag
@@ -109,7 +109,12 @@ class _TaggedNodeMixin(NodeMixin):
 
     @classmethod
     def create_fake_data(
-        cls, defaults: Mapping[str, Any] | None = None, shape: tuple[int, ...] | None = None, *, tag: str | None = None
+        cls,
+        defaults: Mapping[str, Any] | None = None,
+        shape: tuple[int, ...] | None = None,
+        *,
+        tag: str | None = None,
+        array_mode: str = "zeros",
     ) -> Self:
         """
         Create an instance of this class with with all required attributes
@@ -123,13 +128,16 @@ class _TaggedNodeMixin(NodeMixin):
             The shape of the data to create
         tag: str | None
             The tag to use when creating the instance. If None, the default tag for the class will be used.
+        array_mode: str
+            How the fake arrays are allocated, one of "zeros", "broadcast" or "memmap".
+            See `FakeDataBuilder` for details.
 
         Returns
         -------
         Self
             An instance of this class
         """
-        return cls._create_fake_data(defaults, shape, tag=tag)
+        return cls._create_fake_data(defaults, shape, FakeDataBuilder(shape, array_mode), tag=tag)
 
     @classmethod
     def _create_from_node(cls, node: MutableMapping[str, Any], builder: Builder | None = None, *, tag: str | None = None) -> Self:
@@ -236,7 +244,7 @@ class TaggedScalarNode(_TaggedNodeMixin):
     @classmethod
     def _create_minimal(cls, defaults=None, builder=None, *, tag: str | None = None):
         builder = builder or Builder()
-        value = builder.build(_get_schema_from_tag(tag or cls._default_tag), defaults)
+        value = builder.build(_get_plan_from_tag(tag or cls._default_tag, builder), defaults)
         if value is _NO_VALUE:
             return value
 
@@ -0,0 +1,259 @@
+"""
+Templates used to speed up repeated creation of fake data.
+    Building fake data walks the schemas and constructs several expensive objects
+    (gwcs, tables, times, etc). As the fake data for a given node class, tag and
+    shape is always the same, it is built once as a template which is then cloned
+    for each request, with any defaults applied on top of the clone. Only the
+    most recently used templates are kept.
+"""
+
+from __future__ import annotations
+
+import copy
+import pickle
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ._node import DNode, LNode
+from ._schema import _NO_VALUE, FakeDataBuilder, _get_plan_from_tag
+from ._tagged import TaggedObjectNode
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from ._schema import BuildPlan
+
+__all__ = ["clear_fake_data_cache"]
+
+# Templates by (node class, tag, shape, array mode), from the least to the most recently used
+_TEMPLATES: OrderedDict[tuple[type[TaggedObjectNode], str | None, tuple[int, ...] | None, str], TaggedObjectNode] = OrderedDict()
+
+# The maximum number of templates kept
+_MAX_TEMPLATES = 16
+
+# Leaf values which can be shared between the template and its clones
+_IMMUTABLE = (str, bytes, int, float, complex, np.generic, type(None))
+
+
+class _Pickled:
+    """
+    A template leaf stored in pickled form.
+        Restoring complex objects (gwcs, tables) from a pickle is several times
+        faster than deep copying them.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class _Zeros:
+    """
+    A template array of zeros.
+        Allocating a new array of zeros does not touch its memory until it is
+        written to, unlike copying an existing array.
+    """
+
+    __slots__ = ("dtype", "shape")
+
+    def __init__(self, shape: tuple[int, ...], dtype: np.dtype):
+        self.shape = shape
+        self.dtype = dtype
+
+
+def clear_fake_data_cache() -> None:
+    """
+    Clear the templates used by ``create_fake_data``.
+    """
+    _TEMPLATES.clear()
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Prepare a tree for use as a template by pickling the mutable leaves which
+    can be restored faithfully.
+    """
+    if type(value) is np.ndarray and value.flags.writeable and value.dtype.fields is None and not value.any():
+        return _Zeros(value.shape, value.dtype)
+
+    if isinstance(value, (*_IMMUTABLE, np.ndarray)):
+        return value
+
+    if isinstance(value, DNode):
+        value._data = {key: _freeze(item) for key, item in value._data.items()}
+        return value
+
+    if isinstance(value, LNode):
+        value.data = [_freeze(item) for item in value.data]
+        return value
+
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        # Subclasses may not survive the round trip, (e.g. tagged times)
+        if type(pickle.loads(data)) is not type(value):  # noqa: S301
+            return value
+    except Exception:  # noqa: BLE001
+        return value
+
+    return _Pickled(data)
+
+
+def _clone(value: Any) -> Any:
+    """
+    Clone a template, copying all the containers and mutable leaves.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+
+    if isinstance(value, _Zeros):
+        return np.zeros(value.shape, dtype=value.dtype)
+
+    if isinstance(value, _Pickled):
+        # Only data pickled by _freeze is ever loaded
+        return pickle.loads(value.data)  # noqa: S301
+
+    if isinstance(value, DNode):
+        new = value.__class__.__new__(value.__class__)
+        new._read_tag = value._read_tag
+        new._cow = None
+        new._data = {key: _clone(item) for key, item in value._data.items()}
+        return new
+
+    if isinstance(value, LNode):
+        new = value.__class__.__new__(value.__class__)
+        new._read_tag = value._read_tag
+        new._cow = None
+        new.data = [_clone(item) for item in value.data]
+        return new
+
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+
+    if isinstance(value, np.ndarray):
+        # Read-only arrays (e.g. broadcast fake arrays) can safely be shared
+        return value.copy() if value.flags.writeable else value
+
+    return copy.deepcopy(value)
+
+
+def _has_default_creation(node: Any) -> bool:
+    """
+    Check if a (cloned) template node was created by the schema alone, meaning
+    defaults can be applied to it in place.
+        Node classes which customize _create_minimal may use the defaults in
+        other ways so they have to be rebuilt instead.
+    """
+    if isinstance(node, TaggedObjectNode):
+        return type(node)._create_minimal.__func__ is TaggedObjectNode._create_minimal.__func__
+
+    return isinstance(node, dict)
+
+
+def _build_property(plans: list[BuildPlan], name: str, defaults: Any, builder: FakeDataBuilder) -> Any:
+    """
+    Build a single property from its defaults the same way `Builder.from_object` does.
+    """
+    value = _NO_VALUE
+    for plan in plans:
+        for subplan in plan.property_plans(name):
+            if (subvalue := builder.build_node(subplan, defaults)) is _NO_VALUE:
+                continue
+            if value is not _NO_VALUE and isinstance(subvalue, dict):
+                # blend the 2 dictionaries
+                value |= subvalue
+            else:
+                value = subvalue
+
+    return copy.deepcopy(defaults) if value is _NO_VALUE else value
+
+
+def _apply_defaults(node: Any, plans: list[BuildPlan], defaults: Mapping[str, Any], builder: FakeDataBuilder) -> None:
+    """
+    Apply defaults to a cloned template so that the result matches building
+    with those defaults. Only the parts of the template the defaults touch are
+    rebuilt.
+    """
+    for name, value in defaults.items():
+        if name not in node:
+            node[name] = copy.deepcopy(value)
+            continue
+
+        current = node[name]
+        if isinstance(value, Mapping) and _has_default_creation(current):
+            if isinstance(current, TaggedObjectNode):
+                subplans = [_get_plan_from_tag(current.tag, builder)]
+            else:
+                subplans = [subplan for plan in plans for subplan in plan.property_plans(name)]
+            _apply_defaults(current, subplans, value, builder)
+        else:
+            node[name] = _build_property(plans, name, value, builder)
+
+
+def create_fake_data_from_template(
+    node_class: type[TaggedObjectNode],
+    defaults: Mapping[str, Any] | None = None,
+    shape: tuple[int, ...] | None = None,
+    *,
+    tag: str | None = None,
+    array_mode: str = "zeros",
+) -> TaggedObjectNode:
+    """
+    Create fake data by cloning a template, this is equivalent to
+    ``node_class.create_fake_data(defaults, shape, tag=tag, array_mode=array_mode)``.
+
+    Parameters
+    ----------
+    node_class : type[TaggedObjectNode]
+        The node class to create.
+
+    defaults : Mapping[str, Any] | None
+        A mapping of default values to apply to the fake data.
+
+    shape : tuple[int, ...] | None
+        The shape of the data to create.
+
+    tag : str | None
+        The tag to use when creating the node.
+
+    array_mode : str
+        How the fake arrays are allocated, see `FakeDataBuilder`.
+
+    Returns
+    -------
+    TaggedObjectNode
+    """
+    if array_mode == "memmap":
+        # Each model needs its own scratch files, and cloning would touch every page
+        return node_class.create_fake_data(defaults, shape, tag=tag, array_mode=array_mode)
+
+    shape = None if shape is None else tuple(shape)
+    key = (node_class, tag, shape, array_mode)
+    if (template := _TEMPLATES.get(key)) is None:
+        template = _TEMPLATES[key] = _freeze(node_class.create_fake_data(shape=shape, tag=tag, array_mode=array_mode))
+        if len(_TEMPLATES) > _MAX_TEMPLATES:
+            _TEMPLATES.popitem(last=False)
+    else:
+        _TEMPLATES.move_to_end(key)
+
+    node = _clone(template)
+    if defaults:
+        if not _has_default_creation(node):
+            return node_class.create_fake_data(defaults, shape, tag=tag, array_mode=array_mode)
+
+        builder = FakeDataBuilder(shape, array_mode)
+        _apply_defaults(node, [_get_plan_from_tag(node.tag, builder)], defaults, builder)
+
+    return node
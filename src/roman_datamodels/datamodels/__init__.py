@@ -1,5 +1,8 @@
 from ._core import *  # noqa: F403
 from ._datamodels import *  # noqa: F403
+from ._diff import *  # noqa: F403
+from ._parquet import *  # noqa: F403
+from ._streaming import StreamedArray  # noqa: F401
 
 # rename rdm_open to open to match the current roman_datamodels API
 from ._utils import FilenameMismatchWarning  # noqa: F401
@@ -0,0 +1,424 @@
+"""
+Compression of the array blocks written to ASDF files.
+    `array_compressions` resolves the compression of each array in a tree from
+    a policy keyed by path and dtype, the ``"auto"`` compression picks one by
+    compressing a sample of the array.
+
+    asdf compresses the blocks of a file one after the other on a single
+    thread. Within `parallel_compression` the blocks of a tree are instead
+    compressed ahead of time by a pool of threads. Only lz4 blocks are split
+    (into the same chunks asdf compresses separately), a zlib or bz2 block is
+    compressed by a single thread, so for these the workers only help files
+    with several blocks. The lz4, zlib and bz2 compressors release the GIL and
+    the bytes written are exactly the ones asdf would write, so the blocks
+    read back exactly the same.
+
+    The parallel compressors are asdf compressors with the labels of asdf's
+    builtin ones, which asdf looks up before its builtins. They are added to
+    the asdf configuration of the writing thread only, and the extension
+    providing them is installed without compressors, so that the files which
+    record it in their history read back without warnings. asdf warns about
+    compressors sharing the labels of its builtin ones, which is ignored for
+    these labels once compressing in parallel.
+"""
+
+from __future__ import annotations
+
+import bz2
+import functools
+import struct
+import threading
+import warnings
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import asdf
+import lz4.block
+import numpy as np
+from asdf.exceptions import AsdfWarning
+from asdf.extension import Compressor, Extension
+from astropy.table import Table
+
+from roman_datamodels._stnode._node import _ARRAY_TYPES
+
+from ._streaming import StreamedArray
+from ._tiles import tile_compression
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator, Mapping
+    from concurrent.futures import Future
+    from typing import Any
+
+    from roman_datamodels._stnode import DNode
+
+__all__ = ["PARALLEL_EXTENSION", "array_compressions", "parallel_compression"]
+
+# The "auto" compression uses lz4 unless it saves less than this fraction of a sample of the array
+_AUTO_MIN_SAVING = 0.1
+
+# The (maximum) number of bytes of an array the "auto" compression samples, in 4 evenly spaced windows
+_AUTO_SAMPLE_SIZE = 1 << 20
+_AUTO_SAMPLE_WINDOWS = 4
+
+# The size of the chunks asdf's lz4 compressor compresses separately
+_LZ4_BLOCK_SIZE = 1 << 22
+
+# The number of compression tasks (e.g. lz4 chunks) kept in flight by each thread compressing
+_TASKS_PER_WORKER = 2
+
+# The labels of the builtin asdf compressors which can be parallelized
+_COMPRESSORS = ("lz4", "zlib", "bzp2")
+
+# asdf warns about every block compressed while the parallel compressors share the labels of its builtin ones
+_DUPLICATE_WARNING = 'Found more than one compressor for "(lz4|zlib|bzp2)"'
+
+# The parallel compression for the current thread, if any
+_LOCAL = threading.local()
+
+
+def _compress_lz4(chunk: np.ndarray, mode: str = "default", **kwargs: Any) -> bytes:
+    """
+    Compress a chunk of an lz4 block, including its length header.
+    """
+    output = lz4.block.compress(chunk, mode=mode, **kwargs)
+    return struct.pack("!I", len(output)) + output
+
+
+def _split(data: np.ndarray, compression: str, kwargs: dict[str, Any]) -> list[Callable[[], bytes]]:
+    """
+    Split compressing a block into tasks which produce its compressed bytes in order.
+    """
+    if compression == "lz4":
+        kwargs = dict(kwargs)
+        nelem = kwargs.pop("compression_block_size", _LZ4_BLOCK_SIZE) // data.itemsize
+        return [functools.partial(_compress_lz4, data[index : index + nelem], **kwargs) for index in range(0, len(data), nelem)]
+
+    if compression == "zlib":
+        return [functools.partial(zlib.compress, data, **kwargs)]
+
+    return [functools.partial(bz2.compress, data, **kwargs)]
+
+
+def _key(data: Any, compression: str, kwargs: dict[str, Any]) -> tuple | None:
+    """
+    The key identifying the compressed form of a block, None if it cannot be identified.
+    """
+    if not isinstance(data, np.ndarray):
+        return None
+
+    try:
+        return (data.__array_interface__["data"][0], data.nbytes, compression, frozenset(kwargs.items()))
+    except TypeError:
+        return None
+
+
+def _block_data(array: np.ndarray) -> np.ndarray | None:
+    """
+    Get the bytes asdf will write to the block for an array, if they can be
+    obtained without copying.
+    """
+    base = array
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+
+    if not (base.flags.c_contiguous or base.flags.f_contiguous) or base.nbytes == 0:
+        return None
+
+    return np.ndarray(-1, np.uint8, base.ravel(order="K").data)
+
+
+def _auto_compression(array: Any) -> str | None:
+    """
+    Pick the compression for an array by compressing a sample of it.
+    """
+    data = np.asarray(array).reshape(-1)
+    window = max(_AUTO_SAMPLE_SIZE // _AUTO_SAMPLE_WINDOWS // max(data.itemsize, 1), 1)
+    if data.size > window * _AUTO_SAMPLE_WINDOWS:
+        starts = np.linspace(0, data.size - window, _AUTO_SAMPLE_WINDOWS, dtype=int)
+        data = np.concatenate([data[start : start + window] for start in starts])
+
+    sample = np.ascontiguousarray(data).view(np.uint8)
+    if sample.nbytes == 0:
+        return None
+
+    saving = 1 - len(lz4.block.compress(sample)) / sample.nbytes
+    return "lz4" if saving >= _AUTO_MIN_SAVING else None
+
+
+def _setting(value: Any) -> tuple[str | None, dict[str, Any]]:
+    """
+    Normalize a compression setting, a compression or a (compression, kwargs) pair.
+    """
+    if isinstance(value, tuple):
+        compression, kwargs = value
+        return compression, dict(kwargs)
+
+    return value, {}
+
+
+def _iter_arrays(tree: DNode) -> Iterator[tuple[str, Any]]:
+    """
+    Iterate over the (dotted key, array) pairs of a tree, including the columns of tables.
+    """
+    for key, value in tree._recursive_items():
+        if isinstance(value, Table):
+            for name, column in value.columns.items():
+                yield f"{key}.{name}", column
+        elif isinstance(value, (*_ARRAY_TYPES, StreamedArray)):
+            yield key, value
+
+
+def array_compressions(
+    tree: DNode,
+    compression: str | None = "lz4",
+    policy: Mapping[Any, Any] | None = None,
+    compression_kwargs: dict[str, Any] | None = None,
+    tile_shape: tuple[int, ...] | None = None,
+) -> list[tuple[Any, str | None, dict[str, Any]]]:
+    """
+    Resolve the compression of each array in a tree.
+
+    Parameters
+    ----------
+    tree : DNode
+        The tree written under the ``roman`` key.
+
+    compression : str or None
+        The compression of the arrays the policy does not cover, may be ``"auto"``.
+
+    policy : Mapping or None
+        The compression of arrays by the dot-separated path (starting with
+        ``"roman."``) of the arrays, or of the subtrees containing them, or
+        by dtype. The longest matching path is used, then the dtype. The
+        compression is a compression label, None, ``"auto"`` or a
+        ``(compression, compression_kwargs)`` pair.
+
+    compression_kwargs : dict or None
+        The keyword arguments for the default compression.
+
+    tile_shape : tuple[int, ...] or None
+        The shape of the tiles to store the arrays in (see `tile_compression`),
+        each tile being compressed with the compression of its array.
+        Streamed arrays are never tiled, and use lz4 for ``"auto"``.
+
+    Returns
+    -------
+    list[tuple[array, str or None, dict]]
+        The arrays with their compression and its keyword arguments.
+    """
+    paths = {}
+    dtypes = {}
+    for key, value in (policy or {}).items():
+        if isinstance(key, str) and (key == "roman" or key.startswith("roman.")):
+            paths[key] = _setting(value)
+        else:
+            dtypes[np.dtype(key).newbyteorder("=")] = _setting(value)
+
+    default = (compression, dict(compression_kwargs or {}))
+    compressions = []
+    for key, array in _iter_arrays(tree):
+        path = f"roman.{key}"
+        while path and path not in paths:
+            path = path.rpartition(".")[0]
+
+        if path:
+            setting = paths[path]
+        else:
+            setting = dtypes.get(array.dtype.newbyteorder("="), default)
+
+        if isinstance(array, StreamedArray):
+            # Streamed arrays are not available to sample or tile, and have no input compression
+            compressions.append((array, *{"auto": ("lz4", {}), "input": (None, {})}.get(setting[0], setting)))
+            continue
+
+        if setting[0] == "auto":
+            setting = (_auto_compression(array), {})
+
+        if tile_shape is not None and (tiled := tile_compression(array, *setting, tile_shape)) is not None:
+            setting = tiled
+
+        compressions.append((array, *setting))
+
+    return compressions
+
+
+class _ParallelCompression:
+    """
+    The compression tasks submitted to a pool of threads.
+        The blocks are compressed in the order they are planned, keeping at
+        most ``window`` tasks whose results have not been written in flight
+        so that the compressed blocks are not all held in memory at once.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, window: int):
+        self.executor = executor
+        self.window = window
+        self.in_flight = 0
+        self.planned: dict[tuple, tuple[np.ndarray, str, dict[str, Any]]] = {}
+        self.pending: dict[tuple, list[Future]] = {}
+
+    def submit(self, data: np.ndarray, compression: str, kwargs: dict[str, Any]) -> list[Future]:
+        futures = [self.executor.submit(task) for task in _split(data, compression, kwargs)]
+        self.in_flight += len(futures)
+        return futures
+
+    def fill(self) -> None:
+        """
+        Submit the planned blocks, in order, while there is room in the window.
+        """
+        while self.planned and self.in_flight < self.window:
+            key = next(iter(self.planned))
+            self.pending[key] = self.submit(*self.planned.pop(key))
+
+    def prefetch(self, arrays: Iterable[tuple[Any, str | None, dict[str, Any]]]) -> None:
+        """
+        Plan compressing the (array, compression, kwargs) of the arrays ahead of time.
+        """
+        for array, compression, kwargs in arrays:
+            if compression not in _COMPRESSORS or not isinstance(array, np.ndarray) or (data := _block_data(array)) is None:
+                continue
+
+            if (key := _key(data, compression, kwargs)) is not None:
+                self.planned.setdefault(key, (data, compression, kwargs))
+
+        self.fill()
+
+    def compress(self, data: Any, compression: str, kwargs: dict[str, Any]) -> Iterator[bytes]:
+        key = _key(data, compression, kwargs)
+        futures = self.pending.pop(key, None)
+        if futures is None:
+            self.planned.pop(key, None)
+            futures = self.submit(data, compression, kwargs)
+
+        for future in futures:
+            result = future.result()
+            self.in_flight -= 1
+            self.fill()
+            yield result
+
+
+def _decompress_lz4(blocks: Iterable[bytes], out: Any, **kwargs: Any) -> int:
+    """
+    Decompress the length prefixed lz4 chunks of a block, however they are split into blocks.
+    """
+    buffer = bytearray()
+    size = 0
+    for block in blocks:
+        buffer += block
+        position = 0
+        with memoryview(buffer) as view:
+            while len(view) - position >= 4:
+                (length,) = struct.unpack_from("!I", view, position)
+                if len(view) - position - 4 < length:
+                    break
+
+                output = lz4.block.decompress(view[position + 4 : position + 4 + length], **kwargs)
+                out[size : size + len(output)] = output
+                size += len(output)
+                position += 4 + length
+
+        del buffer[:position]
+
+    return size
+
+
+def _decompress_stream(decompressor: Any, blocks: Iterable[bytes], out: Any) -> int:
+    """
+    Decompress a block compressed as a single zlib or bz2 stream.
+    """
+    size = 0
+    for block in blocks:
+        output = decompressor.decompress(block)
+        out[size : size + len(output)] = output
+        size += len(output)
+
+    return size
+
+
+class _ParallelCompressor(Compressor):
+    """
+    An asdf compressor writing the same bytes as the builtin compressor with
+    its label, using the parallel compression of the current thread if any.
+    """
+
+    def __init__(self, compression: str):
+        self._compression = compression
+
+    @property
+    def label(self) -> bytes:
+        return self._compression.encode("ascii")
+
+    def compress(self, data: Any, **kwargs: Any) -> Iterator[bytes]:
+        if (context := getattr(_LOCAL, "context", None)) is not None:
+            return context.compress(data, self._compression, kwargs)
+
+        return (task() for task in _split(data, self._compression, kwargs))
+
+    def decompress(self, blocks: Iterable[bytes], out: Any, **kwargs: Any) -> int:
+        if self._compression == "lz4":
+            return _decompress_lz4(blocks, out, **kwargs)
+
+        if self._compression == "zlib":
+            return _decompress_stream(zlib.decompressobj(**kwargs), blocks, out)
+
+        return _decompress_stream(bz2.BZ2Decompressor(**kwargs), blocks, out)
+
+
+class _ParallelExtension(Extension):
+    """
+    The ASDF extension providing the parallel compressors.
+    """
+
+    extension_uri = "asdf://stsci.edu/datamodels/roman/extensions/parallel_compression-1.0.0"
+
+    def __init__(self, compressors: Iterable[Compressor] = ()):
+        self._compressors = list(compressors)
+
+    @property
+    def compressors(self) -> list[Compressor]:
+        return self._compressors
+
+
+# The installed extension, which has no compressors so that it does not replace asdf's builtin ones
+PARALLEL_EXTENSION = _ParallelExtension()
+
+
+@contextmanager
+def parallel_compression(
+    arrays: Iterable[tuple[Any, str | None, dict[str, Any]]], workers: int | None
+) -> Generator[None, None, None]:
+    """
+    Compress the blocks asdf writes from this thread using a pool of threads.
+
+    Parameters
+    ----------
+    arrays : Iterable[tuple[array, str or None, dict]]
+        The arrays which will be written as internal blocks, with their
+        compression and its keyword arguments (see `array_compressions`).
+        These are compressed ahead of time, in order, a few blocks ahead of
+        the one asdf writes.
+
+    workers : int or None
+        The number of threads to compress with, None or 1 leaves the
+        compression to asdf. Only lz4 blocks are split between the threads,
+        the other blocks are compressed by one thread each.
+    """
+    if workers is None or workers == 1:
+        yield
+        return
+
+    warnings.filterwarnings("ignore", _DUPLICATE_WARNING, AsdfWarning)
+
+    context = _ParallelCompression(ThreadPoolExecutor(workers), workers * _TASKS_PER_WORKER)
+    previous = getattr(_LOCAL, "context", None)
+    _LOCAL.context = context
+    try:
+        with asdf.config_context() as config:
+            config.add_extension(_ParallelExtension(_ParallelCompressor(compression) for compression in _COMPRESSORS))
+            context.prefetch(arrays)
+            yield
+    finally:
+        _LOCAL.context = previous
+        context.executor.shutdown(cancel_futures=True)
@@ -16,24 +16,69 @@ import datetime
 import functools
 import sys
 from pathlib import Path, PurePath
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 import asdf
-import numpy as np
 from asdf.exceptions import ValidationError
-from asdf.tags.core.ndarray import NDArrayType
 from astropy.time import Time
 
 from roman_datamodels._stnode import NODE_EXTENSIONS, DNode, TaggedObjectNode
+from roman_datamodels._stnode._node import _container, _Watch
+from roman_datamodels._stnode._node import copy_on_write as _copy_on_write
+from roman_datamodels._stnode._template import create_fake_data_from_template
+
+from ._validation import ValidationReport, validate_incrementally
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
     from typing import Any, Self
 
-__all__ = ["MODEL_REGISTRY", "DataModel"]
+__all__ = ["MODEL_REGISTRY", "CrdsParametersCacheInfo", "DataModel", "ValidationReport", "crds_parameters_cache_info"]
 
 MODEL_REGISTRY: dict[str, type[DataModel]] = {}
 
+# Types of the values returned by get_crds_parameters
+_CRDS_PARAMETER_TYPES = (str, int, float, complex, bool)
+
+
+class CrdsParametersCacheInfo(NamedTuple):
+    """
+    Statistics for the cached results of `DataModel.get_crds_parameters`.
+
+    ``hits`` counts the calls served from the cache while ``misses`` counts
+    the calls which (re)computed the parameters.
+    """
+
+    hits: int
+    misses: int
+
+
+_CRDS_PARAMETERS_STATS = {"hits": 0, "misses": 0}
+
+
+def crds_parameters_cache_info() -> CrdsParametersCacheInfo:
+    """
+    Get the statistics for the cached results of `DataModel.get_crds_parameters`
+    across all models.
+
+    Returns
+    -------
+    CrdsParametersCacheInfo
+        The number of hits and misses of the cache.
+    """
+    return CrdsParametersCacheInfo(**_CRDS_PARAMETERS_STATS)
+
+
+def _convert_val(val):
+    """
+    Convert the date and time leaves of a flattened model to strings.
+    """
+    if isinstance(val, datetime.datetime):
+        return val.isoformat()
+    elif isinstance(val, Time):
+        return str(val)
+    return val
+
 
 def _set_default_asdf(func):
     """
@@ -124,7 +169,13 @@ class DataModel(abc.ABC):
 
     @classmethod
     def create_fake_data(
-        cls, defaults: Mapping[str, Any] | None = None, shape: tuple[int, ...] | None = None, *, tag: str | None = None
+        cls,
+        defaults: Mapping[str, Any] | None = None,
+        shape: tuple[int, ...] | None = None,
+        *,
+        tag: str | None = None,
+        template: bool = False,
+        array_mode: str = "zeros",
     ) -> Self:
         """
         Class method that constructs a model filled with fake data.
@@ -153,14 +204,36 @@ class DataModel(abc.ABC):
             If provided, specifically create a model using this tag not the
             default one.
 
+        template: bool
+            If True, the fake data is built once for each combination of
+            model, tag and shape and then cloned by later calls with any
+            defaults applied to the clone. The most recently used fake data
+            is kept, up to a fixed number of combinations, and can be
+            discarded with `roman_datamodels.clear_fake_data_cache`. By
+            default the fake data is built from scratch.
+
+        array_mode: str
+            How the fake arrays are allocated:
+
+                * "zeros": writeable arrays of zeros (the default)
+                * "broadcast": read-only views of a single zero which use
+                  no memory regardless of the shape
+                * "memmap": writeable arrays of zeros backed by temporary
+                  files, which only use memory once accessed
+
+            All of these can be saved to ASDF.
+
         Returns
         -------
         DataModel
             A valid model with fake data.
         """
-        return cls(cls._node_type.create_fake_data(defaults, shape, tag=tag))
+        if template:
+            return cls(create_fake_data_from_template(cls._node_type, defaults, shape, tag=tag, array_mode=array_mode))
+
+        return cls(cls._node_type.create_fake_data(defaults, shape, tag=tag, array_mode=array_mode))
 
-    __slots__ = ("_asdf", "_files_to_close", "_instance", "_iscopy", "_shape")
+    __slots__ = ("_asdf", "_crds_parameters", "_files_to_close", "_instance", "_iscopy", "_shape", "_validation")
 
     @classmethod
     def create_from_model(cls, model: DataModel | DNode) -> Self:
@@ -180,6 +253,8 @@ class DataModel(abc.ABC):
 
         self._iscopy = False
         self._shape = None
+        self._crds_parameters = None
+        self._validation = None
         self._instance = None
         self._asdf = None
         self._files_to_close = None
@@ -250,9 +325,37 @@ class DataModel(abc.ABC):
         """Ensure closure of resources when deleted."""
         self.close()
 
-    def copy(self, deepcopy=True, memo=None):
+    def copy(self, deepcopy=True, memo=None, *, copy_on_write=False):
+        """
+        Copy the model.
+
+        Parameters
+        ----------
+        deepcopy : bool
+            If True (the default) the tree of the model is deep copied,
+            otherwise the copy shares the tree of the model.
+
+        memo : dict or None
+            The memo passed to `copy.deepcopy`.
+
+        copy_on_write : bool
+            If True, the copy shares the containers of the tree of the model
+            (taking precedence over ``deepcopy``) until either model writes
+            to them through its nodes, which then copies the containers
+            written to. Both models hold read-only views of the arrays of the
+            model (the lazily loaded ones are read from the file of the model
+            once used, which must stay open), assign a new array to modify one
+            in either model (e.g. ``copy.data = copy.data.copy()``). Other
+            leaves such as tables are shared, and writes to nodes or
+            containers obtained before the copy are not tracked.
+
+        Returns
+        -------
+        DataModel
+            The copy of the model.
+        """
         result = self.__class__(init=None)
-        self.clone(result, self, deepcopy=deepcopy, memo=memo)
+        self.clone(result, self, deepcopy=deepcopy, memo=memo, copy_on_write=copy_on_write)
         return result
 
     __copy__ = copy
@@ -261,8 +364,12 @@ class DataModel(abc.ABC):
         return self.copy(deepcopy=True, memo=memo)
 
     @staticmethod
-    def clone(target, source, deepcopy=False, memo=None):
-        if deepcopy:
+    def clone(target, source, deepcopy=False, memo=None, copy_on_write=False):
+        if copy_on_write:
+            # The asdf file is created for the copied tree when needed
+            target._asdf = None
+            target._instance = _copy_on_write(source._instance)
+        elif deepcopy:
             target._asdf = source._asdf.copy()
             target._instance = copy.deepcopy(source._instance, memo=memo)
         else:
@@ -273,7 +380,76 @@ class DataModel(abc.ABC):
         target._files_to_close = []
         target._shape = source._shape
 
-    def save(self, path, dir_path=None, *args, all_array_compression="lz4", all_array_storage="internal", **kwargs):
+    def save(
+        self,
+        path,
+        dir_path=None,
+        *args,
+        all_array_compression="lz4",
+        all_array_storage="internal",
+        array_compression=None,
+        tile_shape=None,
+        workers=None,
+        buffer_size=None,
+        **kwargs,
+    ):
+        """
+        Save the model to an ASDF (or for catalogs a parquet) file.
+
+        Parameters
+        ----------
+        path : str, Path or callable
+            The file to save to, or a callable returning it from ``meta.filename``.
+
+        dir_path : str, Path or None
+            If provided, the directory to save the file in.
+
+        all_array_compression : str or None
+            The compression used for all the arrays written to ASDF, or
+            ``"auto"`` to pick the compression of each array (lz4 or none)
+            by compressing a sample of it.
+
+        all_array_storage : str
+            The storage used for all the arrays written to ASDF.
+
+        array_compression : Mapping or None
+            The compression of specific arrays, which takes precedence over
+            ``all_array_compression``. The keys are dot-separated paths
+            (for example ``"roman.dq"``, or ``"roman.meta"`` for all the
+            arrays below it) or dtypes (for example ``np.uint32``), paths
+            taking precedence over dtypes. The values are a compression, None,
+            ``"auto"`` or a ``(compression, compression_kwargs)`` pair, for
+            example ``("zlib", {"level": 9})``.
+
+        tile_shape : tuple[int, ...] or None
+            Store the arrays with at least as many dimensions in tiles of this
+            shape (covering their last dimensions), each tile compressed on
+            its own. Slicing such an array of a model opened from the file
+            only reads and decompresses the tiles holding the selected
+            elements. The tiles require roman_datamodels to be read back.
+
+        workers : int or None
+            If more than 1, the arrays written to ASDF are compressed by this
+            many threads. The blocks written are the same either way, only lz4
+            blocks are split between the threads.
+
+        buffer_size : int or None
+            The maximum number of bytes of each `StreamedArray` of the model
+            converted at once (16 MiB by default). Streamed arrays are first
+            written to temporary memory mapped files next to the file, then
+            to ASDF like any other array, so they take up to twice their size
+            on disk while saving. Streamed arrays of C ordered arrays of
+            their dtype (e.g. a `numpy.memmap`) are written without a copy.
+
+        **kwargs
+            Passed on to ``to_asdf``, or for catalogs saved to parquet to
+            ``to_parquet`` (for example ``compression="zstd"``).
+
+        Returns
+        -------
+        Path
+            The path the model was saved to.
+        """
         path = Path(path(self.meta.filename) if callable(path) else path)
         output_path = Path(dir_path) / path.name if dir_path else path
         ext = path.suffix.decode(sys.getfilesystemencoding()) if isinstance(path.suffix, bytes) else path.suffix
@@ -281,10 +457,18 @@ class DataModel(abc.ABC):
         # TODO: Support gzip-compressed fits
         if ext == ".asdf":
             self.to_asdf(
-                output_path, *args, all_array_compression=all_array_compression, all_array_storage=all_array_storage, **kwargs
+                output_path,
+                *args,
+                all_array_compression=all_array_compression,
+                all_array_storage=all_array_storage,
+                array_compression=array_compression,
+                tile_shape=tile_shape,
+                workers=workers,
+                buffer_size=buffer_size,
+                **kwargs,
             )
         elif ext == ".parquet" and hasattr(self, "to_parquet"):
-            self.to_parquet(output_path)
+            self.to_parquet(output_path, **kwargs)
         else:
             raise ValueError(f"unknown filetype {ext}")
 
@@ -298,7 +482,20 @@ class DataModel(abc.ABC):
 
         return asdf.AsdfFile(init, **kwargs)
 
-    def to_asdf(self, init, *args, all_array_compression="lz4", all_array_storage="internal", **kwargs):
+    def to_asdf(
+        self,
+        init,
+        *args,
+        all_array_compression="lz4",
+        all_array_storage="internal",
+        array_compression=None,
+        tile_shape=None,
+        workers=None,
+        buffer_size=None,
+        **kwargs,
+    ):
+        from ._compression import array_compressions, parallel_compression
+        from ._streaming import StreamedArray, streamed_arrays
         from ._utils import temporary_update_filedate, temporary_update_filename
 
         with (
@@ -307,9 +504,31 @@ class DataModel(abc.ABC):
         ):
             asdf_file = self.open_asdf(**kwargs)
             asdf_file["roman"] = self._instance
-            asdf_file.write_to(
-                init, *args, all_array_compression=all_array_compression, all_array_storage=all_array_storage, **kwargs
-            )
+
+            streamed = any(isinstance(value, StreamedArray) for _, value in self._instance._recursive_items())
+            per_array = array_compression is not None or all_array_compression == "auto" or tile_shape is not None
+            compressions = []
+            if per_array or streamed or (workers is not None and workers != 1):
+                compressions = array_compressions(
+                    self._instance,
+                    all_array_compression,
+                    array_compression,
+                    kwargs.get("compression_kwargs"),
+                    tile_shape if all_array_storage in ("internal", None) else None,
+                )
+
+            with streamed_arrays(compressions, buffer_size, Path(init).parent) as streams:
+                compressions = streams.resolve(compressions)
+                if per_array:
+                    # asdf only keeps the compression set for each array when writing the "input" compression
+                    for array, compression, compression_kwargs in compressions:
+                        asdf_file.set_array_compression(array, compression, **compression_kwargs)
+                    all_array_compression = "input"
+
+                with parallel_compression(compressions if all_array_storage == "internal" else (), workers):
+                    asdf_file.write_to(
+                        init, *args, all_array_compression=all_array_compression, all_array_storage=all_array_storage, **kwargs
+                    )
 
     def get_primary_array_name(self):
         """
@@ -379,21 +598,9 @@ class DataModel(abc.ABC):
         This differs from the JWST data model in that the schema is not
         directly used
         """
+        return {f"roman.{key}": _convert_val(val) for (key, val) in self.items(include_arrays=include_arrays)}
 
-        def convert_val(val):
-            if isinstance(val, datetime.datetime):
-                return val.isoformat()
-            elif isinstance(val, Time):
-                return str(val)
-            return val
-
-        return {
-            f"roman.{key}": convert_val(val)
-            for (key, val) in self.items()
-            if include_arrays or not isinstance(val, np.ndarray | NDArrayType)
-        }
-
-    def items(self):
+    def items(self, *, include_arrays=True, skip=None, max_depth=None):
         """
         Iterates over all of the model items in a flat way.
 
@@ -405,9 +612,21 @@ class DataModel(abc.ABC):
 
         Unlike the JWST DataModel implementation, this does not use
         schemas directly.
+
+        Parameters
+        ----------
+        include_arrays : bool
+            If False, skip array items without accessing them.
+
+        skip : Iterable[str] or None
+            Dot-separated names of items (or whole sub-trees) to skip,
+            for example ``["meta.cal_logs"]``.
+
+        max_depth : int or None
+            If provided, only return items at most this many levels deep.
         """
 
-        yield from self._instance._recursive_items()
+        yield from self._instance._recursive_items(include_arrays=include_arrays, skip=skip, max_depth=max_depth)
 
     def get_crds_parameters(self):
         """
@@ -415,22 +634,62 @@ class DataModel(abc.ABC):
 
         This will only return items under ``roman.meta``.
 
+        The parameters are cached on the model and only recomputed after
+        something under ``meta`` is written to through the model, see
+        `crds_parameters_cache_info`. Writes made directly to the dicts and
+        lists holding ``meta`` (e.g. to the dict returned by
+        ``model.meta["exposure"]``) are not seen.
+
         Returns
         -------
         dict
         """
-        return {
-            f"roman.meta.{key}": val
-            for key, val in self.meta.to_flat_dict(include_arrays=False, recursive=True).items()
-            if isinstance(val, str | int | float | complex | bool)
-        }
+        meta = self.meta
+        cache = self._crds_parameters
+        if cache is not None and cache[0] is _container(meta) and not cache[1].written:
+            _CRDS_PARAMETERS_STATS["hits"] += 1
+            return dict(cache[2])
+
+        _CRDS_PARAMETERS_STATS["misses"] += 1
+        if cache is not None:
+            cache[1].close()
+        watch = _Watch(meta)
+        parameters = {}
+        for key, val in meta._recursive_items(include_arrays=False):
+            if isinstance(val := _convert_val(val), _CRDS_PARAMETER_TYPES):
+                parameters[f"roman.meta.{key}"] = val
+
+        self._crds_parameters = (_container(meta), watch, parameters)
+        return dict(parameters)
 
     @_set_default_asdf
-    def validate(self):
+    def validate(self, *, full=False):
         """
         Re-validate the model instance against the tags
+
+        After a successful validation only the items of the tree set,
+        deleted or replaced since then (through the model or directly in the
+        dicts and lists holding them) are re-validated, together with the
+        keys of the containers holding them. The whole tree is validated the
+        first time, after the tree itself is replaced or if ``full`` is True.
+
+        Parameters
+        ----------
+        full : bool
+            If True, validate the whole tree. This is needed to validate
+            changes made in place to leaves other than arrays (e.g. to the
+            columns of a table).
+        """
+        self._validation = validate_incrementally(self._asdf, self._validation, full)
+
+    @property
+    def validation_report(self):
+        """
+        The `ValidationReport` of the last successful `validate`, None if
+        the model has not been validated: if the whole tree was validated
+        and the time spent validating each part of it.
         """
-        self._asdf.validate()
+        return None if self._validation is None else self._validation.report
 
     @_set_default_asdf
     def info(self, *args, **kwargs):
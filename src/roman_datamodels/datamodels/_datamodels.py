@@ -21,6 +21,8 @@ import numpy as np
 from astropy import time as _time
 from astropy.modeling import models
 
+from roman_datamodels._stnode._schema import _NO_VALUE, FakeDataBuilder, _get_plan_from_tag
+
 from ._core import DataModel
 from ._utils import node_update, temporary_update_filedate, temporary_update_filename
 
@@ -78,26 +80,35 @@ class _SourceCatalogMixin:
     def get_column_definition(self, name):
         return self._instance.get_column_definition(name)
 
+    @functools.wraps(ImageSourceCatalogMixin.get_column_definitions)
+    def get_column_definitions(self, names):
+        return self._instance.get_column_definitions(names)
+
 
 class _ParquetMixin:
-    """Gives SourceCatalogModels the ability to save to parquet files."""
+    """Gives SourceCatalogModels the ability to save to parquet files and export to arrow."""
 
     __slots__ = ()
 
-    def to_parquet(self, filepath):
+    def to_arrow(self):
         """
-        Save catalog in parquet format.
+        Convert the catalog to a ``pyarrow.Table``.
 
-        Defers import of parquet to minimize import overhead for all other models.
+        The arrow columns share the buffers of the catalog's columns rather
+        than copying them, so the catalog should not be modified while the
+        arrow table is in use. The fields carry the column units and the
+        schema metadata the flattened ``meta``, as written by `to_parquet`.
+
+        Defers import of arrow to minimize import overhead for all other models.
+
+        Returns
+        -------
+        pyarrow.Table
         """
         from roman_datamodels._stnode import DNode
 
-        # parquet does not provide validation so validate first with asdf
-        self.validate()
-
         global DTYPE_MAP
         import pyarrow as pa
-        import pyarrow.parquet as pq
 
         if not DTYPE_MAP:
             DTYPE_MAP.update(
@@ -117,9 +128,8 @@ class _ParquetMixin:
                 }
             )
 
-        with temporary_update_filename(self, pathlib.Path(filepath).name), temporary_update_filedate(self, _time.Time.now()):
-            # Construct flat metadata dict
-            flat_meta = self.to_flat_dict()
+        # Construct flat metadata dict
+        flat_meta = self.to_flat_dict()
         # select only meta items
         flat_meta = {k: str(v) for (k, v) in flat_meta.items() if k.startswith("roman.meta")}
         # Extract table metadata
@@ -132,19 +142,102 @@ class _ParquetMixin:
         flat_scmeta = {"source_catalog." + k: str(v) for (k, v) in flat_scmeta.items()}
         # merge the two meta dicts
         flat_meta.update(flat_scmeta)
-        # Turn numpy structured array into list of arrays
+        # Views of the column buffers, which arrow shares rather than copies
         keys = list(source_cat.columns.keys())
-        arrs = [np.array(source_cat[key]) for key in keys]
+        arrs = [np.asarray(source_cat[key]) for key in keys]
+        masks = [np.ma.getmask(source_cat[key]) for key in keys]
         units = [str(source_cat[key].unit) for key in keys]
-        dtypes = [DTYPE_MAP[np.array(source_cat[key]).dtype.name] for key in keys]
+        dtypes = [DTYPE_MAP[arr.dtype.name] for arr in arrs]
         fields = [
             pa.field(key, type=dtype, metadata={"unit": unit}) for (key, dtype, unit) in zip(keys, dtypes, units, strict=False)
         ]
         extra_astropy_metadata = astropy.table.meta.get_yaml_from_table(source_cat)
         flat_meta["table_meta_yaml"] = "\n".join(extra_astropy_metadata)
         schema = pa.schema(fields, metadata=flat_meta)
-        table = pa.Table.from_arrays(arrs, schema=schema)
-        pq.write_table(table, filepath, compression=None)
+        # Only the validity bitmaps of masked columns are built
+        columns = [
+            pa.array(arr, type=dtype, mask=mask if mask is not np.ma.nomask else None)
+            for (arr, dtype, mask) in zip(arrs, dtypes, masks, strict=True)
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        """
+        Export the catalog through the arrow PyCapsule interface.
+
+        This lets arrow consumers (for example ``duckdb``, ``polars`` or
+        ``pyarrow.table``) read the catalog in-process without copying it.
+        """
+        return self.to_arrow().__arrow_c_stream__(requested_schema)
+
+    def to_parquet(self, filepath, row_group_size=None, compression=None):
+        """
+        Save catalog in parquet format.
+
+        Defers import of parquet to minimize import overhead for all other models.
+
+        The columns are passed to arrow without copying them and written a
+        row group at a time, so writing needs little memory beyond the
+        catalog itself.
+
+        Parameters
+        ----------
+        filepath : str or Path
+            The file to write.
+
+        row_group_size : int (optional)
+            The number of rows of each row group, by default pyarrow's.
+            Smaller row groups let readers skip more of the file when
+            filtering rows, at the cost of larger metadata.
+
+        compression : str (optional)
+            The compression codec of the columns, for example "zstd" or
+            "snappy". By default the columns are not compressed.
+        """
+        from ._parquet import _write_table
+
+        _write_table(self._parquet_table(filepath), filepath, row_group_size, compression)
+
+    def _parquet_table(self, filepath):
+        """
+        Validate the catalog and convert it to the arrow table written to a parquet file.
+        """
+        # parquet does not provide validation so validate first with asdf
+        self.validate()
+
+        with temporary_update_filename(self, pathlib.Path(filepath).name), temporary_update_filedate(self, _time.Time.now()):
+            return self.to_arrow()
+
+    @classmethod
+    def from_parquet(cls, filepath, columns=None, filters=None, **kwargs):
+        """
+        Read a catalog saved with `to_parquet`.
+
+        Only the requested columns, and the row groups which may hold rows
+        matching the filters, are read from the file.
+
+        Parameters
+        ----------
+        filepath : str or Path
+            The parquet file to read.
+
+        columns : list of str (optional)
+            The names of the columns to read, by default all of them.
+
+        filters : list of tuple or list of list of tuple (optional)
+            Row filters as accepted by ``pyarrow.parquet.read_table``, for
+            example ``[("kron_abmag", "<", 25)]``.
+
+        Returns
+        -------
+        DataModel
+        """
+        from ._parquet import read_parquet
+
+        model = read_parquet(filepath, columns=columns, filters=filters, **kwargs)
+        if not isinstance(model, cls):
+            raise TypeError(f"'{filepath}' holds a {type(model).__name__}, not a {cls.__name__}")
+        return model
 
 
 class _RomanDataModel(DataModel):
@@ -235,7 +328,7 @@ class _RomanDataModel(DataModel):
         return super().create_minimal(defaults=cls._creator_defaults(defaults), tag=tag)
 
     @classmethod
-    def create_fake_data(cls, defaults=None, shape=None, *, tag=None):
+    def create_fake_data(cls, defaults=None, shape=None, *, tag=None, template=False, array_mode="zeros"):
         """
         Class method that constructs a model filled with fake data.
 
@@ -259,6 +352,14 @@ class _RomanDataModel(DataModel):
             When provided use this shape to determine the
             shape used to construct fake arrays.
 
+        template : bool
+            If True, clone cached fake data rather than building it from
+            scratch (the default).
+
+        array_mode : str
+            How the fake arrays are allocated, one of "zeros" (the default),
+            "broadcast" or "memmap".
+
         Returns
         -------
         DataModel
@@ -268,6 +369,8 @@ class _RomanDataModel(DataModel):
             defaults=cls._creator_defaults(defaults, time=_time.Time("2020-01-01T00:00:00.0", format="isot", scale="utc")),
             shape=shape,
             tag=tag,
+            template=template,
+            array_mode=array_mode,
         )
 
 
@@ -341,6 +444,29 @@ class ScienceRawModel(_RomanDataModel):
         return raw_model
 
 
+def _build_node(node_type, values):
+    """
+    Build a node of a type from the values of some of its properties, which
+    are used as they are (without copying them), with fake values for the
+    other required properties (like `DataModel.create_fake_data` without a
+    shape, so its arrays are empty).
+    """
+    builder = FakeDataBuilder()
+    plan = _get_plan_from_tag(node_type._default_tag, builder)
+    node = {}
+    for name, subplan in plan.properties:
+        if name in values:
+            node[name] = values[name]
+        elif name in plan.required and (value := builder.build(subplan)) is not _NO_VALUE:
+            if name in node and isinstance(value, dict):
+                # blend the 2 dictionaries
+                node[name] |= value
+            else:
+                node[name] = value
+
+    return node_type({**node, **values})
+
+
 class MsosStackModel(_RomanDataModel):
     from roman_datamodels._stnode import MsosStack
 
@@ -355,7 +481,7 @@ class RampModel(_RomanDataModel):
     _node_type = Ramp
 
     @classmethod
-    def from_science_raw(cls, model):
+    def from_science_raw(cls, model, *, copy=True):
         """Attempt to construct a RampModel from a DataModel
 
         If the model has a resultantdq attribute, this is copied into
@@ -373,6 +499,13 @@ class RampModel(_RomanDataModel):
         model : FpsModel, RampModel, ScienceRawModel, TvacModel
             The input data model (a RampModel will also work).
 
+        copy : bool
+            If True (the default), the arrays of the RampModel are copies of
+            the arrays of the input model. Otherwise the arrays whose dtype
+            already matches (``amp33``, ``resultantdq`` and ``float32``
+            ``data``) are shared with the input model, which should then no
+            longer be modified, and only the others are converted.
+
         Returns
         -------
         ramp_model : RampModel
@@ -387,20 +520,20 @@ class RampModel(_RomanDataModel):
         if not isinstance(model, ALLOWED_MODELS):
             raise ValueError(f"Input must be one of {ALLOWED_MODELS}")
 
-        # Create base ramp node with dummy values (for validation)
-        ramp_model = cls.create_fake_data()
-
-        shape = model.data.shape
-        ramp_model.pixeldq = np.zeros(shape[1:], dtype=np.uint32)
-        ramp_model.groupdq = np.zeros(shape, dtype=np.uint8)
-        ramp_model.data = model.data.astype(np.float32)
-        ramp_model.amp33 = model.amp33.copy()
-
-        # check if the input model has a resultantdq from SDF
-        if hasattr(model, "resultantdq"):
-            ramp_model.groupdq = model.resultantdq.copy()
-
-        node_update(ramp_model._instance, model, ignore=("resultantdq", "meta.model_type"))
+        convert = np.array if copy else np.asarray
+        data = getattr(model.data, "value", model.data)
+        arrays = {
+            "data": convert(data, dtype=np.float32),
+            "amp33": convert(model.amp33),
+            "pixeldq": np.zeros(data.shape[1:], dtype=np.uint32),
+            # use the resultantdq from SDF if the input model has one
+            "groupdq": convert(model.resultantdq) if hasattr(model, "resultantdq") else np.zeros(data.shape, dtype=np.uint8),
+        }
+
+        # The ramp holds the arrays and (through node_update) the metadata of the input, only the
+        # rest (e.g. the calibration steps and the border reference pixels) is filled with fake values
+        ramp_model = cls(_build_node(cls._node_type, arrays))
+        node_update(ramp_model._instance, model, ignore=("data", "amp33", "resultantdq", "meta.model_type"))
 
         # check for exposure data_problem
         if isinstance(ramp_model.meta.exposure.data_problem, bool):
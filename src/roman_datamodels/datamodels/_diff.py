@@ -0,0 +1,351 @@
+"""
+Structural differences between two datamodels.
+    The trees of the two models are walked together without wrapping their
+    values, collecting every difference rather than stopping at the first.
+    Arrays stored in identical blocks (by their checksums and sizes) are not
+    read at all, the others are compared a chunk at a time, optionally in
+    parallel.
+
+    asdf has no public API to the headers of the blocks, so they are read
+    from the files the models were opened from, as laid out by the ASDF
+    standard, and matched to the arrays by their places in the trees. This
+    holds for the arrays asdf shows as not loaded (so not written to), unless
+    an array of another file was assigned to the same place.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple
+
+import gwcs
+import numpy as np
+from asdf.tags.core import NDArrayType
+from astropy import units as u
+from astropy.modeling import CompoundModel, Model
+from astropy.table import Table
+
+from roman_datamodels._stnode._node import _ARRAY_TYPES, _NODE_TYPES, _iter_children
+
+from ._core import DataModel
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Any
+
+__all__ = ["ArrayDifference", "ModelDiff", "ValueDifference", "diff"]
+
+# The maximum number of elements of each array compared at once
+_CHUNK_SIZE = 1 << 22
+
+# asdf reads all the blocks of a file through one file handle
+_LOCK = threading.Lock()
+
+# The value of an item missing from one of the trees
+_MISSING = object()
+
+# The attributes of models (other than their parameters) defining their transforms, when they have them
+_MODEL_ATTRIBUTES = ("mapping", "points", "lookup_table", "method", "bounds_error", "fill_value")
+
+# The attributes of gwcs frames defining them, when they have them
+_FRAME_ATTRIBUTES = ("name", "naxes", "axes_names", "axes_order", "axes_type", "unit", "axis_physical_types")
+
+
+class ValueDifference(NamedTuple):
+    """
+    A value which differs between two models.
+    """
+
+    path: str
+    a: Any
+    b: Any
+
+
+class ArrayDifference(NamedTuple):
+    """
+    An array which differs between two models.
+        The counts and deltas are None if the shapes differ, and the deltas
+        are None for arrays which are not numeric. The relative delta is
+        relative to the array of the first model.
+    """
+
+    path: str
+    shape_a: tuple[int, ...]
+    shape_b: tuple[int, ...]
+    dtype_a: np.dtype
+    dtype_b: np.dtype
+    n_different: int | None
+    max_abs: float | None
+    max_rel: float | None
+
+
+class ModelDiff(NamedTuple):
+    """
+    The differences between two models, by dot-separated names.
+    """
+
+    values: list[ValueDifference]
+    arrays: list[ArrayDifference]
+    only_a: list[str]
+    only_b: list[str]
+
+    @property
+    def identical(self) -> bool:
+        return not (self.values or self.arrays or self.only_a or self.only_b)
+
+
+def _same_data(a: Any, b: Any) -> bool:
+    """
+    Check, without reading them, if two arrays are known to hold the same data.
+    """
+    if a is b:
+        return True
+
+    if isinstance(a, np.ndarray) and isinstance(b, np.ndarray):
+        return a.dtype == b.dtype and a.__array_interface__ == b.__array_interface__
+
+    return False
+
+
+def _load(array: Any) -> np.ndarray:
+    if isinstance(array, NDArrayType):
+        with _LOCK:
+            array = np.asarray(array)
+
+    return array.value if isinstance(array, u.Quantity) else np.asarray(array)
+
+
+def _compare_arrays(path: str, a: Any, b: Any) -> ArrayDifference | None:
+    """
+    Compare two arrays a chunk (of their first axis) at a time. Integers
+    (and booleans) are compared exactly, anything else as floats.
+    """
+    if _same_data(a, b):
+        return None
+
+    a, b = _load(a), _load(b)
+    if a.shape != b.shape:
+        return ArrayDifference(path, a.shape, b.shape, a.dtype, b.dtype, None, None, None)
+
+    numeric = a.dtype.kind in "biuf" and b.dtype.kind in "biuf"
+    integer = a.dtype.kind in "biu" and b.dtype.kind in "biu"
+    if not numeric and a.dtype != b.dtype:
+        return ArrayDifference(path, a.shape, b.shape, a.dtype, b.dtype, None, None, None)
+
+    n_different = 0
+    max_abs = max_rel = 0.0
+    if a.ndim == 0:
+        a, b = a.reshape(1), b.reshape(1)
+    step = max(_CHUNK_SIZE // max(math.prod(a.shape[1:]), 1), 1)
+
+    for start in range(0, a.shape[0], step):
+        chunk_a, chunk_b = a[start : start + step], b[start : start + step]
+        if not numeric:
+            n_different += int(np.count_nonzero(chunk_a != chunk_b))
+            continue
+
+        if integer:
+            if np.array_equal(chunk_a, chunk_b):
+                continue
+            different = chunk_a != chunk_b
+            # The differences of (64 bit) integers may not fit them, nor be exact as floats
+            delta = np.abs((chunk_b[different].astype(object) - chunk_a[different].astype(object)).astype(np.float64))
+            chunk_a = chunk_a[different].astype(np.float64)
+        else:
+            chunk_a, chunk_b = chunk_a.astype(np.float64), chunk_b.astype(np.float64)
+            different = (chunk_a != chunk_b) & ~(np.isnan(chunk_a) & np.isnan(chunk_b))
+            if not different.any():
+                continue
+            chunk_a = chunk_a[different]
+            delta = np.abs(chunk_b[different] - chunk_a)
+
+        n_different += int(np.count_nonzero(different))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = delta / np.abs(chunk_a)
+        # fmax ignores the NaNs of elements which are NaN in only one array
+        max_abs = float(np.fmax.reduce(delta, initial=max_abs))
+        max_rel = float(np.fmax.reduce(relative, initial=max_rel))
+
+    if n_different == 0 and a.dtype == b.dtype:
+        return None
+
+    if not numeric:
+        max_abs = max_rel = None
+    return ArrayDifference(path, a.shape, b.shape, a.dtype, b.dtype, n_different, max_abs, max_rel)
+
+
+def _model_equal(a: Any, b: Any) -> bool:
+    """
+    Check if two models define the same transform, comparing the trees of
+    compound models (their operators and the order of their operands).
+    """
+    if not isinstance(a, Model) or not isinstance(b, Model):
+        return _equal(a, b)
+
+    if (
+        a.__class__ is not b.__class__
+        or a.name != b.name
+        or a.inputs != b.inputs
+        or a.outputs != b.outputs
+        or a.param_names != b.param_names
+    ):
+        return False
+
+    if isinstance(a, CompoundModel):
+        return a.op == b.op and a.n_submodels == b.n_submodels and _model_equal(a.left, b.left) and _model_equal(a.right, b.right)
+
+    return (
+        a.parameters.shape == b.parameters.shape
+        and np.array_equal(a.parameters, b.parameters, equal_nan=True)
+        and all(_equal(getattr(a, name, None), getattr(b, name, None)) for name in _MODEL_ATTRIBUTES)
+    )
+
+
+def _frame_equal(a: Any, b: Any) -> bool:
+    """
+    Check if two gwcs frames (or frame names) are the same.
+    """
+    if isinstance(a, str) or a is None:
+        return _equal(a, b)
+
+    if a.__class__ is not b.__class__:
+        return False
+
+    if any(not _equal(getattr(a, name, None), getattr(b, name, None)) for name in _FRAME_ATTRIBUTES):
+        return False
+
+    reference_a, reference_b = getattr(a, "reference_frame", None), getattr(b, "reference_frame", None)
+    if reference_a is None or reference_b is None:
+        if reference_a is not reference_b:
+            return False
+    elif not reference_a.is_equivalent_frame(reference_b):
+        return False
+
+    frames_a, frames_b = getattr(a, "frames", ()), getattr(b, "frames", ())
+    return len(frames_a) == len(frames_b) and all(_frame_equal(*frames) for frames in zip(frames_a, frames_b, strict=True))
+
+
+def _wcs_equal(a: gwcs.WCS, b: gwcs.WCS) -> bool:
+    """
+    Check if two gwcs hold the same (frame, transform) steps.
+    """
+    return len(a.pipeline) == len(b.pipeline) and all(
+        _frame_equal(step_a.frame, step_b.frame) and _model_equal(step_a.transform, step_b.transform)
+        for step_a, step_b in zip(a.pipeline, b.pipeline, strict=True)
+    )
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """
+    Check if two leaf values of a tree are equal.
+    """
+    if a is b:
+        return True
+
+    if type(a) is not type(b):
+        return False
+
+    if isinstance(a, Model):
+        return _model_equal(a, b)
+
+    if isinstance(a, gwcs.WCS):
+        return _wcs_equal(a, b)
+
+    if isinstance(a, float) and np.isnan(a):
+        return np.isnan(b)
+
+    try:
+        return bool(np.all(a == b))
+    except (TypeError, ValueError):
+        return False
+
+
+class _Differ:
+    """
+    Collect the differences of two trees, with the arrays left to compare.
+    """
+
+    def __init__(self, skip: Iterable[str] | None):
+        self.skip = frozenset(skip or ())
+        self.values: list[ValueDifference] = []
+        self.arrays: list[tuple[str, Any, Any]] = []
+        self.only_a: list[str] = []
+        self.only_b: list[str] = []
+
+    def compare(self, a: Any, b: Any, path: str) -> None:
+        stack = [(a, b, path)]
+        while stack:
+            a, b, path = stack.pop()
+            if b is _MISSING:
+                self.only_a.append(path)
+            elif a is _MISSING:
+                self.only_b.append(path)
+            elif isinstance(a, _NODE_TYPES) and isinstance(b, _NODE_TYPES):
+                if type(a) is not type(b):
+                    self.values.append(ValueDifference(path, type(a), type(b)))
+                children_a, children_b = dict(_iter_children(a)), dict(_iter_children(b))
+                prefix = f"{path}." if path else ""
+                for key in reversed([*children_a, *(key for key in children_b if key not in children_a)]):
+                    if (name := f"{prefix}{key}") not in self.skip:
+                        stack.append((children_a.get(key, _MISSING), children_b.get(key, _MISSING), name))
+            elif self._is_array(a) and self._is_array(b):
+                if isinstance(a, u.Quantity) and a.unit != getattr(b, "unit", None):
+                    self.values.append(ValueDifference(f"{path}.unit", a.unit, getattr(b, "unit", None)))
+                self.arrays.append((path, a, b))
+            elif isinstance(a, Table) and isinstance(b, Table) and a.colnames == b.colnames and len(a) == len(b):
+                for name in reversed(a.colnames):
+                    stack.append((a[name], b[name], f"{path}.{name}"))
+            elif not _equal(a, b):
+                self.values.append(ValueDifference(path, a, b))
+
+    @staticmethod
+    def _is_array(value: Any) -> bool:
+        return isinstance(value, _ARRAY_TYPES) and (type(value) is NDArrayType or value.ndim > 0)
+
+
+def diff(
+    model_a: DataModel | Any, model_b: DataModel | Any, *, skip: Iterable[str] | None = None, workers: int | None = None
+) -> ModelDiff:
+    """
+    Find all the differences between two models (or nodes).
+
+    Parameters
+    ----------
+    model_a, model_b : DataModel or DNode
+        The models to compare.
+
+    skip : Iterable[str] or None
+        Dot-separated names of items (or whole sub-trees) not to compare,
+        for example ``["meta.file_date"]``.
+
+    workers : int or None
+        The maximum number of threads comparing arrays, by default arrays
+        are compared one after the other. Arrays are read from their files
+        one at a time.
+
+    Returns
+    -------
+    ModelDiff
+        The differences in the order of the trees: the values and arrays
+        which differ, and the names of the items of only one of the models.
+        Arrays which are the same array (or views of the same memory) are
+        never read.
+    """
+    differ = _Differ(skip)
+    tree_a, tree_b = model_a, model_b
+    if isinstance(model_a, DataModel) and isinstance(model_b, DataModel):
+        if type(model_a) is not type(model_b):
+            differ.values.append(ValueDifference("", type(model_a), type(model_b)))
+        tree_a, tree_b = model_a._instance, model_b._instance
+    differ.compare(tree_a, tree_b, "")
+
+    items = differ.arrays
+    if workers is None or workers == 1:
+        arrays = [_compare_arrays(*item) for item in items]
+    else:
+        with ThreadPoolExecutor(workers) as executor:
+            arrays = list(executor.map(lambda item: _compare_arrays(*item), items))
+
+    return ModelDiff(differ.values, [array for array in arrays if array is not None], differ.only_a, differ.only_b)
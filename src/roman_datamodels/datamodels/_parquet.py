@@ -0,0 +1,356 @@
+"""
+Read source catalog datamodels from parquet files, and write many of them to a dataset.
+    `_ParquetMixin.to_parquet` flattens the ``meta`` of a catalog into
+    strings stored in the metadata of the parquet schema (under
+    ``roman.meta.*``) and the table's own metadata into the yaml astropy
+    reads back. The ``meta`` is rebuilt by converting each string back to
+    the type the schema of the model expects for it.
+
+    A dataset is a directory of catalog files in hive partitions (for
+    example ``skycell_name=.../optical_element=F158/part-<uuid>.parquet``)
+    with a ``_metadata`` file summarizing the row groups of all of them,
+    including the min/max statistics of their columns.
+
+    Parquet (and pyarrow) are imported only when a file is read, to keep
+    them out of the import of all other models.
+"""
+
+from __future__ import annotations
+
+import ast
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from astropy import units as u
+from astropy.table import Table
+from astropy.time import Time
+
+from roman_datamodels._stnode._schema import (
+    _get_keyword,
+    _get_pattern_properties,
+    _get_properties,
+    _get_required,
+    _get_schema_from_tag,
+)
+
+from ._core import MODEL_REGISTRY
+from ._utils import _get_path
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Any
+
+    from ._core import DataModel
+
+__all__ = ["write_parquet_dataset"]
+
+# The prefix of the keys of the flattened meta
+_META_PREFIX = "roman.meta."
+
+# The name of the summary file of a dataset
+_SUMMARY = "_metadata"
+
+# Tagged values which are flattened to strings, by the prefix of their tags
+_TAG_TYPES = {
+    "tag:stsci.edu:asdf/time/time-": Time,
+    "tag:stsci.edu:asdf/unit/quantity-": u.Quantity,
+    "tag:astropy.org:astropy/units/quantity-": u.Quantity,
+    "tag:stsci.edu:asdf/unit/unit-": u.Unit,
+    "tag:astropy.org:astropy/units/unit-": u.Unit,
+}
+
+
+def _schema_types(schema: Any) -> tuple[set[str], set[str]]:
+    """
+    Collect the types and tags a (resolved) schema allows, through its combiners.
+    """
+    types: set[str] = set()
+    tags: set[str] = set()
+    stack = [schema]
+    while stack:
+        if not isinstance(subschema := stack.pop(), dict):
+            continue
+
+        if isinstance(type_ := subschema.get("type"), str):
+            types.add(type_)
+        elif isinstance(type_, list):
+            types.update(type_)
+        if "tag" in subschema:
+            tags.add(subschema["tag"])
+        for combiner in ("allOf", "anyOf", "oneOf"):
+            stack.extend(subschema.get(combiner, ()))
+
+    return types, tags
+
+
+def _convert_leaf(value: str, schema: Any) -> Any:
+    """
+    Convert a string back to the value its schema expects.
+    """
+    types, tags = _schema_types(schema)
+    for tag in tags:
+        for prefix, type_ in _TAG_TYPES.items():
+            if tag.startswith(prefix):
+                try:
+                    return type_(value)
+                except (TypeError, ValueError):
+                    pass
+
+    if "null" in types and value == "None":
+        return None
+    if "boolean" in types and value in ("True", "False"):
+        return value == "True"
+    for type_name, type_ in (("integer", int), ("number", float)):
+        if type_name in types:
+            try:
+                return type_(value)
+            except ValueError:
+                pass
+    if "string" in types:
+        return value
+
+    # Without a schema to go by, python literals are converted back and anything else is left a string
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _property_schema(schema: Any, name: str) -> Any:
+    if not isinstance(schema, dict):
+        return {}
+
+    if (subschema := dict(_get_properties(schema)).get(name)) is not None:
+        return subschema
+
+    return next(_get_pattern_properties(schema, name), {})
+
+
+def _item_schema(schema: Any, index: int) -> Any:
+    if not isinstance(schema, dict) or not (items := _get_keyword(schema, "items")):
+        return {}
+
+    if isinstance(items, list):
+        return items[index] if index < len(items) else {}
+
+    return items
+
+
+def _rebuild(flat: dict[str, Any], schema: Any) -> Any:
+    """
+    Rebuild the (nested, string keyed) flattened values of a container
+    against its schema. Containers flattening to nothing (e.g. empty lists)
+    are not stored, so the required ones are restored empty.
+    """
+    types = _schema_types(schema)[0]
+    if flat and "object" not in types and all(key.isdigit() for key in flat):
+        items = sorted(((int(key), value) for key, value in flat.items()), key=lambda item: item[0])
+        return [_rebuild_value(value, _item_schema(schema, index)) for index, value in items]
+
+    node = {name: _rebuild_value(value, _property_schema(schema, name)) for name, value in flat.items()}
+    if isinstance(schema, dict):
+        for name in _get_required(schema) - node.keys():
+            subtypes = _schema_types(_property_schema(schema, name))[0]
+            if "array" in subtypes:
+                node[name] = []
+            elif "object" in subtypes:
+                node[name] = _rebuild({}, _property_schema(schema, name))
+
+    return node
+
+
+def _rebuild_value(value: Any, schema: Any) -> Any:
+    return _rebuild(value, schema) if isinstance(value, dict) else _convert_leaf(value, schema)
+
+
+def _unflatten(flat_meta: dict[str, str]) -> dict[str, Any]:
+    nested: dict[str, Any] = {}
+    for key, value in flat_meta.items():
+        *parents, name = key.split(".")
+        node = nested
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[name] = value
+
+    return nested
+
+
+def _read_meta(filepath: str | Path) -> dict[str, str]:
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(filepath).metadata or {}
+    return {
+        key.decode("utf-8")[len(_META_PREFIX) :]: value.decode("utf-8")
+        for key, value in metadata.items()
+        if key.startswith(_META_PREFIX.encode("utf-8"))
+    }
+
+
+def read_parquet(
+    filepath: str | Path, columns: list[str] | None = None, filters: list[Any] | None = None, **kwargs: Any
+) -> DataModel:
+    """
+    Read a source catalog model saved with ``to_parquet``.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        The parquet file to read.
+
+    columns : list[str] or None
+        The names of the columns to read, by default all of them. Only the
+        chunks of the selected columns are read from the file.
+
+    filters : list[tuple] or list[list[tuple]] or None
+        Row filters as accepted by ``pyarrow.parquet.read_table``, for example
+        ``[("kron_abmag", "<", 25)]``. Row groups whose statistics rule out
+        any match are not read.
+
+    **kwargs
+        Passed on to the model.
+
+    Returns
+    -------
+    DataModel
+        The catalog model named by ``meta.model_type``, its ``meta`` rebuilt
+        from the parquet metadata and its ``source_catalog`` from the table
+        (with units, descriptions and table metadata).
+    """
+    flat_meta = _read_meta(filepath)
+    models = {model.__name__: model for model in MODEL_REGISTRY.values()}
+    if (model_type := flat_meta.get("model_type")) not in models:
+        raise TypeError(f"Unknown datamodel type: {model_type}, '{filepath}' was not written by to_parquet")
+
+    model_class = models[model_type]
+    node_type = model_class._node_type
+    meta_schema = _property_schema(_get_schema_from_tag(node_type._default_tag), "meta")
+    meta = _rebuild(_unflatten(flat_meta), meta_schema)
+
+    source_catalog = Table.read(filepath, format="parquet", include_names=columns, filters=filters)
+    return model_class(node_type({"meta": meta, "source_catalog": source_catalog}), **kwargs)
+
+
+def _write_table(table: Any, filepath: str | Path, row_group_size: int | None = None, compression: str | None = None) -> None:
+    """
+    Write an arrow table to a parquet file a row group at a time.
+    """
+    import pyarrow.parquet as pq
+
+    # pyarrow's default row group size
+    step = row_group_size or 1024 * 1024
+    with pq.ParquetWriter(filepath, table.schema, compression=compression or "none") as writer:
+        # Each batch is a slice of the table, and so of the catalog's columns
+        for batch in table.to_batches(max_chunksize=step):
+            writer.write_batch(batch, row_group_size=step)
+
+
+def _partition_path(model: DataModel, partition_by: Iterable[str]) -> Path:
+    """
+    The hive partition of a model, named by the last part of each key, with the values URI encoded.
+    """
+    path = Path()
+    for key in partition_by:
+        path /= f"{key.rsplit('.', 1)[-1]}={quote(str(_get_path(model._instance, key)), safe='')}"
+
+    return path
+
+
+def write_parquet_dataset(
+    models: Iterable[DataModel],
+    root: str | Path,
+    partition_by: Iterable[str] = (),
+    row_group_size: int | None = None,
+    compression: str | None = None,
+) -> list[Path]:
+    """
+    Write source catalog models to a partitioned parquet dataset.
+
+    Each catalog is written to its own file with ``to_parquet`` in a hive
+    partition (``name=value`` directories) by its meta. The ``_metadata``
+    file at the root of the dataset holds the schema shared by all the
+    catalogs and the metadata (including the min/max statistics of each
+    column) of the row groups of every file. Readers can use it to find
+    the files which may hold the rows of a query without opening the
+    others, for example::
+
+        import pyarrow.dataset as ds
+
+        dataset = ds.parquet_dataset(root / "_metadata", partitioning="hive")
+        dataset.to_table(filter=(ds.field("skycell_name") == "...") & (ds.field("kron_abmag") < 25))
+
+    Each file keeps the full ``meta`` of its model, so it can be opened on
+    its own with ``roman_datamodels.datamodels.open``. The files are named
+    by uuids, so that writers adding files to the same partitions do not
+    overwrite each other's (the ``_metadata`` file is still rewritten by
+    each of them). All the catalogs are validated, and their columns checked
+    against those of the dataset, before any file is written.
+
+    Parameters
+    ----------
+    models : Iterable[DataModel]
+        The catalog models to write, all with the same columns (their
+        ``source_catalog.meta`` may differ).
+
+    root : str or Path
+        The directory of the dataset. If it already holds a dataset, the
+        catalogs are added to it.
+
+    partition_by : Iterable[str]
+        The dot-separated names of the items of the models to partition
+        by, for example ``["meta.wcsinfo.skycell_name"]``. The partitions
+        are named by the last part of each name.
+
+    row_group_size : int or None
+        The number of rows of each row group, passed to ``to_parquet``.
+
+    compression : str or None
+        The compression codec of the columns, passed to ``to_parquet``.
+
+    Returns
+    -------
+    list[Path]
+        The files written.
+    """
+    import pyarrow.parquet as pq
+
+    root = Path(root)
+    partition_by = list(partition_by)
+    summary_path = root / _SUMMARY
+
+    schema = None
+    collector = []
+    if summary_path.exists():
+        summary = pq.read_metadata(summary_path)
+        schema = summary.schema.to_arrow_schema().remove_metadata()
+        collector.append(summary)
+
+    # All the catalogs are validated and checked against the dataset before any of them is written
+    tables = []
+    for model in models:
+        # Unique names, so that catalogs can be added to a dataset concurrently
+        path = root / _partition_path(model, partition_by) / f"part-{uuid.uuid4().hex}.parquet"
+        table = model._parquet_table(path)
+        # The metadata of the schemas is the meta of each catalog, only the columns are shared
+        table_schema = table.schema.remove_metadata()
+        if schema is None:
+            schema = table_schema
+        elif not table_schema.equals(schema, check_metadata=True):
+            raise ValueError(f"The columns of {model.meta.filename} do not match the columns of the dataset at '{root}'")
+        tables.append((path, table))
+
+    paths = []
+    for path, table in tables:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_table(table, path, row_group_size, compression)
+
+        metadata = pq.read_metadata(path)
+        metadata.set_file_path(path.relative_to(root).as_posix())
+        collector.append(metadata)
+        paths.append(path)
+
+    if schema is not None:
+        pq.write_metadata(schema, summary_path, metadata_collector=collector)
+
+    return paths
@@ -0,0 +1,265 @@
+"""
+Writing arrays to ASDF files without holding them in memory.
+    asdf needs the whole of an array in memory to write it. A `StreamedArray`
+    instead provides an array as chunks (for example the resultants of a ramp
+    read one at a time, or a memory mapped array), which are converted to the
+    dtype of the array a buffer at a time.
+
+    asdf writes a block from a whole array (and has no public way to write
+    one from chunks), so before asdf writes the tree each streamed array is
+    written a buffer at a time to a temporary memory mapped file, which asdf
+    then writes (and compresses) as any other array. While the file is written
+    a streamed array thus takes up to twice its size on disk, its temporary
+    copy being removed once written. Arrays already holding the streamed
+    array in C order with its dtype (for example a `numpy.memmap`) are
+    written directly, without a copy.
+
+    The streamed arrays are ordinary blocks of the file, tagged as ordinary
+    arrays, so they are read back as such (`StreamedArrayConverter` has no
+    tag of its own).
+"""
+
+from __future__ import annotations
+
+import math
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import numpy as np
+from asdf.extension import Converter, Extension
+from asdf.tagged import TaggedDict
+from asdf.tags.core.ndarray import numpy_dtype_to_asdf_datatype
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Iterator
+    from pathlib import Path
+    from typing import Any
+
+__all__ = ["STREAM_EXTENSION", "StreamedArray", "StreamedArrayConverter", "streamed_arrays"]
+
+# The default maximum number of bytes of a streamed array held in memory at once
+_BUFFER_SIZE = 1 << 24
+
+# The streamed arrays of the tree being written from the current thread, if any
+_LOCAL = threading.local()
+
+
+class StreamedArray:
+    """
+    An array which is written to ASDF files from chunks.
+        The elements of the array are read in C order from its source when it
+        is written, and converted to its dtype a buffer at a time. Sources
+        other than arrays can only be written once.
+
+    Parameters
+    ----------
+    source : array-like or Iterable[array-like]
+        An array (for example a `numpy.memmap`), which is read one index of
+        its first axis at a time, or an iterable of chunks (for example the
+        planes of a ramp) holding the elements of the array in C order.
+
+    shape : tuple[int, ...] or None
+        The shape of the array, by default the shape of the source array.
+
+    dtype : dtype or None
+        The dtype of the array, by default the dtype of the source array.
+    """
+
+    __slots__ = ("_consumed", "_source", "dtype", "shape")
+
+    def __init__(self, source: Any, shape: tuple[int, ...] | None = None, dtype: Any = None):
+        if hasattr(source, "shape") and hasattr(source, "dtype"):
+            if shape is not None and math.prod(shape) != math.prod(source.shape):
+                raise ValueError(f"Cannot stream an array of shape {source.shape} as shape {shape}")
+            shape = source.shape if shape is None else shape
+            dtype = source.dtype if dtype is None else dtype
+        elif shape is None or dtype is None:
+            raise ValueError("The shape and dtype of a streamed array are required unless its source is an array")
+
+        self._source = source
+        self._consumed = False
+        self.shape = tuple(int(size) for size in shape)
+        self.dtype = np.dtype(dtype)
+
+    def __repr__(self) -> str:
+        return f"<streamed array shape: {list(self.shape)} dtype: {self.dtype}>"
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return math.prod(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    def _chunks(self) -> Iterator[Any]:
+        source = self._source
+        if hasattr(source, "shape") and hasattr(source, "dtype"):
+            if len(source.shape) == 0:
+                yield source
+            else:
+                for index in range(source.shape[0]):
+                    yield source[index]
+            return
+
+        if self._consumed:
+            raise ValueError("The source of this streamed array has already been written")
+        self._consumed = True
+        yield from source
+
+    def buffers(self, buffer_size: int = _BUFFER_SIZE) -> Iterator[np.ndarray]:
+        """
+        Iterate over the bytes of the array (as uint8 arrays), at most buffer_size at a time.
+        """
+        step = max(buffer_size // self.dtype.itemsize, 1)
+        count = 0
+        for chunk in self._chunks():
+            flat = np.asarray(chunk).reshape(-1)
+            count += flat.size
+            if count > self.size:
+                break
+
+            for start in range(0, flat.size, step):
+                yield np.ascontiguousarray(flat[start : start + step], dtype=self.dtype).view(np.uint8)
+
+        if count != self.size:
+            raise ValueError(f"The source of a streamed array of shape {self.shape} does not hold {self.size} elements")
+
+
+def _materialize(array: StreamedArray, buffer_size: int, directory: str | Path | None) -> np.ndarray:
+    """
+    Write a streamed array, a buffer at a time, to a temporary memory mapped
+    file, unless its source already holds it in C order.
+    """
+    if array.nbytes == 0:
+        return np.empty(array.shape, array.dtype)
+
+    source = array._source
+    if isinstance(source, np.ndarray) and source.dtype == array.dtype and source.flags.c_contiguous:
+        return source.reshape(array.shape)
+
+    # The file is removed once it is closed, and its memory map once it is released
+    with tempfile.TemporaryFile(dir=directory) as fd:
+        materialized = np.memmap(fd, array.dtype, "w+", shape=array.shape)
+
+    data = materialized.reshape(-1).view(np.uint8)
+    start = 0
+    for buffer in array.buffers(buffer_size):
+        data[start : start + buffer.nbytes] = buffer
+        start += buffer.nbytes
+
+    return materialized
+
+
+class _StreamedArrays:
+    """
+    The streamed arrays of a tree being written, each with the memory mapped array asdf writes in its place.
+    """
+
+    def __init__(self, arrays: Iterable[StreamedArray], buffer_size: int, directory: str | Path | None):
+        self.arrays = {id(array): _materialize(array, buffer_size, directory) for array in arrays}
+
+    def get(self, array: Any) -> Any:
+        """
+        The array written in place of an array (itself unless it is streamed).
+        """
+        return self.arrays.get(id(array), array)
+
+    def resolve(self, arrays: Iterable[tuple[Any, str | None, dict[str, Any]]]) -> list[tuple[Any, str | None, dict[str, Any]]]:
+        """
+        Substitute the streamed arrays of (array, compression, kwargs) with the arrays written in their place.
+        """
+        return [(self.get(array), compression, kwargs) for array, compression, kwargs in arrays]
+
+
+@contextmanager
+def streamed_arrays(
+    arrays: Iterable[tuple[Any, str | None, dict[str, Any]]], buffer_size: int | None = None, directory: str | Path | None = None
+) -> Generator[_StreamedArrays, None, None]:
+    """
+    Write the streamed arrays of a tree which asdf writes from this thread.
+
+    Parameters
+    ----------
+    arrays : Iterable[tuple[array, str or None, dict]]
+        The arrays of the tree with their compression and its keyword
+        arguments (see `array_compressions`), of which the streamed arrays
+        are written by this.
+
+    buffer_size : int or None
+        The maximum number of bytes of each streamed array converted at once.
+
+    directory : str or Path or None
+        The directory of the temporary files holding the streamed arrays,
+        by default the temporary directory of the system.
+
+    Yields
+    ------
+    _StreamedArrays
+        The streamed arrays, with the arrays written in their place.
+    """
+    streams = _StreamedArrays(
+        (array for array, _, _ in arrays if isinstance(array, StreamedArray)), buffer_size or _BUFFER_SIZE, directory
+    )
+    previous = getattr(_LOCAL, "streams", None)
+    _LOCAL.streams = streams
+    try:
+        yield streams
+    finally:
+        _LOCAL.streams = previous
+
+
+class StreamedArrayConverter(Converter):
+    """
+    Converter writing streamed arrays as the arrays written in their place.
+        Outside of writing a file a streamed array is converted to a
+        reference to no block, which still lets the tree be validated.
+        Either way the array is tagged as an ordinary array, so it is read
+        back as one (this converter has no tag of its own).
+    """
+
+    @property
+    def tags(self):
+        return []
+
+    @property
+    def types(self):
+        return [StreamedArray]
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj, tag, ctx):
+        converter = ctx.extension_manager.get_converter_for_type(np.ndarray)
+        streams = getattr(_LOCAL, "streams", None)
+        if streams is not None and (array := streams.get(obj)) is not obj:
+            tag = converter.select_tag(array, ctx)
+            return TaggedDict(converter.to_yaml_tree(array, tag, ctx), tag)
+
+        datatype, byteorder = numpy_dtype_to_asdf_datatype(obj.dtype)
+        node = {"source": -1, "datatype": datatype, "byteorder": byteorder, "shape": list(obj.shape)}
+        return TaggedDict(node, converter.select_tag(np.empty(0, obj.dtype), ctx))
+
+    def from_yaml_tree(self, node, tag, ctx):
+        return ctx.extension_manager.get_converter_for_tag(tag).from_yaml_tree(node, tag, ctx)
+
+
+class _StreamExtension(Extension):
+    """
+    The ASDF extension writing streamed arrays.
+    """
+
+    extension_uri = "asdf://stsci.edu/datamodels/roman/extensions/streams-1.0.0"
+
+    @property
+    def converters(self):
+        return [StreamedArrayConverter()]
+
+
+STREAM_EXTENSION = _StreamExtension()
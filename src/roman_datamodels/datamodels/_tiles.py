@@ -0,0 +1,530 @@
+"""
+Storage of arrays in independently compressed tiles.
+    Arrays saved with a ``tile_shape`` (see `DataModel.to_asdf`) are written
+    to ASDF blocks using the ``rtil`` compression, which is provided by the
+    roman_datamodels ASDF extension. Such a block starts with an index of the
+    tiles, followed by the tiles each compressed on its own. asdf reads these
+    arrays back like any other, while `TiledArray` reads a region of one by
+    decompressing only the tiles overlapping the region.
+
+    asdf has no API to read part of a block, so `_Block` locates the block in
+    the file from the block index and the block header laid out by the ASDF
+    standard, and each read opens the file on its own. Arrays stored in files
+    without a block index (e.g. with a streamed block) are read whole by asdf
+    (through the compressor API) like any other array.
+
+    The layout of a block is (all integers are big-endian):
+        - version (uint8), ndim (uint8), compression of the tiles (4 bytes,
+          zeros for none) and itemsize (uint32)
+        - the shape of the array and the shape of the tiles (ndim uint64 each)
+        - the offsets of the tiles from the end of the index (ntiles + 1 uint64)
+        - the tiles in C order, each holding the elements of the array it
+          covers in C order
+"""
+
+from __future__ import annotations
+
+import bz2
+import itertools
+import math
+import operator
+import os
+import struct
+import zlib
+from typing import TYPE_CHECKING, NamedTuple
+
+import lz4.block
+import numpy as np
+import yaml
+from asdf.extension import Compressor, Converter, Extension
+from asdf.tags.core.ndarray import NDArrayType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+    from typing import Any, BinaryIO
+
+__all__ = ["TILE_COMPRESSION", "TILE_EXTENSION", "TileCompressor", "TiledArray", "TiledArrayConverter", "tile_compression"]
+
+TILE_COMPRESSION = "rtil"
+
+_VERSION = 1
+_HEADER = struct.Struct("!BB4sI")
+
+# The size of the tiles of blocks written without the shape of their array
+_DEFAULT_TILE_NBYTES = 1 << 20
+
+# The (compress, decompress) functions for the compression of the tiles
+_CODECS: dict[str | None, tuple[Callable[..., bytes], Callable[[bytes], bytes]]] = {
+    None: (bytes, bytes),
+    "lz4": (lz4.block.compress, lz4.block.decompress),
+    "zlib": (zlib.compress, zlib.decompress),
+    "bzp2": (bz2.compress, bz2.decompress),
+}
+
+# The start of a block: its magic, the size of its header and the header (see the ASDF standard)
+_BLOCK_MAGIC = b"\xd3BLK"
+_BLOCK_HEADER = struct.Struct("!4sHI4sQQQ16s")
+
+# The line starting the block index at the end of a file, which is searched for in the last bytes of the file
+_BLOCK_INDEX = b"#ASDF BLOCK INDEX"
+_BLOCK_INDEX_SEARCH = 1 << 20
+
+
+def _full_tile_shape(shape: tuple[int, ...], tile_shape: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Extend a tile shape covering the last dimensions of an array to all of its dimensions.
+    """
+    if len(tile_shape) > len(shape) or any(size < 1 for size in tile_shape):
+        raise ValueError(f"Invalid tile shape {tile_shape} for an array of shape {shape}")
+
+    return (1,) * (len(shape) - len(tile_shape)) + tuple(int(size) for size in tile_shape)
+
+
+def _grid(shape: tuple[int, ...], tile_shape: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    The number of tiles along each dimension of an array.
+    """
+    return tuple(-(-size // tile_size) for size, tile_size in zip(shape, tile_shape, strict=True))
+
+
+class _TileIndex(NamedTuple):
+    """
+    The index of the tiles of a block.
+    """
+
+    compression: str | None
+    itemsize: int
+    shape: tuple[int, ...]
+    tile_shape: tuple[int, ...]
+    offsets: np.ndarray
+
+    @classmethod
+    def read(cls, read: Callable[[int, int], bytes]) -> _TileIndex:
+        """
+        Read the index at the start of a block, with read(start, size) reading from the block.
+        """
+        version, ndim, compression, itemsize = _HEADER.unpack(read(0, _HEADER.size))
+        if version != _VERSION:
+            raise ValueError(f"Unsupported version of tiled block: {version}")
+
+        dims = np.frombuffer(read(_HEADER.size, 16 * ndim), ">u8")
+        shape = tuple(int(size) for size in dims[:ndim])
+        tile_shape = tuple(int(size) for size in dims[ndim:])
+
+        start = _HEADER.size + 16 * ndim
+        end = start + 8 * (math.prod(_grid(shape, tile_shape)) + 1)
+        offsets = np.frombuffer(read(start, end - start), ">u8").astype(np.int64) + end
+
+        return cls(compression.rstrip(b"\0").decode("ascii") or None, itemsize, shape, tile_shape, offsets)
+
+    @property
+    def grid(self) -> tuple[int, ...]:
+        return _grid(self.shape, self.tile_shape)
+
+    def slices(self, position: tuple[int, ...]) -> tuple[slice, ...]:
+        """
+        The region of the array covered by the tile at a position in the grid of tiles.
+        """
+        return tuple(
+            slice(index * tile_size, min((index + 1) * tile_size, size))
+            for index, tile_size, size in zip(position, self.tile_shape, self.shape, strict=True)
+        )
+
+    def decode(self, data: bytes, slices: tuple[slice, ...], dtype: Any) -> np.ndarray:
+        """
+        Decompress the tile covering a region of the array.
+        """
+        return np.frombuffer(_CODECS[self.compression][1](data), dtype).reshape([item.stop - item.start for item in slices])
+
+
+class TileCompressor(Compressor):
+    """
+    asdf compressor storing a block in independently compressed tiles.
+        The keyword arguments describe the array stored in the block, without
+        them the block is tiled as a one dimensional array of bytes.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...] or None
+        The shape of the array.
+
+    itemsize : int
+        The size of the elements of the array.
+
+    tile_shape : tuple[int, ...] or None
+        The shape of the tiles, covering the last dimensions of the array.
+
+    tile_compression : str or None
+        The compression of the tiles, one of ``"lz4"``, ``"zlib"``, ``"bzp2"`` or None.
+
+    tile_compression_kwargs : dict or None
+        The keyword arguments for the compression of the tiles.
+    """
+
+    label = TILE_COMPRESSION.encode("ascii")
+
+    def compress(
+        self,
+        data: Any,
+        shape: tuple[int, ...] | None = None,
+        itemsize: int = 1,
+        tile_shape: tuple[int, ...] | None = None,
+        tile_compression: str | None = "lz4",
+        tile_compression_kwargs: dict[str, Any] | None = None,
+    ) -> Iterator[bytes]:
+        shape = (len(data) // itemsize,) if shape is None else tuple(shape)
+        if tile_shape is None:
+            tile_shape = (max(_DEFAULT_TILE_NBYTES // itemsize, 1),)
+        index = _TileIndex(tile_compression, itemsize, shape, _full_tile_shape(shape, tuple(tile_shape)), np.empty(0))
+
+        if math.prod(shape) * itemsize != len(data):
+            raise ValueError(f"Cannot tile {len(data)} bytes as an array of shape {shape} with itemsize {itemsize}")
+
+        array = np.frombuffer(data, f"V{itemsize}").reshape(shape)
+        encode = _CODECS[tile_compression][0]
+        tiles = [
+            encode(array[index.slices(position)].tobytes(), **(tile_compression_kwargs or {}))
+            for position in np.ndindex(index.grid)
+        ]
+
+        yield _HEADER.pack(_VERSION, len(shape), (tile_compression or "").encode("ascii").ljust(4, b"\0"), itemsize)
+        yield np.array([*shape, *index.tile_shape], ">u8").tobytes()
+        yield np.cumsum([0, *map(len, tiles)]).astype(">u8").tobytes()
+        yield from tiles
+
+    def decompress(self, blocks: Iterator[Any], out: Any, **kwargs: Any) -> int:
+        buffer = b"".join(blocks)
+        index = _TileIndex.read(lambda start, size: buffer[start : start + size])
+
+        array = np.ndarray(index.shape, f"V{index.itemsize}", out)
+        for number, position in enumerate(np.ndindex(index.grid)):
+            slices = index.slices(position)
+            array[slices] = index.decode(buffer[index.offsets[number] : index.offsets[number + 1]], slices, array.dtype)
+
+        return array.nbytes
+
+
+def tile_compression(
+    array: Any, compression: str | None, compression_kwargs: dict[str, Any], tile_shape: tuple[int, ...]
+) -> tuple[str, dict[str, Any]] | None:
+    """
+    Get the compression storing an array in tiles.
+
+    Parameters
+    ----------
+    array : array
+        The array to store.
+
+    compression : str or None
+        The compression of the tiles.
+
+    compression_kwargs : dict
+        The keyword arguments for the compression of the tiles.
+
+    tile_shape : tuple[int, ...]
+        The shape of the tiles, covering the last dimensions of the array.
+
+    Returns
+    -------
+    tuple[str, dict] or None
+        The compression and its keyword arguments, None if the array cannot
+        be tiled (or would fit in a single tile).
+    """
+    if compression not in _CODECS or isinstance(array, np.ma.MaskedArray) or len(array.shape) < len(tile_shape):
+        return None
+
+    # The tiles cover the block asdf writes, which has to hold exactly the array
+    data = np.asarray(array)
+    base = data
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    if (
+        not data.flags.c_contiguous
+        or base.nbytes != data.nbytes
+        or base.__array_interface__["data"][0] != data.__array_interface__["data"][0]
+    ):
+        return None
+
+    tile_shape = _full_tile_shape(data.shape, tuple(tile_shape))
+    if math.prod(_grid(data.shape, tile_shape)) <= 1:
+        return None
+
+    kwargs = {
+        "shape": data.shape,
+        "itemsize": data.dtype.itemsize,
+        "tile_shape": tile_shape,
+        "tile_compression": compression,
+        "tile_compression_kwargs": dict(compression_kwargs),
+    }
+    return TILE_COMPRESSION, kwargs
+
+
+def _region(key: Any, shape: tuple[int, ...]) -> tuple[list[tuple[int, int]], tuple[Any, ...]] | None:
+    """
+    Get the bounds of the region of an array selected by a key, together with
+    the key selecting the same elements from the region.
+
+    Returns None for keys other than integers, slices and an ellipsis.
+    """
+    key = key if isinstance(key, tuple) else (key,)
+    if (ellipses := sum(item is Ellipsis for item in key)) > 1:
+        return None
+    if ellipses:
+        at = next(index for index, item in enumerate(key) if item is Ellipsis)
+        key = key[:at] + (slice(None),) * (len(shape) - len(key) + 1) + key[at + 1 :]
+    if len(key) > len(shape):
+        return None
+    key += (slice(None),) * (len(shape) - len(key))
+
+    bounds = []
+    local = []
+    for item, size in zip(key, shape, strict=True):
+        if isinstance(item, slice):
+            selected = range(*item.indices(size))
+            if not selected:
+                bounds.append((0, 0))
+                local.append(slice(0, 0))
+                continue
+            low = min(selected[0], selected[-1])
+            stop = selected.start - low + len(selected) * selected.step
+            bounds.append((low, max(selected[0], selected[-1]) + 1))
+            local.append(slice(selected.start - low, stop if stop >= 0 else None, selected.step))
+        elif isinstance(item, bool | np.bool_):
+            return None
+        else:
+            try:
+                index = operator.index(item)
+            except TypeError:
+                return None
+            if not -size <= index < size:
+                raise IndexError(f"index {index} is out of bounds for axis with size {size}")
+            index %= size
+            bounds.append((index, index + 1))
+            local.append(0)
+
+    return bounds, tuple(local)
+
+
+def _block_offsets(fd: BinaryIO) -> list[int] | None:
+    """
+    Read the offsets of the blocks of a file from its block index, None if it has none.
+    """
+    size = fd.seek(0, os.SEEK_END)
+    fd.seek(max(size - _BLOCK_INDEX_SEARCH, 0))
+    tail = fd.read()
+    if (at := tail.rfind(_BLOCK_INDEX)) < 0:
+        return None
+
+    try:
+        offsets = yaml.safe_load(tail[at + len(_BLOCK_INDEX) :])
+    except yaml.YAMLError:
+        return None
+
+    if not isinstance(offsets, list) or not all(isinstance(offset, int) for offset in offsets):
+        return None
+
+    return offsets
+
+
+class _Block(NamedTuple):
+    """
+    The location of the data of a tiled block in a file.
+    """
+
+    path: str
+    offset: int
+
+    @classmethod
+    def find(cls, path: str, source: int) -> _Block | None:
+        """
+        Locate the block with a number (the ``source`` of an array) in a file,
+        None if the file has no block index or the block is not tiled.
+        """
+        with open(path, "rb") as fd:
+            if (offsets := _block_offsets(fd)) is None or not 0 <= source < len(offsets):
+                return None
+
+            fd.seek(offsets[source])
+            header = fd.read(_BLOCK_HEADER.size)
+
+        if len(header) < _BLOCK_HEADER.size:
+            return None
+
+        magic, header_size, _, compression, *_ = _BLOCK_HEADER.unpack(header)
+        if magic != _BLOCK_MAGIC or compression != TileCompressor.label:
+            return None
+
+        return cls(path, offsets[source] + len(_BLOCK_MAGIC) + 2 + header_size)
+
+
+class TiledArray(NDArrayType):
+    """
+    A lazily loaded array stored in tiles.
+        Indexing the array with integers and slices, before it is loaded,
+        decompresses only the tiles holding the selected elements and returns
+        a new array. Any other use loads the whole array through the lazily
+        loaded array it wraps.
+
+    Parameters
+    ----------
+    array : NDArrayType
+        The lazily loaded array.
+
+    block : _Block
+        The location of the tiled block of the array.
+    """
+
+    def __init__(self, array: NDArrayType, block: _Block):
+        # The wrapped array holds the state of the array, the one of NDArrayType is unused
+        self._lazy = array
+        self._block = block
+        self._loaded = None
+        self._index = None
+
+    @classmethod
+    def from_array(cls, array: NDArrayType, path: str, node: Mapping[str, Any]) -> TiledArray | None:
+        """
+        Wrap a lazily loaded array if it is stored in a tiled block.
+
+        Parameters
+        ----------
+        array : NDArrayType
+            The lazily loaded array.
+
+        path : str
+            The file the array is read from.
+
+        node : Mapping
+            The YAML (tagged) node of the array in the file.
+        """
+        if (
+            type(array) is not NDArrayType
+            or not isinstance(source := node.get("source"), int)
+            or node.get("mask") is not None
+            or node.get("strides") is not None
+            or node.get("offset", 0)
+            or (block := _Block.find(path, source)) is None
+        ):
+            return None
+
+        return cls(array, block)
+
+    def _make_array(self) -> np.ndarray:
+        if self._loaded is None:
+            self._loaded = np.asarray(self._lazy)
+
+        return self._loaded
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._lazy.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._lazy.dtype
+
+    def __len__(self) -> int:
+        return len(self._lazy)
+
+    def __repr__(self) -> str:
+        return repr(self._lazy if self._loaded is None else self._loaded)
+
+    def __str__(self) -> str:
+        return str(self._lazy if self._loaded is None else self._loaded)
+
+    def __setitem__(self, *args: Any) -> None:
+        self._make_array().__setitem__(*args)
+
+    def _read(self, fd: BinaryIO, start: int, size: int) -> bytes:
+        """
+        Read bytes of the block from the file.
+        """
+        fd.seek(self._block.offset + start)
+        return fd.read(size)
+
+    def _tile_index(self, fd: BinaryIO) -> _TileIndex | None:
+        """
+        The index of the tiles, None if the tiles do not match the array.
+        """
+        if self._index is None:
+            index = _TileIndex.read(lambda start, size: self._read(fd, start, size))
+            self._index = index if index.shape == self.shape and index.itemsize == self.dtype.itemsize else False
+
+        return self._index or None
+
+    def __getitem__(self, key: Any) -> Any:
+        if self._loaded is None and self._index is not False and (region := _region(key, self.shape)):
+            bounds, local = region
+            with open(self._block.path, "rb") as fd:
+                if (index := self._tile_index(fd)) is not None:
+                    return self._read_region(fd, index, bounds)[local]
+
+        return self._make_array()[key]
+
+    def _read_region(self, fd: BinaryIO, index: _TileIndex, bounds: list[tuple[int, int]]) -> np.ndarray:
+        """
+        Read the region of the array within the (low, high) bounds along each dimension.
+        """
+        region = np.empty([high - low for low, high in bounds], self.dtype)
+        positions = [
+            range(low // tile_size, -(-high // tile_size))
+            for (low, high), tile_size in zip(bounds, index.tile_shape, strict=True)
+        ]
+        for position in itertools.product(*positions):
+            number = int(np.ravel_multi_index(position, index.grid))
+            start, stop = index.offsets[number], index.offsets[number + 1]
+            slices = index.slices(position)
+            tile = index.decode(self._read(fd, int(start), int(stop - start)), slices, self.dtype)
+
+            overlap = [(max(low, item.start), min(high, item.stop)) for (low, high), item in zip(bounds, slices, strict=True)]
+            region[tuple(slice(first - low, last - low) for (first, last), (low, _) in zip(overlap, bounds, strict=True))] = tile[
+                tuple(slice(first - item.start, last - item.start) for (first, last), item in zip(overlap, slices, strict=True))
+            ]
+
+        return region
+
+
+class TiledArrayConverter(Converter):
+    """
+    Converter writing tiled arrays as ordinary arrays, which are then handled by asdf.
+
+    It has no tag of its own, so reading a file gives ordinary arrays, which
+    are wrapped when they are stored in tiles once the file is opened as a
+    model (see `TiledArray.from_array`).
+    """
+
+    @property
+    def tags(self):
+        return []
+
+    @property
+    def types(self):
+        return [TiledArray]
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj, tag, ctx):
+        return np.asarray(obj)
+
+    def from_yaml_tree(self, node, tag, ctx):
+        return ctx.extension_manager.get_converter_for_tag(tag).from_yaml_tree(node, tag, ctx)
+
+
+class _TileExtension(Extension):
+    """
+    The ASDF extension providing the tiled storage of arrays.
+    """
+
+    extension_uri = "asdf://stsci.edu/datamodels/roman/extensions/tiles-1.0.0"
+
+    @property
+    def converters(self):
+        return [TiledArrayConverter()]
+
+    @property
+    def compressors(self):
+        return [TileCompressor()]
+
+
+TILE_EXTENSION = _TileExtension()
@@ -5,19 +5,23 @@ This module contains the utility functions for the datamodels sub-package. Mainl
 
 from __future__ import annotations
 
+import threading
 import warnings
 from collections.abc import Generator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import asdf
 import numpy as np
+from asdf.tags.core.ndarray import NDArrayType
 from astropy import time
 
 from roman_datamodels._stnode import TaggedScalarNode
 
 from ._core import MODEL_REGISTRY, DataModel
+from ._tiles import TILE_EXTENSION, TiledArray
 
 if TYPE_CHECKING:
     from roman_datamodels._stnode import DNode, LNode
@@ -251,7 +255,108 @@ def _open_asdf(init, lazy_tree=True, **kwargs):
     return asdf_file
 
 
-def rdm_open(init, memmap=False, **kwargs):
+def _get_path(node, key):
+    """
+    Get the item at a dotted key (e.g. ``"meta.exposure.start_time"``) from a tree.
+    """
+    for part in key.split("."):
+        node = node[part if isinstance(node, Mapping) else int(part)]
+    return node
+
+
+def _set_path(node, key, value):
+    """
+    Set the item at a dotted key in a tree.
+    """
+    parent_key, _, part = key.rpartition(".")
+    parent = _get_path(node, parent_key) if parent_key else node
+    parent[part if isinstance(parent, Mapping) else int(part)] = value
+
+
+def _open_tiled_arrays(model, path):
+    """
+    Replace the lazily loaded arrays of a freshly opened model which are stored
+    in tiles with `TiledArray`, so slicing them only reads the tiles needed.
+        Only files opened from a path and written using the tiles extension
+        are searched for them.
+    """
+    history = model._asdf.tree.get("history")
+    extensions = history.get("extensions", []) if isinstance(history, Mapping) else []
+    if path is None or not any(extension.get("extension_uri") == TILE_EXTENSION.extension_uri for extension in extensions):
+        return
+
+    tree = None
+    for key, value in model.items():
+        if type(value) is not NDArrayType:
+            continue
+
+        if tree is None:
+            tree = asdf.util.load_yaml(str(path), tagged=True)["roman"]
+        if (tiled := TiledArray.from_array(value, str(path), _get_path(tree, key))) is not None:
+            _set_path(model._instance, key, tiled)
+
+
+def _prefetch_arrays(model, path, prefetch, workers=None, memmap=False):
+    """
+    Load the lazily loaded arrays of a freshly opened model concurrently.
+        asdf reads all the blocks of a file through one file handle, so each
+        worker thread opens the file for itself to read and decompress arrays.
+        The loaded arrays replace the lazy ones in the model.
+
+    Parameters
+    ----------
+    model : DataModel
+        The model opened from path.
+
+    path : str, Path or None
+        The file the model was opened from, if None the arrays are loaded
+        one after the other by the model's own file.
+
+    prefetch : bool or Iterable[str]
+        Dot-separated names of the arrays to load, or True for all of them.
+
+    workers : int or None
+        The maximum number of threads to load with.
+
+    memmap : bool
+        If the model was opened with memmap, in which case only the
+        compressed arrays (which cannot be memory mapped) are loaded.
+    """
+    if prefetch is True:
+        keys = [key for key, value in model.items() if isinstance(value, NDArrayType)]
+    else:
+        keys = [key for key in prefetch if isinstance(_get_path(model._instance, key), NDArrayType)]
+
+    if memmap:
+        keys = [key for key in keys if model._asdf.get_array_compression(_get_path(model._instance, key))]
+
+    if path is None:
+        for key in keys:
+            _set_path(model._instance, key, np.asarray(_get_path(model._instance, key)))
+        return
+
+    local = threading.local()
+    asdf_files = []
+
+    def load(key):
+        if (asdf_file := getattr(local, "asdf_file", None)) is None:
+            # The model itself was already validated
+            with asdf.config_context() as config:
+                config.validate_on_read = False
+                asdf_file = local.asdf_file = asdf.open(path, lazy_tree=True, memmap=False)
+            asdf_files.append(asdf_file)
+        return np.asarray(_get_path(asdf_file["roman"], key))
+
+    try:
+        with ThreadPoolExecutor(workers) as executor:
+            for key, array in zip(keys, executor.map(load, keys), strict=True):
+                _set_path(model._instance, key, array)
+    finally:
+        for asdf_file in asdf_files:
+            asdf_file.close()
+
+
+def rdm_open(init, memmap=False, prefetch=None, workers=None, **kwargs):
     """
     Datamodel open/create function.
         This function opens a Roman datamodel from an asdf file or generates
@@ -265,8 +370,17 @@ def rdm_open(init, memmap=False, **kwargs):
             - string or ``Path`` indicating the path to an ASDF file
             - `DataModel` Roman data model instance
             - file-like object compatible with `asdf.open`
+            - string or ``Path`` indicating the path to a source catalog
+              parquet file (saved with ``to_parquet``), the ``columns`` and
+              ``filters`` to read can be passed as keyword arguments
     memmap : bool
         Open ASDF file binary data using memmap (default: False)
+    prefetch : bool or Iterable[str] or None
+        Arrays to load (and decompress) concurrently before returning, given
+        by their dot-separated names (for example ``["data", "groupdq"]``),
+        or True for all arrays. By default arrays are loaded on first access.
+    workers : int or None
+        The maximum number of threads used to prefetch arrays.
 
     Returns
     -------
@@ -281,6 +395,11 @@ def rdm_open(init, memmap=False, **kwargs):
             except ImportError as err:
                 raise ImportError("Please install romancal to allow opening associations with roman_datamodels") from err
 
+        if Path(init).suffix.lower() == ".parquet":
+            from ._parquet import read_parquet
+
+            return read_parquet(init, **kwargs)
+
     if isinstance(init, DataModel):
         # Copy the object so it knows not to close here
         return init.copy(deepcopy=False)
@@ -297,7 +416,16 @@ def rdm_open(init, memmap=False, **kwargs):
         raise ValueError(f"'{init}' is not a roman file, please use asdf.open")
 
     if (model_type := type(asdf_file.tree["roman"])) in MODEL_REGISTRY:
-        return MODEL_REGISTRY[model_type](asdf_file, **kwargs)
+        model = MODEL_REGISTRY[model_type](asdf_file, **kwargs)
+        try:
+            path = init if isinstance(init, str | Path) else None
+            if prefetch:
+                _prefetch_arrays(model, path, prefetch, workers, memmap)
+            _open_tiled_arrays(model, path)
+        except Exception:
+            model.close()
+            raise
+        return model
 
     if not isinstance(init, asdf.AsdfFile):
         asdf_file.close()
@@ -0,0 +1,398 @@
+"""
+Incremental validation of datamodels.
+    A model takes a snapshot of the containers of its tree after each
+    successful validation. The next validation only re-validates the parts of
+    the tree written to since then (found by comparing the tree with the
+    snapshot, so however they were written to): the keys of the containers
+    on the way to each written item are checked against the parts of the
+    schemas constraining them (``type``, ``required``, ...), and each written
+    item against the schemas of its key. Anything the schemas do not allow to
+    be split like this (e.g. ``anyOf``) is validated as a whole.
+
+    The schemas only constrain the shape and dtype of arrays, so the arrays
+    of a tree are validated from placeholders holding only those, without
+    preparing their blocks or reading the lazily loaded ones (but those
+    stored in streamed blocks, whose shapes are only known from their data).
+    The arrays held by other objects (e.g. tables) are converted by asdf as
+    usual, through an asdf file of its own so that the options asdf assigns
+    to their blocks are discarded with it rather than kept by the file of the
+    model.
+"""
+
+from __future__ import annotations
+
+import copy
+import time
+import weakref
+from functools import cached_property
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import asdf
+import numpy as np
+from asdf import schema, yamlutil
+from asdf.tagged import get_tag
+from asdf.tags.core import NDArrayType
+from asdf.util import load_yaml
+
+from roman_datamodels._stnode import DNode, LNode, TaggedListNode, TaggedObjectNode
+from roman_datamodels._stnode._node import (
+    _ARRAY_TYPES,
+    _DICT_TYPES,
+    _NODE_TYPES,
+    _changes,
+    _container,
+    _copy_container,
+    _iter_children,
+    _snapshot,
+)
+
+from ._streaming import StreamedArray
+
+if TYPE_CHECKING:
+    from typing import Any
+
+__all__ = ["ValidationReport"]
+
+# Schema keywords checked against only the keys of a container
+_STRUCTURAL = frozenset(("type", "required", "minProperties", "maxProperties", "additionalProperties", "minItems", "maxItems"))
+
+# Schema keywords which do not constrain the tree
+_ANNOTATIONS = frozenset(
+    (
+        "$schema",
+        "id",
+        "title",
+        "description",
+        "default",
+        "examples",
+        "$comment",
+        "definitions",
+        "propertyOrder",
+        "flowStyle",
+        "datamodel_name",
+        "archive_meta",
+        "archive_catalog",
+        "sdf",
+        "extName",
+    )
+)
+
+# Schema keywords by which a schema is split into the schemas of the items of a container,
+#   the tag of a node cannot change without the node being replaced in its parent
+_SPLIT = frozenset(("properties", "items", "allOf", "tag"))
+
+# The resolved schemas of each tag
+_TAG_SCHEMAS: dict[str, list[dict]] = {}
+
+# Checking the types of leaves (e.g. long lists of strings) dominates walking trees, so it is cached by type
+_IS_NODE: dict[type, bool] = {}
+
+# The streamed arrays of each asdf file
+_STREAMED: weakref.WeakKeyDictionary[asdf.AsdfFile, _StreamedArrays] = weakref.WeakKeyDictionary()
+
+_NDARRAY_TAG = "tag:stsci.edu:asdf/core/ndarray-"
+
+
+class ValidationReport(NamedTuple):
+    """
+    The report of validating a model with `DataModel.validate`.
+
+    ``full`` is True if the whole tree was validated, ``timings`` holds
+    the seconds spent validating each part of the tree (by dot-separated
+    name, ``""`` for the whole tree) and ``bytes_read`` counts the bytes of
+    the arrays which had to be read to validate them (those of streamed
+    blocks, whose shapes are not stored).
+    """
+
+    full: bool
+    timings: dict[str, float]
+    bytes_read: int
+
+
+class _ValidationState(NamedTuple):
+    """
+    The state of a tree when it was last validated, with the report of the validation.
+    """
+
+    asdf_file: asdf.AsdfFile
+    root: Any
+    snapshot: dict[tuple, list]
+    report: ValidationReport
+
+
+class _StreamedArrays:
+    """
+    The paths of the arrays of the ``roman`` tree of an asdf file stored in
+    streamed blocks, read from the tree of the file it was opened from the
+    first time they are needed.
+    """
+
+    def __init__(self, asdf_file: asdf.AsdfFile):
+        uri = urlparse(asdf_file.uri or "")
+        self.path = url2pathname(uri.path) if uri.scheme in ("", "file") and uri.path else None
+
+    @cached_property
+    def paths(self) -> frozenset[tuple]:
+        if self.path is None:
+            return frozenset()
+
+        paths = set()
+        stack = [((), load_yaml(self.path, tagged=True).get("roman"))]
+        while stack:
+            path, node = stack.pop()
+            if isinstance(node, dict) and (get_tag(node) or "").startswith(_NDARRAY_TAG):
+                if "*" in node.get("shape", ()):
+                    paths.add(path)
+            elif isinstance(node, dict):
+                stack.extend(((*path, key), value) for key, value in node.items())
+            elif isinstance(node, list):
+                stack.extend(((*path, index), value) for index, value in enumerate(node))
+
+        return frozenset(paths)
+
+    @classmethod
+    def of(cls, asdf_file: asdf.AsdfFile) -> _StreamedArrays:
+        if (streamed := _STREAMED.get(asdf_file)) is None:
+            streamed = _STREAMED[asdf_file] = cls(asdf_file)
+
+        return streamed
+
+
+def _tag_schemas(ctx: asdf.AsdfFile, tag: str) -> list[dict]:
+    if tag not in _TAG_SCHEMAS:
+        _TAG_SCHEMAS[tag] = [
+            schema.load_schema(uri, resolve_references=True) for uri in ctx.extension_manager.get_tag_definition(tag).schema_uris
+        ]
+
+    return _TAG_SCHEMAS[tag]
+
+
+def _branches(schemas: list[Any]) -> list[dict] | None:
+    """
+    Flatten the ``allOf`` of schemas, or None if they cannot be split into the schemas of their items.
+    """
+    branches = []
+    stack = list(schemas)
+    while stack:
+        branch = stack.pop()
+        if (
+            not isinstance(branch, dict)
+            or not branch.keys() <= _STRUCTURAL | _ANNOTATIONS | _SPLIT
+            or isinstance(branch.get("additionalProperties"), dict)
+            or not isinstance(branch.get("items", {}), dict)
+        ):
+            return None
+
+        branches.append(branch)
+        stack.extend(branch.get("allOf", ()))
+
+    return branches
+
+
+def _item_schemas(branches: list[dict], key: Any) -> list[Any]:
+    if isinstance(key, int):
+        return [branch["items"] for branch in branches if "items" in branch]
+
+    return [branch["properties"][key] for branch in branches if key in branch.get("properties", {})]
+
+
+def _is_node(value: Any) -> bool:
+    if (is_node := _IS_NODE.get(value_type := type(value))) is None:
+        is_node = _IS_NODE[value_type] = issubclass(value_type, _NODE_TYPES)
+
+    return is_node
+
+
+def _without_arrays(node: Any, read: list[NDArrayType], streamed: _StreamedArrays, path: tuple = ()) -> Any:
+    """
+    Substitute the arrays of a tree (in memory or lazily loaded) with
+    placeholders of the same shape and dtype, which are converted to
+    references to no block, copying the containers holding them.
+
+    Parameters
+    ----------
+    node : Any
+        The tree.
+
+    read : list[NDArrayType]
+        The lazily loaded arrays which had to be read to get their shapes
+        are added to this list.
+
+    streamed : _StreamedArrays
+        The streamed arrays of the file of the tree.
+
+    path : tuple
+        The path of the tree in the ``roman`` tree of the file.
+
+    Returns
+    -------
+    Any
+        The tree, or its copy if any arrays were substituted.
+    """
+    if type(node) is np.ndarray:
+        return StreamedArray(node)
+
+    if isinstance(node, NDArrayType):
+        if path in streamed.paths:
+            read.append(node)
+        return StreamedArray((), node.shape, node.dtype)
+
+    if not _is_node(node):
+        return node
+
+    replaced = {}
+    for key, value in _iter_children(node):
+        if (_is_node(value) or isinstance(value, _ARRAY_TYPES)) and (
+            new := _without_arrays(value, read, streamed, (*path, key))
+        ) is not value:
+            replaced[key] = new
+
+    if not replaced:
+        return node
+
+    container = _copy_container(_container(node))
+    for key, value in replaced.items():
+        container[key] = value
+
+    if isinstance(node, DNode):
+        node_copy = node.copy()
+        node_copy._data = container
+        return node_copy
+
+    if isinstance(node, LNode):
+        node_copy = node.copy()
+        node_copy.data = container
+        return node_copy
+
+    return tuple(container) if isinstance(node, tuple) else container
+
+
+def _converting_file(asdf_file: asdf.AsdfFile) -> asdf.AsdfFile:
+    """
+    Create an asdf file converting trees as the given one does, holding the
+    options asdf assigns to the blocks of the arrays it converts instead.
+    """
+    return asdf.AsdfFile(version=asdf_file.version_string, extensions=asdf_file.extensions)
+
+
+def _written(root: Any, snapshot: dict[tuple, list]) -> dict | bool:
+    """
+    The parts of a tree written to since a snapshot of it, as a trie of keys
+    ending with True for each item written to, or True if the whole tree may
+    have changed.
+    """
+    trie: dict = {}
+    for parts in _changes(snapshot, root):
+        if not parts:
+            return True
+
+        node = trie
+        for part in parts[:-1]:
+            if (node := node.setdefault(part, {})) is True:
+                break
+        else:
+            node[parts[-1]] = True
+
+    return trie
+
+
+class _Validator:
+    """
+    Validate the parts of a tree written to against the schemas of its root.
+    """
+
+    def __init__(self, ctx: asdf.AsdfFile):
+        self.ctx = ctx
+        self.timings: dict[str, float] = {}
+        self.read: list[NDArrayType] = []
+
+    @cached_property
+    def converting_file(self) -> asdf.AsdfFile:
+        return _converting_file(self.ctx)
+
+    def _validate(self, path: tuple, instance: Any, schemas: list[Any], convert: bool = True) -> None:
+        start = time.perf_counter()
+        if convert:
+            instance = _without_arrays(instance, self.read, _StreamedArrays.of(self.ctx), path)
+            instance = yamlutil.custom_tree_to_tagged_tree(instance, self.converting_file)
+        schema.validate(instance, self.ctx, schema={"allOf": schemas} if schemas else {})
+
+        name = ".".join(str(part) for part in path)
+        self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+
+    def validate(self, path: tuple, node: Any, schemas: list[Any], written: dict | bool) -> None:
+        branches = None
+        if written is not True and isinstance(node, _NODE_TYPES):
+            # asdf validates tagged nodes against the schemas of their tags by itself
+            if isinstance(node, TaggedObjectNode | TaggedListNode):
+                branches = _branches([*schemas, *_tag_schemas(self.ctx, node.tag)])
+            else:
+                branches = _branches(schemas)
+
+        if branches is None:
+            self._validate(path, node, schemas)
+            return
+
+        # Check the keys of the container
+        container = _container(node)
+        keys = list(container.keys()) if isinstance(container, _DICT_TYPES) else range(len(container))
+        shallow = dict.fromkeys(keys) if isinstance(container, _DICT_TYPES) else [None] * len(container)
+        structure = []
+        for branch in branches:
+            if checks := {keyword: branch[keyword] for keyword in _STRUCTURAL if keyword in branch}:
+                if "properties" in branch:
+                    checks["properties"] = {key: {} for key in branch["properties"]}
+                structure.append(checks)
+        self._validate(path, shallow, structure, convert=False)
+
+        for key, value in written.items():
+            if key in keys:
+                self.validate((*path, key), container[key], _item_schemas(branches, key), value)
+
+
+def validate_incrementally(asdf_file: asdf.AsdfFile, state: _ValidationState | None, full: bool = False) -> _ValidationState:
+    """
+    Validate the ``roman`` tree of an asdf file, re-validating only the parts
+    of it written to since it was last validated.
+
+    Parameters
+    ----------
+    asdf_file : asdf.AsdfFile
+        The asdf file of the model.
+
+    state : _ValidationState or None
+        The state of the tree when it was last validated successfully.
+
+    full : bool
+        If True, validate the whole file regardless of the state.
+
+    Returns
+    -------
+    _ValidationState
+        The state to pass to the next validation, holding the report of this one.
+    """
+    root = asdf_file.tree.get("roman")
+    written = True
+    if not full and state is not None and state.asdf_file is asdf_file and state.root is root:
+        written = _written(root, state.snapshot)
+
+    if written is True or not isinstance(root, TaggedObjectNode):
+        start = time.perf_counter()
+        read: list[NDArrayType] = []
+        tree = asdf_file.tree
+        if (view := _without_arrays(root, read, _StreamedArrays.of(asdf_file))) is not root:
+            tree = copy.copy(tree)
+            tree["roman"] = view
+        schema.validate(yamlutil.custom_tree_to_tagged_tree(tree, _converting_file(asdf_file)), asdf_file)
+
+        report = ValidationReport(True, {"": time.perf_counter() - start}, sum(array.nbytes for array in read))
+        return _ValidationState(asdf_file, root, _snapshot(root) if isinstance(root, TaggedObjectNode) else {}, report)
+
+    validator = _Validator(asdf_file)
+    if written:
+        validator.validate((), root, [], written)
+
+    report = ValidationReport(False, validator.timings, sum(array.nbytes for array in validator.read))
+    return _ValidationState(asdf_file, root, _snapshot(root), report)
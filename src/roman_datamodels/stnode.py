@@ -1,5 +1,6 @@
 import warnings
 
+from . import _stnode
 from ._stnode import *  # noqa: F403
 
 warnings.warn(
@@ -7,3 +8,8 @@ warnings.warn(
     DeprecationWarning,
     stacklevel=2,
 )
+
+
+def __getattr__(name):
+    # Forward to _stnode so node classes which have not been created yet (in lazy mode) are available
+    return getattr(_stnode, name)
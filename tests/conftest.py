@@ -1,10 +1,27 @@
+import os
+
 import asdf
 import pytest
 
+# The tests use their own on-disk cache (see the session_cache_dir fixture), which cannot be set up before
+#   roman_datamodels is imported to collect them, so keep that import away from the user's cache
+os.environ["ROMAN_DATAMODELS_NO_CACHE"] = "1"
+
 from roman_datamodels._stnode._registry import OBJECT_NODE_CLASSES_BY_PATTERN, SCHEMA_URIS_BY_TAG
 from roman_datamodels._stnode._stnode import _MANIFESTS as MANIFESTS
 
 
+@pytest.fixture(scope="session", autouse=True)
+def session_cache_dir(tmp_path_factory):
+    """
+    Keep the on-disk cache written by the tests (and their subprocesses) out of the user's cache.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROMAN_DATAMODELS_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        monkeypatch.delenv("ROMAN_DATAMODELS_NO_CACHE", raising=False)
+        yield
+
+
 @pytest.fixture(scope="session", params=MANIFESTS)
 def manifest(request):
     return request.param
@@ -0,0 +1,160 @@
+import asdf
+import pytest
+
+import roman_datamodels
+from roman_datamodels._stnode import _cache, _schema
+from roman_datamodels._stnode._registry import SCHEMA_URIS_BY_TAG
+from roman_datamodels._stnode._stnode import _MANIFEST_PATHS, _TAG_TABLE, _build_tag_table
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("ROMAN_DATAMODELS_NO_CACHE", raising=False)
+    monkeypatch.setenv("ROMAN_DATAMODELS_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+class _Builder:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.payload
+
+
+def test_tag_table_matches_manifests():
+    """The tag table in use (cached or not) matches a freshly built one"""
+    assert _TAG_TABLE == _build_tag_table(_MANIFEST_PATHS)
+
+
+def test_cache_dir_env(cache_dir, monkeypatch):
+    assert _cache.cache_dir() == cache_dir
+
+    monkeypatch.setenv("ROMAN_DATAMODELS_NO_CACHE", "1")
+    assert _cache.cache_dir() is None
+
+
+def test_load_cached(cache_dir):
+    build = _Builder({"a": [1, 2, 3]})
+
+    assert _cache.load_cached("test", "key", build) == {"a": [1, 2, 3]}
+    assert build.calls == 1
+    assert (cache_dir / "test.bin").exists()
+
+    assert _cache.load_cached("test", "key", build) == {"a": [1, 2, 3]}
+    assert build.calls == 1
+
+    # A new key invalidates the entry
+    assert _cache.load_cached("test", "other_key", build) == {"a": [1, 2, 3]}
+    assert build.calls == 2
+
+
+def test_load_cached_disabled(cache_dir, monkeypatch):
+    monkeypatch.setenv("ROMAN_DATAMODELS_NO_CACHE", "1")
+    build = _Builder("value")
+
+    assert _cache.load_cached("test", "key", build) == "value"
+    assert _cache.load_cached("test", "key", build) == "value"
+    assert build.calls == 2
+    assert not list(cache_dir.iterdir())
+
+
+@pytest.mark.parametrize("contents", [b"", b"not marshal data", b"\xe9\x00\x00"])
+def test_corrupt_cache_entry(cache_dir, contents):
+    (cache_dir / "test.bin").write_bytes(contents)
+    build = _Builder("value")
+
+    assert _cache.load_cached("test", "key", build) == "value"
+    assert build.calls == 1
+    assert _cache.read_cache("test", "key") == "value"
+
+
+def test_unwritable_cache(tmp_path, monkeypatch):
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("ROMAN_DATAMODELS_CACHE_DIR", str(tmp_path / "file" / "cache"))
+    monkeypatch.delenv("ROMAN_DATAMODELS_NO_CACHE", raising=False)
+    build = _Builder("value")
+
+    assert _cache.load_cached("test", "key", build) == "value"
+    assert _cache.read_cache("test", "key") is None
+
+
+def test_cache_key(tmp_path):
+    path = tmp_path / "manifest.yaml"
+    path.write_text("a")
+    key = _cache.cache_key([path])
+
+    assert _cache.cache_key([path]) == key
+    assert _cache.cache_key([path], "extra") != key
+
+    path.write_text("b")
+    assert _cache.cache_key([path]) != key
+
+
+def test_load_schema(cache_dir):
+    uri = next(iter(SCHEMA_URIS_BY_TAG.values()))
+    expected = asdf.schema.load_schema(uri, resolve_references=True)
+    info = roman_datamodels.schema_cache_info()
+
+    assert _schema._load_schema(uri) == expected
+    assert roman_datamodels.schema_cache_info().disk_misses == info.disk_misses + 1
+    assert len(list((cache_dir / "schemas").iterdir())) == 1
+
+    assert _schema._load_schema(uri) == expected
+    assert roman_datamodels.schema_cache_info().disk_hits == info.disk_hits + 1
+
+
+def test_latest_schema_index():
+    """Check the index against searching all the resources"""
+    index = _schema._build_latest_schema_index()
+
+    for uri in set(SCHEMA_URIS_BY_TAG.values()):
+        uri_prefix = uri.rsplit("-", 1)[0]
+        versions = [
+            asdf.versioning.Version(resource_uri.rsplit("-", 1)[1])
+            for resource_uri in asdf.get_config().resource_manager
+            if resource_uri.rsplit("-", 1)[0] == uri_prefix
+        ]
+        assert index[uri_prefix] == f"{uri_prefix}-{max(versions)}"
+
+
+def test_warm_schema_cache():
+    tag = next(iter(SCHEMA_URIS_BY_TAG))
+    info = roman_datamodels.warm_schema_cache([tag])
+
+    assert isinstance(info, roman_datamodels.SchemaCacheInfo)
+    assert roman_datamodels.warm_schema_cache([tag]).hits == info.hits + 1
+
+
+@pytest.mark.parametrize("editable", [True, False])
+def test_schema_cache_key_contents(monkeypatch, editable):
+    """Editing a schema without changing any version changes the key, if any resources are installed as editable"""
+    monkeypatch.setattr(_schema, "_is_editable", lambda dist: editable)
+    key = _schema._schema_cache_key.__wrapped__()
+    uri = next(iter(SCHEMA_URIS_BY_TAG.values()))
+    content = asdf.get_config().resource_manager[uri]
+
+    with asdf.config_context() as config:
+        config.add_resource_mapping({uri: content + b"\n# edited\n"})
+        assert asdf.get_config().resource_manager[uri] != content
+        assert (_schema._schema_cache_key.__wrapped__() != key) is editable
+
+    assert _schema._schema_cache_key.__wrapped__() == key
+
+
+@pytest.mark.parametrize(
+    ("direct_url", "editable"),
+    [
+        (None, False),
+        ('{"url": "file:///rad", "dir_info": {}}', False),
+        ('{"url": "file:///rad", "dir_info": {"editable": true}}', True),
+    ],
+)
+def test_is_editable(direct_url, editable):
+    class _Distribution:
+        def read_text(self, filename):
+            return direct_url if filename == "direct_url.json" else None
+
+    assert _schema._is_editable(_Distribution()) is editable
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from textwrap import dedent
+
+import pytest
+
+from roman_datamodels import _stnode as stnode
+from roman_datamodels._stnode._registry import NODE_CLASSES_BY_TAG, NODE_CONVERTERS, _NodeClassesByTag
+from roman_datamodels._stnode._stnode import _TAG_TABLE
+
+
+def _run_lazy(script):
+    """Run a script in a fresh interpreter with lazy node creation enabled"""
+    env = {**os.environ, "ROMAN_DATAMODELS_LAZY_NODES": "1"}
+    result = subprocess.run([sys.executable, "-c", dedent(script)], env=env, capture_output=True, text=True, check=False)  # noqa: S603
+    assert result.returncode == 0, result.stderr
+
+
+def test_node_classes_by_tag():
+    created = []
+
+    def loader(pattern):
+        created.append(pattern)
+        return type(pattern, (), {})
+
+    registry = _NodeClassesByTag()
+    registry.add_lazy({"tag-1.0.0": "tag-*", "tag-1.1.0": "tag-*"}, loader)
+
+    assert len(registry) == 2
+    assert "tag-1.0.0" in registry
+    assert list(registry) == ["tag-1.0.0", "tag-1.1.0"]
+    assert not created
+
+    cls = registry["tag-1.0.0"]
+    assert cls.__name__ == "tag-*"
+    assert registry["tag-1.0.0"] is cls
+    assert created == ["tag-*"]
+
+    assert registry.get("other-1.0.0") is None
+    with pytest.raises(KeyError):
+        registry["other-1.0.0"]
+
+    registry["other-1.0.0"] = cls
+    assert registry["other-1.0.0"] is cls
+
+    del registry["other-1.0.0"]
+    assert "other-1.0.0" not in registry
+
+
+def test_all_tags_registered():
+    assert set(NODE_CLASSES_BY_TAG) == set(_TAG_TABLE["patterns"])
+
+
+@pytest.mark.parametrize(
+    "converter",
+    [stnode.TaggedObjectNodeConverter, stnode.TaggedListNodeConverter, stnode.TaggedScalarNodeConverter],
+)
+def test_converter_tags_match_types(converter):
+    converter = NODE_CONVERTERS[converter.__name__]
+    assert len(converter.tags) == len(converter.types)
+    for tag, typ in zip(converter.tags, converter.types, strict=True):
+        assert typ._pattern == tag
+
+
+def test_lazy_import():
+    _run_lazy(
+        """
+        from roman_datamodels import _stnode as stnode
+        from roman_datamodels._stnode import _registry
+
+        assert "FpsExposure" not in vars(stnode)
+        assert "asdf://stsci.edu/datamodels/roman/tags/fps/exposure-*" not in _registry.OBJECT_NODE_CLASSES_BY_PATTERN
+
+        # Created on first attribute access
+        assert stnode.FpsExposure._pattern == "asdf://stsci.edu/datamodels/roman/tags/fps/exposure-*"
+        assert "FpsExposure" in vars(stnode)
+        assert "FpsExposure" in dir(stnode)
+
+        # Created on first tag lookup
+        tag = stnode.FpsStatistics._default_tag.replace("statistics", "guidestar")
+        assert _registry.NODE_CLASSES_BY_TAG[tag] is stnode.FpsGuidestar
+
+        # NODE_CLASSES creates everything
+        assert len(stnode.NODE_CLASSES) == len(stnode._stnode._TAG_TABLE["nodes"])
+
+        try:
+            stnode.NotANodeClass
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("Expected an AttributeError")
+        """
+    )
+
+
+def test_lazy_roundtrip(tmp_path):
+    _run_lazy(
+        f"""
+        import asdf
+
+        from roman_datamodels import datamodels
+        from roman_datamodels import _stnode as stnode
+
+        model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+        model.save({str(tmp_path / "image.asdf")!r})
+        with datamodels.open({str(tmp_path / "image.asdf")!r}) as model:
+            model.validate()
+
+        # Serialize a class created after the ASDF extensions have been loaded
+        assert "FpsCalStep" not in vars(stnode._stnode)
+        asdf.AsdfFile({{"node": stnode.FpsCalStep.create_fake_data()}}).write_to({str(tmp_path / "node.asdf")!r})
+        with asdf.open({str(tmp_path / "node.asdf")!r}) as af:
+            assert isinstance(af["node"], stnode.FpsCalStep)
+        """
+    )
@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 import gwcs
 import numpy as np
 import pytest
@@ -6,7 +9,19 @@ from astropy.time import Time
 from astropy.units import Quantity
 
 from roman_datamodels._stnode import Observation, SkyBackground
-from roman_datamodels._stnode._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, SchemaType, _NoValueType
+from roman_datamodels._stnode._schema import (
+    _MISSING_KEYWORD,
+    _NO_VALUE,
+    Builder,
+    BuildPlan,
+    FakeDataBuilder,
+    NodeBuilder,
+    SchemaType,
+    _get_keyword,
+    _get_plan_from_tag,
+    _get_schema_from_tag,
+    _NoValueType,
+)
 
 
 @pytest.mark.parametrize(
@@ -238,3 +253,77 @@ def test_array_shape(ndim, shape, expected):
         schema["ndim"] = ndim
     arr = FakeDataBuilder(shape=shape).build(schema)
     assert arr.shape == expected
+
+
+@pytest.mark.parametrize("builder_class", (Builder, FakeDataBuilder, NodeBuilder))
+def test_plan_from_tag_cached(builder_class):
+    """Test that the plans for tagged schemas are compiled once per builder class"""
+    tag = Observation._default_tag
+    plan = _get_plan_from_tag(tag, builder_class())
+    assert isinstance(plan, BuildPlan)
+    assert plan.schema is _get_schema_from_tag(tag)
+    assert _get_plan_from_tag(tag, builder_class()) is plan
+
+
+@pytest.mark.parametrize("builder_class", (Builder, FakeDataBuilder, NodeBuilder))
+def test_plan_does_not_keep_builder(builder_class):
+    """Test that the (cached) plans do not keep the builders compiling them alive"""
+    builder = builder_class()
+    reference = weakref.ref(builder)
+    plan = builder.compile(_get_schema_from_tag(Observation._default_tag))
+    del builder
+    gc.collect()
+
+    assert reference() is None
+    assert plan.type == SchemaType.OBJECT
+
+
+def test_plan_children_cached():
+    """Test that child plans are only compiled once"""
+    plan = Builder().compile(_get_schema_from_tag(Observation._default_tag))
+    assert plan.type == SchemaType.OBJECT
+    assert plan.properties is plan.properties
+    for name, subplan in plan.properties:
+        assert plan.properties_by_name[name] is subplan
+        assert plan.child(subplan.schema) is subplan
+
+
+@pytest.mark.parametrize("builder_class", (Builder, FakeDataBuilder))
+def test_plan_matches_schema(builder_class):
+    """Test that building from a cached plan matches building from the schema"""
+    tag = SkyBackground._default_tag
+    plan = _get_plan_from_tag(tag, builder_class())
+    from_schema = builder_class().build(_get_schema_from_tag(tag))
+    assert builder_class().build(plan) == from_schema
+    # reusing the plan produces the same result
+    assert builder_class().build(plan) == from_schema
+
+
+class _SchemaFakeDataBuilder(FakeDataBuilder):
+    """A builder written against schemas (rather than plans) like those of downstream packages"""
+
+    def from_string(self, schema, defaults):
+        if _get_keyword(schema, "maxLength") is not _MISSING_KEYWORD and defaults is _NO_VALUE:
+            return "short"
+        return super().from_string(schema, defaults)
+
+    def from_unknown(self, schema, defaults):
+        if "ndim" in schema:
+            return self.from_tagged({"tag": "tag:stsci.edu:asdf/core/ndarray-1.*", "ndim": schema["ndim"]}, defaults)
+        return super().from_unknown(schema, defaults)
+
+
+def test_builder_schema_hooks():
+    """Test that builders overriding the hooks with schemas still work"""
+    plan = _get_plan_from_tag(Observation._default_tag, FakeDataBuilder())
+    assert dict(plan) == plan.schema
+    assert _get_keyword(plan, "type") == "object"
+
+    builder = _SchemaFakeDataBuilder()
+    assert builder.build({"type": "string", "maxLength": 3}) == "short"
+    assert builder.build_node({"type": "string"}, _NO_VALUE) == "?"
+    assert builder.from_integer({"type": "integer"}, _NO_VALUE) == -999999
+    assert builder.build({"ndim": 2}).shape == (0, 0)
+
+    node = Observation._create_fake_data(builder=builder)
+    assert node.observation_id == "short"
@@ -3,14 +3,17 @@ from contextlib import nullcontext
 from copy import deepcopy
 
 import asdf
+import gwcs
 import numpy as np
 import pytest
 from asdf.exceptions import ValidationError
 from astropy import units as u
+from astropy.modeling import models
+from astropy.table import Table
 from astropy.time import Time
 from numpy.testing import assert_array_equal
 
-from roman_datamodels import datamodels
+from roman_datamodels import clear_fake_data_cache, datamodels
 from roman_datamodels._stnode import (
     CalLogs,
     DNode,
@@ -25,6 +28,7 @@ from roman_datamodels._stnode import (
     WfiImage,
     WfiWcs,
 )
+from roman_datamodels._stnode import _node, _template
 from roman_datamodels._stnode._registry import NODE_CLASSES_BY_TAG
 from roman_datamodels._stnode._tagged import _NO_VALUE
 from roman_datamodels.testing import assert_node_equal, assert_node_is_copy
@@ -247,6 +251,30 @@ def test_get_column_description(model_class):
         assert np.dtype(column_def["datatype"]) == column.dtype
 
 
+@pytest.mark.parametrize(
+    "model_class",
+    (
+        datamodels.ImageSourceCatalogModel,
+        datamodels.MosaicSourceCatalogModel,
+        datamodels.ForcedImageSourceCatalogModel,
+        datamodels.ForcedMosaicSourceCatalogModel,
+        datamodels.MultibandSourceCatalogModel,
+    ),
+)
+def test_get_column_definitions(model_class):
+    model = model_class.create_fake_data()
+    names = [*model.create_empty_catalog(aperture_radii=[1, 2], filters=["f062", "f158"]).colnames, "forced_label", "unknown"]
+    column_defs = model.get_column_definitions(names)
+    assert list(column_defs) == names
+    assert column_defs == {name: model.get_column_definition(name) for name in names}
+    assert column_defs["forced_label"] == column_defs["label"]
+    assert column_defs["unknown"] is None
+
+    # the definitions returned can be modified
+    column_defs["label"]["unit"] = "m"
+    assert model.get_column_definition("label")["unit"] != "m"
+
+
 def test_datamodel_info_search(capsys):
     dm = datamodels.ScienceRawModel.create_fake_data()
     dm.info(max_rows=200)
@@ -400,6 +428,69 @@ def test_crds_parameters(model_class):
     assert "roman.test" not in crds_pars
 
 
+def test_crds_parameters_cached():
+    model = datamodels.ImageModel.create_fake_data()
+    crds_pars = model.get_crds_parameters()
+    info = datamodels.crds_parameters_cache_info()
+
+    # repeated calls and writes outside of meta use the cache
+    model.data = np.ones((8, 8), dtype=np.float32)
+    model["test"] = 42
+    assert model.get_crds_parameters() == crds_pars
+    assert datamodels.crds_parameters_cache_info() == (info.hits + 1, info.misses)
+
+    # the result is a copy of the cache
+    model.get_crds_parameters()["roman.meta.exposure.type"] = "bad"
+    assert model.get_crds_parameters() == crds_pars
+    assert datamodels.crds_parameters_cache_info() == (info.hits + 3, info.misses)
+
+
+@pytest.mark.parametrize(
+    "write",
+    (
+        lambda model: setattr(model.meta.exposure, "type", "WFI_GRISM"),
+        lambda model: model.meta.exposure.__setitem__("type", "WFI_GRISM"),
+        lambda model: model.meta.exposure.__delitem__("type"),
+        lambda model: model.meta.instrument.__setattr__("optical_element", "GRISM"),
+        lambda model: model.meta.__delitem__("exposure"),
+        lambda model: setattr(model, "meta", {"exposure": {"type": "WFI_GRISM"}}),
+    ),
+)
+def test_crds_parameters_invalidated(write):
+    model = datamodels.ImageModel.create_fake_data()
+    crds_pars = model.get_crds_parameters()
+    misses = datamodels.crds_parameters_cache_info().misses
+
+    write(model)
+    new_pars = model.get_crds_parameters()
+    assert new_pars != crds_pars
+    assert datamodels.crds_parameters_cache_info().misses == misses + 1
+    assert new_pars == {
+        f"roman.meta.{key}": value
+        for key, value in model.meta.to_flat_dict(include_arrays=False, recursive=True).items()
+        if isinstance(value, str | int | float | complex | bool)
+    }
+
+
+def test_crds_parameters_cache_watch(monkeypatch):
+    """
+    Test that cached CRDS parameters are returned without walking meta, and stop watching meta once the model is gone.
+    """
+    gc.collect()
+    watched = len(_node._WATCHES)
+    model = datamodels.ImageModel.create_fake_data()
+    crds_pars = model.get_crds_parameters()
+    assert len(_node._WATCHES) > watched
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_node, "_iter_children", lambda value: pytest.fail("meta was walked"))
+        assert model.get_crds_parameters() == crds_pars
+
+    del model
+    gc.collect()
+    assert len(_node._WATCHES) == watched
+
+
 def test_model_validate_without_save():
     # regression test for rcal-538
     m = datamodels.ImageModel.create_fake_data(shape=(8, 8))
@@ -467,12 +558,60 @@ def test_ramp_from_science_raw(mk_raw):
         else:
             raise ValueError(f"Unexpected type {type(ramp_value)}, {key}")  # pragma: no cover
 
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_ramp_from_science_raw_copy(copy):
+    """
+    Test that without copying the ramp shares the arrays whose dtype matches with the raw model.
+    """
+    raw = datamodels.TvacModel.create_fake_data(shape=(2, 8, 8))
+    raw.resultantdq = np.ones((2, 8, 8), dtype=np.uint8)
+    ramp = datamodels.RampModel.from_science_raw(raw, copy=copy)
+
+    assert ramp.data.dtype == np.float32
+    assert not np.shares_memory(ramp.data, raw.data)
+    assert np.shares_memory(ramp.amp33, raw.amp33) is not copy
+    assert np.shares_memory(ramp.groupdq, raw.resultantdq) is not copy
+    assert_array_equal(ramp.data, raw.data)
+    assert_array_equal(ramp.groupdq, 1)
+    assert_array_equal(ramp.pixeldq, 0)
+    ramp.validate()
+
+    raw = datamodels.ScienceRawModel.create_fake_data(shape=(2, 8, 8))
+    raw.data = np.ones((2, 8, 8), dtype=np.float32)
+    ramp = datamodels.RampModel.from_science_raw(raw, copy=copy)
+    assert np.shares_memory(ramp.data, raw.data) is not copy
+    assert np.shares_memory(ramp.amp33, raw.amp33) is not copy
+    assert_array_equal(ramp.groupdq, 0)
+    ramp.validate()
+
     # Check that resultantdq gets copied to groupdq
     if hasattr(raw, "resultantdq"):
         assert hasattr(ramp, "groupdq")
         assert not hasattr(ramp, "resultantdq")
 
 
+def test_ramp_from_science_raw_no_fake_data(monkeypatch):
+    """
+    Test that the ramp is built from the raw model, without building a fake ramp first.
+    """
+    raw = datamodels.ScienceRawModel.create_fake_data(shape=(2, 8, 8))
+    raw.data = np.ones((2, 8, 8), dtype=np.float32)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("fake data should not be created")
+
+    monkeypatch.setattr(datamodels.RampModel, "create_fake_data", fail)
+    monkeypatch.setattr(datamodels.RampModel._node_type, "create_fake_data", fail)
+    ramp = datamodels.RampModel.from_science_raw(raw, copy=False)
+
+    assert ramp.data is raw.data
+    assert ramp.meta.exposure.start_time is raw.meta.exposure.start_time
+    assert ramp.meta.cal_step.dq_init == "INCOMPLETE"
+    assert ramp.border_ref_pix_left.size == 0
+    ramp.validate()
+
+
 def test_science_raw_from_tvac_raw_invalid_input():
     """Test for invalid input"""
     model = datamodels.RampModel.create_fake_data()
@@ -677,6 +816,212 @@ def test_array_compression_override(tmp_path, compression):
         assert af.get_array_compression(af["roman"]["data"]) == compression
 
 
+@pytest.mark.parametrize(
+    "compression, shape",
+    # lz4 compresses blocks in chunks of 4 MiB, so use a larger array to test the chunking
+    [("lz4", (1100, 1100)), ("zlib", (64, 64)), ("bzp2", (64, 64)), (None, (64, 64))],
+)
+def test_save_workers(tmp_path, monkeypatch, compression, shape):
+    """
+    Test that compressing arrays in parallel writes the same blocks as doing so serially.
+    """
+    monkeypatch.setattr(Time, "now", lambda: Time("2025-01-01T00:00:00.0", format="isot", scale="utc"))
+    model = datamodels.ImageModel.create_fake_data(shape=shape)
+    model.data = np.random.default_rng(0).integers(0, 100, shape).astype(model.data.dtype)
+
+    serial = model.save(tmp_path / "serial.asdf", all_array_compression=compression).read_bytes()
+    parallel = model.save(tmp_path / "thread.asdf", all_array_compression=compression, workers=4)
+
+    # the history records the parallel compression extension, so only the blocks are the same
+    blocks = parallel.read_bytes()
+    assert (
+        blocks[blocks.index(b"\xd3BLK") : blocks.index(b"#ASDF BLOCK INDEX")]
+        == (serial[serial.index(b"\xd3BLK") : serial.index(b"#ASDF BLOCK INDEX")])
+    )
+
+    # reading the file does not warn about the extension
+    with datamodels.open(parallel) as new_model:
+        np.testing.assert_array_equal(new_model.data, model.data)
+
+
+@pytest.mark.parametrize("compression", ["lz4", "zlib", "bzp2"])
+def test_parallel_compressor_decompress(compression):
+    """
+    Test that the parallel compressors read back the blocks they write, however these are split.
+    """
+    from roman_datamodels.datamodels._compression import _ParallelCompressor
+
+    data = np.random.default_rng(0).integers(0, 100, 1 << 20).astype(np.uint8)
+    compressor = _ParallelCompressor(compression)
+    compressed = b"".join(
+        compressor.compress(data, compression_block_size=1 << 16) if compression == "lz4" else compressor.compress(data)
+    )
+
+    out = np.empty_like(data)
+    assert (
+        compressor.decompress((compressed[index : index + 1001] for index in range(0, len(compressed), 1001)), out.data)
+        == data.nbytes
+    )
+    np.testing.assert_array_equal(out, data)
+
+
+def test_save_workers_bounded(tmp_path, monkeypatch):
+    """
+    Test that compressing arrays in parallel keeps a bounded number of tasks in flight, and leaves asdf's compressors once done.
+    """
+    from roman_datamodels.datamodels import _compression
+
+    in_flight = []
+    fill = _compression._ParallelCompression.fill
+
+    def record(self):
+        fill(self)
+        in_flight.append(self.in_flight)
+
+    monkeypatch.setattr(_compression._ParallelCompression, "fill", record)
+    model = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    path = model.save(tmp_path / "test.asdf", all_array_compression="zlib", workers=2)
+
+    # zlib compresses each block in a single task
+    assert in_flight[0] == 2 * _compression._TASKS_PER_WORKER
+    assert max(in_flight) <= 2 * _compression._TASKS_PER_WORKER
+    assert not any(
+        extension.compressors
+        for extension in asdf.get_config().extensions
+        if extension.extension_uri == _compression.PARALLEL_EXTENSION.extension_uri
+    )
+    with datamodels.open(path) as new_model:
+        np.testing.assert_array_equal(new_model.data, model.data)
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_save_array_compression(tmp_path, workers):
+    """
+    Test compressing arrays by path and by dtype.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    policy = {"roman.dq": ("zlib", {"level": 9}), np.float16: "bzp2", "roman.var_poisson": None}
+    path = model.save(tmp_path / "test.asdf", array_compression=policy, workers=workers)
+
+    with asdf.open(path) as af:
+        assert af.get_array_compression(af["roman"]["dq"]) == "zlib"
+        assert af.get_array_compression(af["roman"]["var_poisson"]) is None
+        assert af.get_array_compression(af["roman"]["data"]) == "lz4"
+        for name in ("err", "chisq"):
+            assert af["roman"][name].dtype == np.float16
+            assert af.get_array_compression(af["roman"][name]) == "bzp2"
+
+    with datamodels.open(path) as new_model:
+        np.testing.assert_array_equal(new_model.dq, model.dq)
+
+
+def test_save_auto_compression(tmp_path):
+    """
+    Test that the "auto" compression only compresses the arrays which compress well.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(256, 256))
+    model.data = np.random.default_rng(0).random((256, 256), dtype=np.float32)
+    path = model.save(tmp_path / "test.asdf", all_array_compression="auto")
+
+    with asdf.open(path) as af:
+        assert af.get_array_compression(af["roman"]["data"]) is None
+        assert af.get_array_compression(af["roman"]["dq"]) == "lz4"
+
+    with datamodels.open(path) as new_model:
+        np.testing.assert_array_equal(new_model.data, model.data)
+
+
+@pytest.mark.parametrize("compression", [None, "lz4", "zlib", "bzp2"])
+def test_save_tile_shape(tmp_path, compression):
+    """
+    Test storing arrays in tiles, which asdf reads back like any other array.
+    """
+    model = datamodels.RampModel.create_fake_data(shape=(2, 50, 40))
+    model.data = np.random.default_rng(0).random((2, 50, 40), dtype=np.float32)
+    model.groupdq = np.zeros((2, 100, 40), dtype=model.groupdq.dtype)[:, ::2]
+    path = model.save(tmp_path / "test.asdf", all_array_compression=compression, tile_shape=(16, 16))
+
+    with asdf.open(path) as af:
+        assert af.get_array_compression(af["roman"]["data"]) == "rtil"
+        assert af.get_array_compression(af["roman"]["groupdq"]) == compression
+        assert af.get_array_compression(af["roman"]["amp33"]) == "rtil"
+        for name in ("data", "groupdq", "amp33"):
+            np.testing.assert_array_equal(af["roman"][name], model[name])
+
+
+@pytest.mark.parametrize("compression", [None, "lz4", "zlib", "bzp2", "auto"])
+def test_save_streamed_array(tmp_path, compression):
+    """
+    Test saving arrays streamed from chunks, which read back like any other array.
+    """
+    model = datamodels.RampModel.create_fake_data(shape=(4, 20, 30))
+    data = np.random.default_rng(0).random((4, 20, 30))
+    model.data = datamodels.StreamedArray(iter(data), shape=data.shape, dtype=np.float32)
+    model.err = datamodels.StreamedArray(np.lib.format.open_memmap(tmp_path / "err.npy", "w+", np.float64, data.shape))
+    model.validate()
+
+    path = model.save(tmp_path / "test.asdf", all_array_compression=compression, buffer_size=1000)
+
+    with asdf.open(path, validate_checksums=True) as af:
+        assert af.get_array_compression(af["roman"]["data"]) == ("lz4" if compression == "auto" else compression)
+        assert type(af["roman"]["data"]) is asdf.tags.core.NDArrayType
+        assert af["roman"]["data"].dtype == np.float32
+        assert af["roman"]["err"].dtype == np.float64
+        np.testing.assert_array_equal(af["roman"]["data"], data.astype(np.float32))
+        np.testing.assert_array_equal(af["roman"]["err"], 0)
+        np.testing.assert_array_equal(af["roman"]["amp33"], model.amp33)
+
+    # The memmap can be written again, the iterator cannot
+    with pytest.raises(ValueError, match=r"already been written"):
+        model.save(tmp_path / "test.asdf")
+
+    # Streamed arrays are ordinary arrays of the file, whatever their storage
+    model.data = datamodels.StreamedArray(data, dtype=np.float32)
+    model.save(tmp_path / "test.asdf", all_array_storage="inline")
+    with datamodels.open(tmp_path / "test.asdf") as new_model:
+        np.testing.assert_array_equal(new_model.data, data.astype(np.float32))
+
+    model.data = data.astype(np.float32)
+    model.save(tmp_path / "test.asdf", array_compression={"roman.err": ("zlib", {"level": 1})})
+    with asdf.open(tmp_path / "test.asdf") as af:
+        assert af.get_array_compression(af["roman"]["err"]) == "zlib"
+        assert af.get_array_compression(af["roman"]["data"]) == "lz4"
+
+
+def test_save_streamed_array_no_copy(tmp_path, monkeypatch):
+    """
+    Test that streamed arrays of C ordered arrays of their dtype are written without a temporary copy.
+    """
+    from roman_datamodels.datamodels import _streaming
+
+    monkeypatch.setattr(_streaming.tempfile, "TemporaryFile", None)
+    model = datamodels.RampModel.create_fake_data(shape=(4, 20, 30))
+    err = np.lib.format.open_memmap(tmp_path / "err.npy", "w+", np.float32, (4, 600))
+    err[:] = np.random.default_rng(0).random(err.shape)
+    model.err = datamodels.StreamedArray(err, shape=(4, 20, 30))
+
+    path = model.save(tmp_path / "test.asdf")
+    with datamodels.open(path) as new_model:
+        np.testing.assert_array_equal(new_model.err, err.reshape(4, 20, 30))
+
+    model.err = datamodels.StreamedArray(err, dtype=np.float64)
+    with pytest.raises(TypeError):
+        model.save(tmp_path / "test.asdf")
+
+
+def test_save_streamed_array_errors(tmp_path):
+    """
+    Test the streamed arrays which cannot be written.
+    """
+    model = datamodels.RampModel.create_fake_data(shape=(4, 20, 30))
+    model.data = datamodels.StreamedArray(iter(np.zeros((3, 20, 30))), shape=(4, 20, 30), dtype=np.float32)
+    with pytest.raises(ValueError, match=r"does not hold 2400 elements"):
+        model.save(tmp_path / "test.asdf")
+
+    with pytest.raises(ValueError, match=r"required unless its source is an array"):
+        datamodels.StreamedArray(iter(np.zeros((4, 20, 30))))
+
+
 @pytest.mark.parametrize("storage", [None, "inline", "internal", "external"])
 def test_array_storage_override(tmp_path, storage):
     """
@@ -795,6 +1140,92 @@ def test_create_fake_data(model):
     assert m.validate() is None
 
 
+@pytest.mark.parametrize("model", datamodels.MODEL_REGISTRY.values())
+@pytest.mark.parametrize("shape", (None, (8, 8, 8)))
+def test_create_fake_data_template(model, shape):
+    """Test that create_fake_data from a template matches building from scratch"""
+    expected = model.create_fake_data(shape=shape)
+    for _ in range(2):
+        assert_node_equal(model.create_fake_data(shape=shape, template=True)._instance, expected._instance)
+
+
+def test_create_fake_data_template_is_copy():
+    """Test that models created from a template do not share mutable data"""
+    clear_fake_data_cache()
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8), template=True)
+    other = datamodels.ImageModel.create_fake_data(shape=(8, 8), template=True)
+    assert_node_is_copy(model._instance, other._instance, True)
+
+    model.data[0, 0] = 42
+    model.meta.exposure.start_time = Time("2021-01-01T00:00:00.0", format="isot", scale="utc")
+    model.meta.wcs.bounding_box = ((0, 1), (0, 1))
+    model.meta.new_key = "value"
+
+    other = datamodels.ImageModel.create_fake_data(shape=(8, 8), template=True)
+    assert_node_equal(other._instance, datamodels.ImageModel.create_fake_data(shape=(8, 8))._instance)
+
+
+def test_create_fake_data_template_opt_in():
+    """Test that create_fake_data only uses (and caches) templates when asked to, and keeps a bounded number of them"""
+    clear_fake_data_cache()
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    assert not _template._TEMPLATES
+    assert_node_equal(model._instance, datamodels.ImageModel.create_fake_data(shape=(8, 8), template=True)._instance)
+
+    for size in range(1, _template._MAX_TEMPLATES + 3):
+        datamodels.ImageModel.create_fake_data(shape=(size, size), template=True)
+    assert len(_template._TEMPLATES) == _template._MAX_TEMPLATES
+    assert next(reversed(_template._TEMPLATES))[2] == (_template._MAX_TEMPLATES + 2,) * 2
+    clear_fake_data_cache()
+
+
+@pytest.mark.parametrize(
+    "defaults",
+    (
+        {"meta": {"exposure": {"type": "WFI_FLAT"}, "filename": "foo.asdf"}},
+        {"meta": {"cal_step": {"flat_field": "COMPLETE"}}},
+        {"meta": {"wcs_fit_results": {"a": 1}}, "extra": [1, 2]},
+        {"data": np.ones((4, 4), dtype=np.float32)},
+        {"meta": {"file_date": Time("2021-01-01T00:00:00.0", format="isot", scale="utc")}},
+    ),
+)
+def test_create_fake_data_template_defaults(defaults):
+    """Test that defaults are applied to the template as they are when building"""
+    model = datamodels.ImageModel.create_fake_data(defaults, shape=(8, 8), template=True)
+    expected = datamodels.ImageModel.create_fake_data(defaults, shape=(8, 8))
+    assert_node_equal(model._instance, expected._instance)
+
+
+@pytest.mark.parametrize("template", (True, False))
+@pytest.mark.parametrize("array_mode", ("zeros", "broadcast", "memmap"))
+def test_create_fake_data_array_mode(array_mode, template, tmp_path):
+    """Test that fake data created with each array mode is valid and can be saved"""
+    model = datamodels.RampModel.create_fake_data(shape=(2, 8, 8), template=template, array_mode=array_mode)
+    assert type(model.data) is np.ndarray
+    assert model.data.shape == (2, 8, 8)
+    assert model.data.flags.writeable == (array_mode != "broadcast")
+    assert not model.data.any()
+    if array_mode == "broadcast":
+        with pytest.raises(ValueError, match=r"read-only"):
+            model.data[0, 0, 0] = 1
+        # the arrays can still be replaced
+        model.data = np.ones((2, 8, 8), dtype=np.float32)
+    else:
+        model.data[0, 0, 0] = 1
+
+    model.save(tmp_path / "test.asdf")
+    with datamodels.open(tmp_path / "test.asdf") as new_model:
+        assert new_model.data[0, 0, 0] == 1
+        assert_array_equal(new_model.pixeldq, model.pixeldq)
+        new_model.validate()
+
+
+def test_create_fake_data_array_mode_invalid():
+    """Test that an unknown array mode is rejected"""
+    with pytest.raises(ValueError, match=r"Unknown array_mode"):
+        datamodels.RampModel.create_fake_data(array_mode="ones")
+
+
 @pytest.mark.parametrize("tag, node_class", NODE_CLASSES_BY_TAG.items())
 def test_create_tag(tag, node_class):
     """Test that we can create a node for every registered tag"""
@@ -862,6 +1293,103 @@ def test_deepcopy_is_deep():
     assert_node_is_copy(model_copy._instance, model._instance, True)
 
 
+@pytest.mark.parametrize(
+    "model_class, array",
+    [(datamodels.ImageModel, "data"), (datamodels.GuidewindowModel, "signal_frames"), (datamodels.RampModel, "data")],
+)
+def test_copy_on_write(model_class, array):
+    """
+    Test that a copy on write shares the tree until either model writes to it.
+    """
+    model = model_class.create_fake_data(shape=(2, 8, 8))
+    model.meta.exposure.read_pattern = [[1], [2, 3]]
+    expected = deepcopy(model)
+
+    writable = model[array]
+    model_copy = model.copy(copy_on_write=True)
+    assert model_copy.meta._data is model.meta._data
+    assert model_copy[array] is model[array]
+    assert model[array].base is writable
+    assert_node_equal(model_copy._instance, expected._instance)
+
+    # Both models hold read-only views of the arrays
+    for shared in (model, model_copy):
+        with pytest.raises(ValueError, match=r"read-only"):
+            shared[array][0] = 1
+
+    # Writes to either model only copy the containers written to
+    model_copy.meta.exposure.type = "WFI_FLAT"
+    model_copy.meta.exposure.read_pattern[0][0] = 9
+    model_copy["meta"]["extra"] = "copy"
+    model_copy[array] = np.ones_like(model[array])
+    model.meta.exposure.read_pattern.append([4])
+    del model.meta.observation
+    model[array] = model[array].copy()
+    model[array][0] = 2
+
+    assert model_copy._instance._data is not model._instance._data
+    assert model.meta.instrument._data is model_copy.meta.instrument._data
+    assert model.meta.exposure.type == expected.meta.exposure.type
+    assert model.meta.exposure.read_pattern == [[1], [2, 3], [4]]
+    assert "extra" not in model.meta
+    assert_array_equal(model[array][0], 2)
+    assert_array_equal(model[array][1:], expected[array][1:])
+    assert "observation" not in model.meta
+    assert model_copy.meta.exposure.type == "WFI_FLAT"
+    assert model_copy.meta.exposure.read_pattern == [[9], [2, 3]]
+    assert model_copy.meta.extra == "copy"
+    assert_array_equal(model_copy[array], 1)
+    assert "observation" in model_copy.meta
+    assert type(model_copy.meta.exposure) is type(model.meta.exposure)
+    model_copy.validate()
+
+    # A copy of the copy shares the containers again
+    second_copy = model_copy.copy(copy_on_write=True)
+    second_copy.meta.exposure.type = "WFI_SP_DARK"
+    assert model_copy.meta.exposure.type == "WFI_FLAT"
+    assert model.meta.exposure.type == expected.meta.exposure.type
+
+    # Trees which were never copied on write have no copy on write state
+    assert expected._instance._cow is None
+    assert expected.meta._cow is None
+
+
+def test_copy_on_write_opened(tmp_path):
+    """
+    Test that a copy on write of an opened model shares its lazily loaded arrays without loading them.
+    """
+    path = datamodels.ImageModel.create_fake_data(shape=(8, 8)).save(tmp_path / "test.asdf")
+
+    with datamodels.open(path, lazy_tree=True) as model, datamodels.open(path) as expected:
+        model_copy = model.copy(copy_on_write=True)
+        assert "(unloaded)" in repr(model_copy._instance._data["data"])
+        assert model_copy.data.shape == (8, 8)
+        assert "(unloaded)" in repr(model._instance._data["data"])
+
+        # Neither model can write to the arrays in place
+        for shared in (model, model_copy):
+            with pytest.raises(ValueError, match=r"read-only"):
+                shared.data[0] = 1
+            with pytest.raises(ValueError, match=r"read-only"):
+                shared.dq[0, 0] = 1
+        assert_array_equal(model.data, expected.data)
+        assert_array_equal(model_copy.data[1:3], expected.data[1:3])
+
+        # Replacing an array writes to one model only
+        model_copy.dq = model_copy.dq.copy()
+        model_copy.dq[1] = 2
+        assert_array_equal(model.dq, expected.dq)
+        assert_array_equal(model_copy.dq[1], 2)
+
+        # The shared arrays are written as ordinary arrays
+        model_copy.save(tmp_path / "copy.asdf")
+        model.save(tmp_path / "model.asdf")
+
+    with datamodels.open(tmp_path / "copy.asdf") as copied, datamodels.open(tmp_path / "model.asdf") as saved:
+        assert_array_equal(copied.data, saved.data)
+        assert_array_equal(copied.dq[1], 2)
+
+
 def test_model_dir():
     """
     Test that dir(model) returns attributes (to allow tab completion)
@@ -976,3 +1504,320 @@ class TestRomanDatamodelCreatorDefaults:
             # Sanity check to show the chosen test data is different from the default
             assert getattr(default_mdl.meta, key) != value
             assert getattr(mdl.meta, key) == value, f"meta.{key} was not set to input default"
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_diff(workers):
+    """
+    Test that diff reports all the differences of two models.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.data = np.arange(64, dtype=np.float32).reshape(8, 8)
+    assert datamodels.diff(model, model.copy(), workers=workers).identical
+
+    other = model.copy()
+    other.meta.exposure.type = "WFI_FLAT"
+    other.meta["extra"] = "other"
+    del other.meta["wcs"]
+    other.data[1, 1] = 3
+    other.data[2, 2] = np.nan
+    other.dq = other.dq[1:]
+    other.var_poisson = other.var_poisson.astype(np.float64)
+
+    result = datamodels.diff(model, other, workers=workers)
+    assert not result.identical
+    assert result.values == [datamodels.ValueDifference("meta.exposure.type", "WFI_IMAGE", "WFI_FLAT")]
+    assert result.only_a == ["meta.wcs"]
+    assert result.only_b == ["meta.extra"]
+
+    arrays = {array.path: array for array in result.arrays}
+    assert set(arrays) == {"data", "dq", "var_poisson"}
+    assert arrays["data"].n_different == 2
+    assert arrays["data"].max_abs == 6
+    assert arrays["data"].max_rel == pytest.approx(6 / 9)
+    assert arrays["dq"].shape_b == (7, 8)
+    assert arrays["dq"].n_different is None
+    assert arrays["var_poisson"].dtype_b == np.float64
+    assert arrays["var_poisson"].n_different == 0
+
+    assert datamodels.diff(model, other, skip=["meta", "data", "dq", "var_poisson"]).identical
+
+
+def test_diff_opened(tmp_path):
+    """
+    Test that diff compares the arrays of models opened from files.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.save(tmp_path / "a.asdf")
+    model.data[0, 0] += 1
+    model.save(tmp_path / "b.asdf")
+
+    with datamodels.open(tmp_path / "a.asdf") as model_a, datamodels.open(tmp_path / "b.asdf") as model_b:
+        result = datamodels.diff(model_a, model_b, skip=["meta.filename", "meta.file_date"])
+        assert [array.path for array in result.arrays] == ["data"]
+        assert result.arrays[0].n_different == 1
+
+        model_a.dq[0, 0] += 1
+        result = datamodels.diff(model_a, model_b, skip=["meta.filename", "meta.file_date"], workers=2)
+        assert [array.path for array in result.arrays] == ["data", "dq"]
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (models.Shift(1) + models.Shift(2), models.Shift(1) * models.Shift(2)),
+        (models.Shift(1) | models.Scale(2), models.Scale(2) | models.Shift(1)),
+        (models.Shift(1) & models.Shift(2), models.Shift(2) & models.Shift(1)),
+        (models.Mapping((0, 1)), models.Mapping((1, 0))),
+    ],
+)
+def test_diff_transforms(a, b):
+    """
+    Test that diff compares the operators and the order of the operands of compound models.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta["transform"] = a
+    other = model.copy()
+    assert datamodels.diff(model, other).identical
+
+    other.meta["transform"] = b
+    assert [value.path for value in datamodels.diff(model, other).values] == ["meta.transform"]
+
+
+def test_diff_wcs_steps():
+    """
+    Test that diff compares each (frame, transform) step of a gwcs.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    frames = [step.frame for step in model.meta.wcs.pipeline]
+    model.meta.wcs = gwcs.WCS(
+        [(frames[0], models.Shift(1) & models.Shift(2) | models.Scale(3) & models.Scale(4)), (frames[1], None)]
+    )
+    other = model.copy()
+    assert datamodels.diff(model, other).identical
+
+    # Swapping the operands keeps the parameters
+    other.meta.wcs = gwcs.WCS(
+        [(frames[0], models.Scale(1) & models.Scale(2) | models.Shift(3) & models.Shift(4)), (frames[1], None)]
+    )
+    assert [value.path for value in datamodels.diff(model, other).values] == ["meta.wcs"]
+
+    other = model.copy()
+    other.meta.wcs.pipeline[0].frame.name = "other"
+    assert [value.path for value in datamodels.diff(model, other).values] == ["meta.wcs"]
+
+
+def test_diff_integers():
+    """
+    Test that diff compares integers exactly, beyond the precision of floats.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta["counts"] = np.full(4, 2**62 + 1, dtype=np.int64)
+    model.meta["flags"] = np.full(4, 2**63 + 1, dtype=np.uint64)
+    other = model.copy()
+    other.meta["counts"] = np.full(4, 2**62, dtype=np.int64)
+    other.meta["flags"] = np.full(4, 2**63 + 1, dtype=np.uint64)
+    other.meta["flags"][1] = 2**64 - 1
+
+    arrays = {array.path: array for array in datamodels.diff(model, other).arrays}
+    assert set(arrays) == {"meta.counts", "meta.flags"}
+    assert arrays["meta.counts"].n_different == 4
+    assert arrays["meta.counts"].max_abs == 1
+    assert arrays["meta.flags"].n_different == 1
+    assert arrays["meta.flags"].max_abs == float(2**63 - 2)
+
+    other.meta["counts"] = other.meta["counts"].astype(np.uint64) + 1
+    arrays = {array.path: array for array in datamodels.diff(model, other).arrays}
+    assert arrays["meta.counts"].n_different == 0
+
+
+def test_validate_incremental():
+    """
+    Test that validate only re-validates the parts of a model written to since it was last validated.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    assert model.validation_report is None
+
+    model.validate()
+    assert model.validation_report.full
+    model.validate()
+    assert model.validation_report == (False, {}, 0)
+
+    model.meta.exposure.type = "WFI_FLAT"
+    model.validate()
+    assert not model.validation_report.full
+    assert set(model.validation_report.timings) == {"", "meta", "meta.exposure", "meta.exposure.type"}
+
+    # Invalid values and structures are still found
+    model.meta.exposure.type = 42
+    with pytest.raises(ValidationError, match=r"42 is not of type 'string'"):
+        model.validate()
+    model.meta.exposure.type = "WFI_IMAGE"
+    model.validate()
+
+    start_time = model.meta.exposure.start_time
+    del model.meta.exposure.start_time
+    with pytest.raises(ValidationError, match=r"'start_time' is a required property"):
+        model.validate()
+    model.meta.exposure.start_time = start_time
+
+    data = model.data
+    model.data = data.astype(np.float64)
+    with pytest.raises(ValidationError, match=r"float64"):
+        model.validate()
+    model.data = data
+    model.validate()
+    # The items restored are the ones validated last
+    assert model.validation_report == (False, {}, 0)
+
+    model.data = data.copy()
+    model.meta.exposure.start_time = start_time.copy()
+    model.validate()
+    assert set(model.validation_report.timings) == {"", "meta", "meta.exposure", "meta.exposure.start_time", "data"}
+
+    model.validate(full=True)
+    assert model.validation_report.full
+
+
+@pytest.mark.parametrize(
+    "write",
+    (
+        lambda model: model.meta["exposure"].__setitem__("type", 123),
+        lambda model: model["meta"]["exposure"].__setitem__("type", 123),
+        lambda model: model["meta"].__setitem__("exposure", {"type": 123}),
+        lambda model: setattr(model.data, "shape", (64,)),
+    ),
+)
+def test_validate_incremental_direct_writes(write):
+    """
+    Test that validate finds the writes made directly to the dicts (and arrays) of a model.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.validate()
+
+    write(model)
+    with pytest.raises(ValidationError):
+        model.validate()
+
+
+# The values written by test_validate_incremental_parity, which marks the items it adds as missing before
+_MISSING = object()
+_MUTATIONS = (42, 1.5, True, None, "value", [], {}, np.zeros(2, dtype=np.int8), Time("2020-01-01T00:00:00"))
+
+
+def _mutation_paths(node, path=()):
+    """
+    Get the paths of all the items of a tree (but inside arrays and other leaves).
+    """
+    for key, value in _node._iter_children(node):
+        yield (*path, key)
+        if isinstance(value, _node._NODE_TYPES):
+            yield from _mutation_paths(value, (*path, key))
+
+
+@pytest.mark.parametrize("model_class", datamodels.MODEL_REGISTRY.values())
+def test_validate_incremental_parity(model_class):
+    """
+    Test that incremental validation agrees with validating the whole tree after random writes to any tagged model.
+    """
+    rng = np.random.default_rng(42)
+    model = model_class.create_fake_data()
+    paths = list(_mutation_paths(model._instance))
+    model.validate()
+
+    for _ in range(10):
+        undo = []
+        for _ in range(rng.integers(1, 3)):
+            *parents, key = paths[rng.integers(len(paths))]
+            parent = model._instance
+            try:
+                for part in parents:
+                    parent = parent[part]
+                old = parent[key]
+                if (write := rng.random()) < 0.2:
+                    del parent[key]
+                    undo.append((parent, key, old, True))
+                elif write < 0.4 and isinstance(parent, DNode):
+                    undo.append((parent, "extra", parent.get("extra", _MISSING), False))
+                    parent["extra"] = deepcopy(_MUTATIONS[rng.integers(len(_MUTATIONS))])
+                else:
+                    # Rewriting the same value must validate as before
+                    parent[key] = deepcopy(old if write < 0.6 else _MUTATIONS[rng.integers(len(_MUTATIONS))])
+                    undo.append((parent, key, old, False))
+            except (KeyError, IndexError, TypeError, AttributeError):
+                # The path was removed by an earlier write
+                continue
+
+        results = []
+        for full in (False, True):
+            try:
+                model.validate(full=full)
+            except ValidationError:
+                results.append(False)
+            else:
+                results.append(True)
+        assert results[0] == results[1], f"{model_class.__name__}: incremental {results[0]}, full {results[1]}"
+
+        for parent, key, old, deleted in reversed(undo):
+            if old is _MISSING:
+                del parent[key]
+            elif deleted and isinstance(parent, LNode):
+                parent.insert(key, old)
+            else:
+                parent[key] = old
+        model.validate()
+
+
+def test_validate_without_reading_arrays(tmp_path):
+    """
+    Test that validating a lazily opened model does not read its arrays.
+    """
+    path = datamodels.ImageModel.create_fake_data(shape=(8, 8)).save(tmp_path / "test.asdf")
+
+    with datamodels.open(path) as model:
+        model.validate()
+        assert model.validation_report.bytes_read == 0
+        assert all(value._array is None for _, value in model.items() if isinstance(value, asdf.tags.core.NDArrayType))
+
+        model.dq = np.zeros((8, 8), dtype=np.float32)
+        with pytest.raises(ValidationError, match=r"Expected datatype 'uint32'"):
+            model.validate(full=True)
+
+
+def test_validate_streamed_block(tmp_path):
+    """
+    Test that validating a model reports the bytes read for the arrays stored in streamed blocks.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.filename = "test.asdf"
+    asdf_file = asdf.AsdfFile({"roman": model._instance})
+    asdf_file["roman"]["data"] = asdf.tags.core.Stream([8], np.float32)
+    with open(tmp_path / "test.asdf", "wb") as fd:
+        asdf_file.write_to(fd)
+        fd.write(np.zeros((8, 8), dtype=np.float32).tobytes())
+
+    with datamodels.open(tmp_path / "test.asdf") as model:
+        model.validate()
+        assert model.validation_report.bytes_read == 8 * 8 * 4
+
+        model.meta.exposure.type = "WFI_FLAT"
+        model.validate()
+        assert model.validation_report.bytes_read == 0
+
+
+def test_validate_keeps_asdf_file():
+    """
+    Test that validating a model converting the arrays of other objects leaves the asdf file of the model unchanged.
+    """
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta["table"] = Table({"a": np.arange(3.0)})
+    column = model.meta.table["a"].data
+    with asdf.config_context() as config:
+        config.all_array_compression = "zlib"
+        model.validate()
+        model.meta.table = Table({"a": np.arange(4.0)})
+        model.validate()
+        assert not model.validation_report.full
+
+    assert model._asdf.get_array_compression(column) is None
+    assert model._asdf.get_array_compression(model.meta.table["a"].data) is None
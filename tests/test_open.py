@@ -1,15 +1,18 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import asdf
 import numpy as np
 import pytest
+from asdf.tags.core.ndarray import NDArrayType
 from astropy.io import fits
 from numpy.testing import assert_array_equal
 
 from roman_datamodels import datamodels
 from roman_datamodels._stnode import WfiImage
+from roman_datamodels.datamodels._tiles import TiledArray
 from roman_datamodels.testing import assert_node_equal
 
 
@@ -192,6 +195,120 @@ def test_no_memmap(tmp_path, kwargs):
         assert (model.data == data).all()
 
 
+@pytest.mark.parametrize("prefetch", [True, ["data", "groupdq"]])
+@pytest.mark.parametrize("workers", [None, 1, 3])
+def test_prefetch(tmp_path, prefetch, workers):
+    """Test that prefetched arrays are loaded (and match the lazily loaded ones)"""
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.RampModel.create_fake_data(shape=(2, 8, 8))
+    model.data = np.random.default_rng(0).random(model.data.shape).astype(model.data.dtype)
+    model.save(file_path)
+
+    with datamodels.open(file_path) as lazy, datamodels.open(file_path, prefetch=prefetch, workers=workers) as prefetched:
+        arrays = {key: value for key, value in lazy.items() if isinstance(value, NDArrayType)}
+        expected = set(arrays) if prefetch is True else set(prefetch)
+        for key, value in prefetched.items():
+            if key in arrays:
+                assert isinstance(value, NDArrayType) is (key not in expected)
+                assert_array_equal(value, arrays[key])
+
+        prefetched.validate()
+
+
+def test_prefetch_memmap(tmp_path):
+    """Test that only compressed arrays are prefetched when memory mapping"""
+    file_path = tmp_path / "test.asdf"
+    datamodels.RampModel.create_fake_data(shape=(2, 8, 8)).save(file_path)
+    with asdf.open(file_path, mode="rw") as af:
+        af.set_array_compression(af["roman"]["groupdq"], None)
+        af.update()
+
+    with datamodels.open(file_path, memmap=True, prefetch=True) as model:
+        assert isinstance(model["data"], np.ndarray)
+        assert isinstance(model["groupdq"], NDArrayType)
+
+
+def test_prefetch_file_input(tmp_path):
+    """Test that arrays are prefetched when opening a file object"""
+    file_path = tmp_path / "test.asdf"
+    datamodels.RampModel.create_fake_data(shape=(2, 8, 8)).save(file_path)
+    with open(file_path, "rb") as f, datamodels.open(f, prefetch=["data"]) as model:
+        assert isinstance(model["data"], np.ndarray)
+        assert isinstance(model["groupdq"], NDArrayType)
+
+
+def test_prefetch_unknown_array(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    datamodels.RampModel.create_fake_data(shape=(2, 8, 8)).save(file_path)
+    with pytest.raises(KeyError):
+        datamodels.open(file_path, prefetch=["not_an_array"])
+
+
+@pytest.mark.parametrize("lazy_tree", [True, False])
+def test_tiled_arrays(tmp_path, lazy_tree):
+    """Test that slicing an array stored in tiles only reads the tiles it needs"""
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(100, 100))
+    model.data = np.random.default_rng(0).random(model.data.shape).astype(model.data.dtype)
+    model.save(file_path, tile_shape=(32, 32))
+
+    with datamodels.open(file_path, lazy_tree=lazy_tree) as tiled:
+        assert isinstance(tiled.data, TiledArray)
+        assert tiled.data.shape == (100, 100)
+
+        reads = []
+        read = tiled.data._read
+        tiled.data._read = lambda fd, start, size: reads.append(size) or read(fd, start, size)
+
+        for key in [(slice(40, 60), slice(70, 90)), 5, (Ellipsis, -1), (slice(None, None, -3), slice(95, 5, -7)), (slice(0, 0),)]:
+            assert_array_equal(tiled.data[key], model.data[key])
+
+        # the index is read once (in 3 reads), then only the tiles overlapping each region
+        assert len(reads) == 3 + 1 + 4 + 4 + 12 + 0
+        assert tiled.data._loaded is None
+        assert_array_equal(tiled.data, model.data)
+        assert_array_equal(tiled.data[5], model.data[5])
+
+        tiled.validate()
+
+
+def test_tiled_arrays_threads(tmp_path):
+    """Test that tiles are read through their own file handles, concurrently with asdf reading the file"""
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    model.data = np.random.default_rng(0).random(model.data.shape).astype(model.data.dtype)
+    model.save(file_path, tile_shape=(8, 8))
+
+    with datamodels.open(file_path) as tiled, ThreadPoolExecutor(4) as executor:
+        keys = [(slice(row, row + 9), slice(5, 30)) for row in range(0, 56, 3)]
+        for key, region in zip(keys, executor.map(tiled.data.__getitem__, keys), strict=True):
+            assert_array_equal(region, model.data[key])
+        assert_array_equal(tiled.dq, model.dq)
+
+
+def test_tiled_arrays_no_block_index(tmp_path):
+    """Test that tiled arrays are read as ordinary arrays from files without a block index"""
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(40, 40))
+    model.save(file_path, tile_shape=(16, 16))
+
+    content = file_path.read_bytes()
+    file_path.write_bytes(content[: content.rindex(b"#ASDF BLOCK INDEX")])
+    with datamodels.open(file_path) as opened:
+        assert type(opened.data) is NDArrayType
+        assert_array_equal(opened.data[3:20, 5], model.data[3:20, 5])
+
+
+def test_tiled_arrays_untiled(tmp_path):
+    """Test that arrays are not wrapped unless stored in tiles"""
+    file_path = tmp_path / "test.asdf"
+    datamodels.ImageModel.create_fake_data(shape=(8, 8)).save(file_path, tile_shape=(16, 16))
+
+    with datamodels.open(file_path) as model, asdf.open(file_path) as af:
+        assert type(model.data) is NDArrayType
+        assert af.get_array_compression(af["roman"]["data"]) == "lz4"
+
+
 @pytest.mark.parametrize("node_class", [node for node in datamodels.MODEL_REGISTRY])
 def test_node_round_trip(tmp_path, node_class):
     file_path = tmp_path / "test.asdf"
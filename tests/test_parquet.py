@@ -1,8 +1,13 @@
+import re
+
 import astropy.table as astrotab
 import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
 import pytest
 from asdf.exceptions import ValidationError
+from astropy import units as u
 
 from roman_datamodels import datamodels
 
@@ -55,3 +60,146 @@ def test_to_parquet_validates(catalog_class, tmp_path):
     sc_dm.meta = {}
     with pytest.raises(ValidationError):
         sc_dm.to_parquet(fn)
+
+
+@pytest.mark.parametrize("catalog_class", CATALOG_CLASSES)
+def test_from_parquet(catalog_class, tmp_path):
+    sc_dm = catalog_class.create_fake_data()
+    sc_dm.source_catalog[sc_dm.source_catalog.colnames[0]].description = "a description"
+    test_path = tmp_path / "test.parquet"
+    sc_dm.to_parquet(test_path)
+
+    for model in (catalog_class.from_parquet(test_path), datamodels.open(test_path)):
+        assert type(model) is catalog_class
+        model.validate()
+
+        # only the file name and date are updated by to_parquet
+        diff = datamodels.diff(sc_dm, model)
+        assert {value.path for value in diff.values} == {"meta.filename", "meta.file_date"}
+        assert not (diff.arrays or diff.only_a or diff.only_b)
+        assert model.meta.filename == test_path.name
+
+    other_class = next(cls for cls in CATALOG_CLASSES if cls is not catalog_class)
+    with pytest.raises(TypeError, match=f"not a {other_class.__name__}"):
+        other_class.from_parquet(test_path)
+
+
+def test_from_parquet_columns_and_filters(tmp_path):
+    sc_dm = datamodels.ImageSourceCatalogModel.create_fake_data()
+    empty = sc_dm.source_catalog
+    sc_dm.source_catalog = astrotab.Table(
+        [astrotab.Column(np.arange(100).astype(empty[name].dtype), name=name, unit=empty[name].unit) for name in empty.colnames],
+        meta=empty.meta,
+    )
+    test_path = tmp_path / "test.parquet"
+    sc_dm.to_parquet(test_path)
+
+    columns = sc_dm.source_catalog.colnames[:3]
+    name = columns[0]
+    model = datamodels.open(test_path, columns=columns, filters=[(name, ">=", 90)])
+    assert model.source_catalog.colnames == columns
+    assert model.source_catalog[name].unit == sc_dm.source_catalog[name].unit
+    assert np.all(model.source_catalog[name] == sc_dm.source_catalog[name][90:])
+
+
+@pytest.mark.parametrize("compression", [None, "snappy", "zstd"])
+def test_to_parquet_row_groups(compression, tmp_path):
+    sc_dm = datamodels.ImageSourceCatalogModel.create_fake_data()
+    empty = sc_dm.source_catalog
+    sc_dm.source_catalog = astrotab.Table(
+        [astrotab.Column(np.arange(25).astype(empty[name].dtype), name=name, unit=empty[name].unit) for name in empty.colnames],
+        meta=empty.meta,
+    )
+    test_path = tmp_path / "test.parquet"
+    sc_dm.save(test_path, row_group_size=10, compression=compression)
+
+    metadata = pq.ParquetFile(test_path).metadata
+    assert [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)] == [10, 10, 5]
+    assert metadata.row_group(0).column(0).compression == (compression or "uncompressed").upper()
+
+    ptab = astrotab.Table.read(test_path, format="parquet")
+    for name in empty.colnames:
+        assert np.all(ptab[name] == sc_dm.source_catalog[name])
+
+
+@pytest.mark.parametrize("catalog_class", CATALOG_CLASSES)
+def test_to_arrow(catalog_class):
+    sc_dm = catalog_class.create_fake_data()
+    empty = sc_dm.source_catalog
+    name_a, name_b = empty.colnames[:2]
+    columns = [
+        astrotab.Column(np.arange(10).astype(empty[name].dtype), name=name, unit=empty[name].unit) for name in empty.colnames
+    ]
+    columns[1] = astrotab.MaskedColumn(columns[1], mask=np.arange(10) < 3)
+    sc_dm.source_catalog = astrotab.Table(columns, meta=empty.meta)
+
+    table = sc_dm.to_arrow()
+    assert table.column_names == empty.colnames
+    assert table.schema.metadata[b"roman.meta.telescope"] == sc_dm.meta.telescope.encode("ascii")
+    assert table.schema.field(name_a).metadata[b"unit"] == str(empty[name_a].unit).encode("ascii")
+
+    # the data is shared with the catalog
+    data = sc_dm.source_catalog[name_a]
+    assert table[name_a].chunks[0].buffers()[1].address == data.__array_interface__["data"][0]
+    assert table[name_b].null_count == 3
+
+    # through the arrow PyCapsule interface
+    assert pa.table(sc_dm).equals(table, check_metadata=True)
+
+
+def _numbered_catalog(catalog_class, start, skycell_name):
+    sc_dm = catalog_class.create_fake_data()
+    sc_dm.meta.wcsinfo.skycell_name = skycell_name
+    empty = sc_dm.source_catalog
+    sc_dm.source_catalog = astrotab.Table(
+        [
+            astrotab.Column(np.arange(start, start + 10).astype(empty[name].dtype), name=name, unit=empty[name].unit)
+            for name in empty.colnames
+        ],
+        meta=empty.meta,
+    )
+    return sc_dm
+
+
+def test_write_parquet_dataset(tmp_path):
+    partition_by = ["meta.wcsinfo.skycell_name", "meta.instrument.optical_element"]
+    catalogs = [_numbered_catalog(datamodels.MosaicSourceCatalogModel, 100 * index, f"skycell/{index}") for index in range(3)]
+    paths = datamodels.write_parquet_dataset(catalogs[:2], tmp_path, partition_by=partition_by)
+    # add to the existing dataset
+    paths += datamodels.write_parquet_dataset(catalogs[2:], tmp_path, partition_by=partition_by)
+
+    assert [path.parent.relative_to(tmp_path).as_posix() for path in paths] == [
+        f"skycell_name=skycell%2F{index}/optical_element=F062" for index in range(3)
+    ]
+    assert all(re.fullmatch(r"part-[0-9a-f]{32}\.parquet", path.name) for path in paths)
+    for path, catalog in zip(paths, catalogs, strict=True):
+        assert datamodels.open(path).meta.wcsinfo.skycell_name == catalog.meta.wcsinfo.skycell_name
+
+    summary = pq.read_metadata(tmp_path / "_metadata")
+    assert summary.num_rows == 30
+    assert not any(key.startswith(b"roman.meta") for key in summary.metadata)
+
+    # the files are pruned by the partitions and the statistics in the summary
+    dataset = ds.parquet_dataset(tmp_path / "_metadata", partitioning="hive")
+    name = catalogs[0].source_catalog.colnames[0]
+    by_skycell = ds.field("skycell_name") == "skycell/1"
+    assert [fragment.path for fragment in dataset.get_fragments(filter=by_skycell)] == [str(paths[1])]
+    by_value = ds.field(name) >= 150
+    assert [fragment.subset(filter=by_value).num_row_groups for fragment in dataset.get_fragments()] == [0, 0, 1]
+    assert dataset.to_table(filter=by_value)[name].to_pylist() == list(range(200, 210))
+
+    # catalogs differing only in their table meta share the columns of the dataset
+    same = _numbered_catalog(datamodels.MosaicSourceCatalogModel, 300, "skycell/1")
+    same.source_catalog.meta["other"] = "meta"
+    paths += datamodels.write_parquet_dataset([same], tmp_path, partition_by=partition_by)
+    assert paths[3].parent == paths[1].parent
+    assert paths[3] != paths[1]
+    assert pq.read_metadata(tmp_path / "_metadata").num_rows == 40
+
+    # nothing is written if any catalog does not match
+    other = _numbered_catalog(datamodels.MosaicSourceCatalogModel, 0, "skycell/3")
+    other.source_catalog["aper10_flux"] = astrotab.Column(np.zeros(10, dtype=np.float32), unit=u.nJy)
+    with pytest.raises(ValueError, match="do not match"):
+        datamodels.write_parquet_dataset([same, other], tmp_path, partition_by=partition_by)
+    assert sorted(tmp_path.glob("**/part-*.parquet")) == sorted(paths)
+    assert pq.read_metadata(tmp_path / "_metadata").num_rows == 40
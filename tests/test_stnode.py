@@ -1,7 +1,9 @@
 from contextlib import nullcontext
 
 import asdf
+import numpy as np
 import pytest
+from asdf.tags.core.ndarray import NDArrayType
 
 from roman_datamodels import _stnode as stnode
 from roman_datamodels import datamodels
@@ -258,3 +260,133 @@ def test_lnode_unwrapping(value, return_type):
     node[0] = value
     assert type(node[0]) is return_type
     assert node[0] is not value
+
+
+@pytest.mark.parametrize("set_method", ["__setattr__", "__setitem__", "__delitem__"])
+def test_dnode_child_wrapper_cached(set_method):
+    """
+    Test DNode reuses the wrappers for its children until they are changed
+    """
+    node = stnode.DNode({"a": {"b": {"c": 1}}, "d": [{"e": 2}]})
+    child = node.a
+    assert node.a is child
+    assert node.a.b is child.b
+    assert node.d is node.d
+    assert node.d[0] is node.d[0]
+
+    if set_method == "__delitem__":
+        del node["a"]
+        assert "a" not in node
+        node.a = {"b": {"c": 2}}
+    else:
+        getattr(node, set_method)("a", {"b": {"c": 2}})
+    assert node.a is not child
+    assert node.a.b.c == 2
+    assert node.a is node.a
+
+
+def test_dnode_child_wrapper_underlying_change():
+    """
+    Test the cached wrappers are not used if the underlying data is changed directly
+    """
+    data = {"a": {"b": 1}, "c": [{"d": 1}]}
+    node = stnode.DNode(data)
+    child = node.a
+    list_child = node.c[0]
+
+    data["a"] = {"b": 2}
+    data["c"][0] = {"d": 2}
+    assert node.a is not child
+    assert node.a.b == 2
+    assert node.c[0] is not list_child
+    assert node.c[0].d == 2
+
+    # changes through the wrappers are visible to the parent
+    node.a.b = 3
+    assert data["a"]["b"] == 3
+
+
+def test_lnode_child_wrapper_cached():
+    """
+    Test LNode reuses the wrappers for its items until they are changed
+    """
+    node = stnode.LNode([{"a": 1}, [2], 3])
+    first = node[0]
+    assert node[0] is first
+    assert node[1] is node[1]
+    assert node[0:2] is not node[0:2]
+
+    node.insert(0, {"a": 0})
+    assert node[0].a == 0
+    assert node[1] == first
+
+    node[1] = {"a": 2}
+    assert node[1] is not first
+    assert node[1].a == 2
+
+    del node[0]
+    assert node[0].a == 2
+
+
+def test_child_wrapper_not_copied():
+    """
+    Test copies of a node do not share the cached wrappers
+    """
+    node = stnode.DNode({"a": {"b": 1}})
+    child = node.a
+    node_copy = node.copy()
+    assert node_copy.a is not child
+    node_copy.a = {"b": 2}
+    assert node.a is child
+    assert node.a.b == 1
+
+
+def test_recursive_items():
+    """
+    Test the flattened items of a node are in order and skip None
+    """
+    node = stnode.DNode(
+        {
+            "a": {"b": 1, "c": [2, {"d": 3}], "e": None},
+            "f": stnode.LNode([4, (5, 6)]),
+            "g": stnode.DNode({"h": np.zeros(2)}),
+            "i": {},
+        }
+    )
+    items = list(node._recursive_items())
+    assert [key for key, _ in items] == ["a.b", "a.c.0", "a.c.1.d", "f.0", "f.1.0", "f.1.1", "g.h"]
+    assert [value for _, value in items[:-1]] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"include_arrays": False}, ["a.b", "a.c.0", "a.c.1.d", "f"]),
+        ({"skip": ["a.c"]}, ["a.b", "f", "g.h"]),
+        ({"skip": ["a.c.1", "g", "f"]}, ["a.b", "a.c.0"]),
+        ({"max_depth": 1}, ["f"]),
+        ({"max_depth": 2}, ["a.b", "f", "g.h"]),
+        ({"max_depth": 3, "include_arrays": False, "skip": ["a.b"]}, ["a.c.0", "f"]),
+    ],
+)
+def test_recursive_items_pruning(kwargs, expected):
+    """
+    Test the flattened items can be pruned
+    """
+    node = stnode.DNode({"a": {"b": 1, "c": [2, {"d": 3}]}, "f": "x", "g": {"h": np.zeros(2)}})
+    assert [key for key, _ in node._recursive_items(**kwargs)] == expected
+
+
+def test_flat_dict_does_not_load_arrays(tmp_path):
+    """
+    Test flattening a model without arrays does not load the arrays
+    """
+    file_path = tmp_path / "test.asdf"
+    datamodels.ImageModel.create_fake_data(shape=(8, 8)).save(file_path)
+    with datamodels.open(file_path) as model:
+        data = model._instance._data["data"]
+        assert isinstance(data, NDArrayType)
+        assert "roman.data" not in model.to_flat_dict(include_arrays=False)
+        assert model.get_crds_parameters()
+        assert [key for key, _ in model.items(skip=["meta"])] == [key for key in model._instance if key != "meta"]
+        assert data._array is None